@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the Sudoku project.
+
+Run them from the repository root, e.g.:
+    python -m benchmarks.bench_constraints
+"""
@@ -0,0 +1,91 @@
+"""
+Generation time with the list-scan validity checks (before) versus the
+row/column/box bitmasks kept by SudokuGenerator (after).
+
+    python -m benchmarks.bench_constraints [runs]
+"""
+import random
+import sys
+import time
+
+from sudoku_generator import SudokuGenerator
+
+
+class ScanningGenerator(SudokuGenerator):
+    '''
+    The original search: every candidate digit is checked by scanning the
+    row list, walking the column and looping over the box.
+    '''
+
+    def is_valid(self, row, col, num):
+        if num in self.board[row]:
+            return False
+        for r in self.board:
+            if r[col] == num:
+                return False
+        row_start = row - (row % self.box_length)
+        col_start = col - (col % self.box_length)
+        for r in range(row_start, row_start + self.box_length):
+            for c in range(col_start, col_start + self.box_length):
+                if self.board[r][c] == num:
+                    return False
+        return True
+
+    def fill_remaining(self, row, col):
+        if col >= self.row_length and row < self.row_length - 1:
+            row += 1
+            col = 0
+        if row >= self.row_length and col >= self.row_length:
+            return True
+        if row < self.box_length:
+            if col < self.box_length:
+                col = self.box_length
+        elif row < self.row_length - self.box_length:
+            if col == int(row / self.box_length) * self.box_length:
+                col += self.box_length
+        else:
+            if col == self.row_length - self.box_length:
+                row += 1
+                col = 0
+                if row >= self.row_length:
+                    return True
+
+        for num in range(1, self.row_length + 1):
+            if self.is_valid(row, col, num):
+                self.board[row][col] = num
+                if self.fill_remaining(row, col + 1):
+                    return True
+                self.board[row][col] = 0
+        return False
+
+
+def time_generation(cls, runs, size=9):
+    timings = []
+    for seed in range(runs):
+        random.seed(seed)
+        generator = cls(size, 0)
+        start = time.perf_counter()
+        generator.fill_values()
+        timings.append(time.perf_counter() - start)
+        assert generator.solution_board and all(all(row) for row in generator.solution_board)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    mean = sum(timings) / len(timings)
+    median = timings[len(timings) // 2]
+    print(f"{label:<10} mean {mean * 1000:8.3f} ms   median {median * 1000:8.3f} ms")
+    return mean
+
+
+def main(argv):
+    runs = int(argv[0]) if argv else 200
+    print(f"fill_values on 9x9, {runs} seeded runs")
+    before = report("before", time_generation(ScanningGenerator, runs))
+    after = report("after", time_generation(SudokuGenerator, runs))
+    print(f"speedup    {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
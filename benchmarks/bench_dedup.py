@@ -0,0 +1,53 @@
+"""
+Deduplication costs: canonical forms per second for puzzles with different
+numbers of empty cells, then a DedupIndex filled with random hashes,
+timing adds, lookups of new and of known hashes, and reopening.
+
+    python -m benchmarks.bench_dedup [hashes in the index]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from dedup import DedupIndex, puzzle_hash
+from sudoku_generator import generate_many
+
+
+def main(argv):
+    hashes = int(argv[0]) if len(argv) > 0 else 2_000_000
+    print(f"{'removed':<8} {'hashes/s':>9}")
+    for removed in (30, 45, 55, 60):
+        puzzles = list(generate_many(200, removed, seed=removed))
+        start = time.perf_counter()
+        for puzzle in puzzles:
+            puzzle_hash(puzzle)
+        print(f"{removed:<8} {len(puzzles) / (time.perf_counter() - start):>9.0f}")
+
+    rng = random.Random(0)
+    known = [rng.randbytes(8) for _ in range(hashes)]
+    fresh = [rng.randbytes(8) for _ in range(100_000)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "hashes.idx")
+        with DedupIndex(path, capacity=hashes) as index:
+            start = time.perf_counter()
+            for digest in known:
+                index.add_hash(digest)
+            index.merge()
+            print(f"\n{hashes} hashes, {os.path.getsize(path)} bytes on disk, "
+                  f"{len(index.bloom)} bytes of Bloom filter")
+            print(f"add         {(time.perf_counter() - start) / hashes * 1e6:6.2f} us")
+        start = time.perf_counter()
+        index = DedupIndex(path, capacity=hashes)
+        print(f"reopen      {time.perf_counter() - start:6.2f} s")
+        for label, sample in (("lookup new", fresh), ("lookup old", known[:100_000])):
+            start = time.perf_counter()
+            found = sum(index.contains_hash(digest) for digest in sample)
+            print(f"{label}  {(time.perf_counter() - start) / len(sample) * 1e6:6.2f} us"
+                  f"  ({found} found)")
+        index.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,129 @@
+"""
+Dancing Links solver versus the existing search code on a fixed corpus of
+hard 9x9 puzzles. For each puzzle we time finding the solution and proving
+it unique (counting up to two solutions). The fixed-order backtracker is
+given a node budget and reported as "gave up" when it runs out.
+
+    python -m benchmarks.bench_dlx
+"""
+import time
+
+import sudoku_dlx
+from sudoku_generator import SudokuGenerator
+
+BACKTRACK_BUDGET = 200_000
+
+HARD_PUZZLES = [
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+    "6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....",
+    "48.3............71.2.......7.5....6....2..8.............1.76...3.....4......5....",
+    "....14....3....2...7..........9...3.6.1.............8.2.....1.4....5.6.....7.8...",
+    "85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.",
+    "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97..",
+    "12..4......5.69.1...9...5.........7.7...52.9..3......2.9.6...5.4..9..8.1..3...9.4",
+    "...57..3.1......2.7...234......8...4..7..4...49....6.5.42...3.....7..9....18.....",
+    "7..1523........92....3.....1....47.8.......6............9...5.6.4.9.7...8....6.1.",
+    "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+]
+
+
+def parse(puzzle):
+    return [[0 if ch == "." else int(ch) for ch in puzzle[r * 9:r * 9 + 9]] for r in range(9)]
+
+
+def load(board):
+    generator = SudokuGenerator(9, 0)
+    for r in range(9):
+        for c in range(9):
+            if board[r][c]:
+                generator.place(r, c, board[r][c])
+    return generator
+
+
+class OutOfBudget(Exception):
+    pass
+
+
+def backtrack_count(generator, limit):
+    '''
+    The fill_remaining strategy applied to a puzzle: visit empty cells in
+    row-major order and try digits 1..9 in fixed order.
+    '''
+    empties = [(r, c) for r in range(9) for c in range(9) if generator.board[r][c] == 0]
+    found = 0
+    nodes = 0
+
+    def search(k):
+        nonlocal found, nodes
+        nodes += 1
+        if nodes > BACKTRACK_BUDGET:
+            raise OutOfBudget
+        if k == len(empties):
+            found += 1
+            return found >= limit
+        r, c = empties[k]
+        for num in range(1, 10):
+            if generator.is_valid(r, c, num):
+                generator.place(r, c, num)
+                if search(k + 1):
+                    return True
+                generator.unplace(r, c)
+        return False
+
+    search(0)
+    return found
+
+
+def timed(fn):
+    start = time.perf_counter()
+    try:
+        result = fn()
+    except OutOfBudget:
+        return None, None
+    return result, time.perf_counter() - start
+
+
+def cell(seconds):
+    return f"{'gave up':>16}" if seconds is None else f"{seconds * 1000:>14.2f}ms"
+
+
+def main():
+    engines = [
+        ("backtrack", lambda b, limit: backtrack_count(load(b), limit)),
+        ("mask-mrv", lambda b, limit: load(b).count_solutions(limit)),
+        ("dlx", lambda b, limit: sudoku_dlx.count_solutions(b, limit)),
+    ]
+    # (solve, unique) times per engine for each puzzle, None when it gave up
+    results = []
+    print(f"{'puzzle':>6} " + " ".join(f"{name + ' solve':>16} {name + ' unique':>16}" for name, _ in engines))
+    for index, puzzle in enumerate(HARD_PUZZLES):
+        board = parse(puzzle)
+        row = []
+        for name, engine in engines:
+            found, solve_time = timed(lambda: engine(board, 1))
+            count, unique_time = timed(lambda: engine(board, 2))
+            assert found in (1, None) and count in (1, None)
+            row.append((solve_time, unique_time))
+        results.append(row)
+        print(f"{index:>6} " + " ".join(f"{cell(s)} {cell(u)}" for s, u in row))
+
+    def total(times):
+        return None if None in times else sum(times)
+
+    def na(seconds):
+        return f"{'n/a':>16}" if seconds is None else cell(seconds)
+
+    columns = [[row[e] for row in results] for e in range(len(engines))]
+    print(f"{'total':>6} " + " ".join(
+        f"{na(total([s for s, _ in col]))} {na(total([u for _, u in col]))}" for col in columns))
+    finished = [row for row in results if all(None not in times for times in row)]
+    print(f"{'common':>6} " + " ".join(
+        f"{cell(sum(row[e][0] for row in finished))} {cell(sum(row[e][1] for row in finished))}"
+        for e in range(len(engines))))
+    print(f"common = the {len(finished)} puzzles every engine finished; "
+          f"n/a = an engine gave up on at least one puzzle")
+
+if __name__ == "__main__":
+    main()
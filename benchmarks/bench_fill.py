@@ -0,0 +1,91 @@
+"""
+fill_values with the old recursive row-major fill_remaining versus the
+iterative most-constrained-first search: time, digits placed (nodes) and
+placements undone (backtracks).
+
+    python -m benchmarks.bench_fill [runs] [size]
+"""
+import random
+import sys
+import time
+
+from sudoku_generator import SudokuGenerator
+
+
+class RowMajorGenerator(SudokuGenerator):
+    '''
+    The recursive fill_remaining: cells in row-major order, skipping the
+    diagonal boxes, digits in increasing order.
+    '''
+
+    def fill_remaining(self, row=0, col=None):
+        if col is None:
+            self.nodes = self.backtracks = 0
+            col = self.box_length
+        if col >= self.row_length and row < self.row_length - 1:
+            row += 1
+            col = 0
+        if row >= self.row_length and col >= self.row_length:
+            return True
+        if row < self.box_length:
+            if col < self.box_length:
+                col = self.box_length
+        elif row < self.row_length - self.box_length:
+            if col == int(row / self.box_length) * self.box_length:
+                col += self.box_length
+        else:
+            if col == self.row_length - self.box_length:
+                row += 1
+                col = 0
+                if row >= self.row_length:
+                    return True
+
+        mask = self.candidates(row, col)
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            self.place(row, col, bit.bit_length() - 1)
+            self.nodes += 1
+            if self.fill_remaining(row, col + 1):
+                return True
+            self.unplace(row, col)
+            self.backtracks += 1
+        return False
+
+    def fill_values(self):
+        self.fill_diagonal()
+        self.fill_remaining(0)
+        self.solution_board = [row[:] for row in self.board]
+
+
+def measure(cls, runs, size):
+    timings = []
+    nodes = []
+    backtracks = []
+    for seed in range(runs):
+        random.seed(seed)
+        generator = cls(size, 0)
+        start = time.perf_counter()
+        generator.fill_values()
+        timings.append(time.perf_counter() - start)
+        nodes.append(generator.nodes)
+        backtracks.append(generator.backtracks)
+    return sorted(timings), sorted(nodes), sorted(backtracks)
+
+
+def main(argv):
+    runs = int(argv[0]) if len(argv) > 0 else 200
+    size = int(argv[1]) if len(argv) > 1 else 9
+    print(f"fill_values on {size}x{size}, {runs} seeded runs")
+    print(f"{'search':<10} {'median':>10} {'p99':>10} {'max':>10} "
+          f"{'nodes avg':>10} {'nodes max':>10} {'backtracks avg':>15} {'backtracks max':>15}")
+    for label, cls in (("row-major", RowMajorGenerator), ("mrv", SudokuGenerator)):
+        timings, nodes, backtracks = measure(cls, runs, size)
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(f"{label:<10} {timings[len(timings) // 2] * 1000:>8.2f}ms {p99 * 1000:>8.2f}ms "
+              f"{timings[-1] * 1000:>8.2f}ms {sum(nodes) / runs:>10.1f} {nodes[-1]:>10} "
+              f"{sum(backtracks) / runs:>15.1f} {backtracks[-1]:>15}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
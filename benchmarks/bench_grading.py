@@ -0,0 +1,30 @@
+"""
+Batch grading throughput, and how little the number of removed cells says
+about the grade: puzzles with 30/40/50 cells removed are graded and counted
+per level.
+
+    python -m benchmarks.bench_grading [puzzles per count] [workers]
+"""
+import collections
+import sys
+import time
+
+from grading import LEVELS, grade_many
+from sudoku_generator import DIFFICULTY_REMOVED, generate_many
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 1000
+    workers = int(argv[1]) if len(argv) > 1 else 1
+    print(f"{count} puzzles per removed count, {workers} worker(s)")
+    print(f"{'removed':<8} {'per s':>8} " + " ".join(f"{level:>7}" for level in LEVELS))
+    for removed in DIFFICULTY_REMOVED.values():
+        pairs = list(generate_many(count, removed, seed=removed, solutions=True))
+        start = time.perf_counter()
+        levels = collections.Counter(result.level for result in grade_many(pairs, workers))
+        rate = count / (time.perf_counter() - start)
+        print(f"{removed:<8} {rate:>8.0f} " + " ".join(f"{levels[level]:>7}" for level in LEVELS))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,62 @@
+"""
+Hint engine latency over a fixed corpus: every puzzle is solved by taking
+hints and entering their placements, timing each next_hint call and each
+incremental candidate update.
+
+    python -m benchmarks.bench_hints [puzzles per difficulty] [size]
+"""
+import collections
+import random
+import sys
+import time
+
+from board_state import BoardState
+from generation_stats import percentile
+from hints import HintEngine, TECHNIQUES
+from sudoku_generator import SudokuGenerator, DIFFICULTY_REMOVED, removed_for
+
+
+def corpus(count, size, difficulty):
+    for seed in range(count):
+        generator = SudokuGenerator(size, removed_for(difficulty, size), rng=random.Random(seed))
+        generator.fill_values()
+        solution = generator.solution_board
+        generator.remove_cells()
+        yield generator.get_board(), solution
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 50
+    size = int(argv[1]) if len(argv) > 1 else 9
+    print(f"{size}x{size}, {count} puzzles per difficulty, times in us")
+    print(f"{'difficulty':<10} {'solved':>7} {'hints':>7} {'p50':>8} {'p99':>8} "
+          f"{'max':>8} {'update':>8}")
+    used = collections.Counter()
+    for difficulty in DIFFICULTY_REMOVED:
+        hint_times, update_times = [], []
+        solved = 0
+        for puzzle, solution in corpus(count, size, difficulty):
+            state = BoardState(puzzle, solution)
+            engine = HintEngine(state)
+            while True:
+                start = time.perf_counter()
+                hint = engine.next_hint()
+                hint_times.append(time.perf_counter() - start)
+                if hint is None:
+                    break
+                used[hint.technique] += 1
+                for index, digit in hint.placements:
+                    state.set_value(index, digit)
+                    start = time.perf_counter()
+                    engine.cell_changed(index)
+                    update_times.append(time.perf_counter() - start)
+            solved += state.is_solved()
+        print(f"{difficulty:<10} {solved:>7} {len(hint_times):>7} "
+              f"{percentile(hint_times, 50) * 1e6:>8.1f} {percentile(hint_times, 99) * 1e6:>8.1f} "
+              f"{max(hint_times) * 1e6:>8.1f} "
+              f"{sum(update_times) / len(update_times) * 1e6:>8.1f}")
+    print("techniques used: " + ", ".join(f"{name} {used[name]}" for name in TECHNIQUES))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
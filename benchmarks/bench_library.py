@@ -0,0 +1,44 @@
+"""
+Puzzle library costs: opening the file, picking a random puzzle of a level
+and, for comparison, generating one. Builds a temporary library first.
+
+    python -m benchmarks.bench_library [puzzles per difficulty]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from puzzle_library import PuzzleLibrary, write_library
+from sudoku_generator import DIFFICULTY_REMOVED, generate_game, generate_many
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "puzzles.lib")
+        write_library(path, {name: generate_many(count, removed, seed=i, solutions=True)
+                             for i, (name, removed) in enumerate(DIFFICULTY_REMOVED.items())})
+        print(f"{len(DIFFICULTY_REMOVED) * count} puzzles, {os.path.getsize(path)} bytes")
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            PuzzleLibrary(path).close()
+        print(f"open          {(time.perf_counter() - start) * 1e3:8.1f} us")
+
+        rng = random.Random(0)
+        with PuzzleLibrary(path) as library:
+            start = time.perf_counter()
+            for _ in range(100000):
+                library.pick("hard", rng)
+            print(f"pick          {(time.perf_counter() - start) * 10:8.1f} us")
+
+        start = time.perf_counter()
+        for _ in range(20):
+            generate_game("hard")
+        print(f"generate_game {(time.perf_counter() - start) / 20 * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,84 @@
+"""
+CPU use and responsiveness of the game loop headlessly (SDL dummy video
+driver): the old loop spinning on pygame.event.get() against FramePacer,
+both fed an arrow key every interval by a pygame timer so that the
+selection moves and part of the board is redrawn.
+
+    python -m benchmarks.bench_loop [seconds per loop] [ms between keys]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from frame_pacing import FramePacer, percentile
+from screen import Board
+
+KEY_EVENT = pygame.USEREVENT + 1
+
+
+def run(board, seconds, events, done):
+    position = 0
+    end = time.perf_counter() + seconds
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    while time.perf_counter() < end:
+        for event in events():
+            if event.type == KEY_EVENT:
+                position = (position + 1) % (board.size * board.size)
+                board.select(*divmod(position, board.size))
+        rects = board.draw()
+        if rects:
+            pygame.display.update(rects)
+        done(bool(rects))
+    return (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+def main(argv):
+    seconds = float(argv[0]) if len(argv) > 0 else 3
+    interval = int(argv[1]) if len(argv) > 1 else 100
+    pygame.init()
+    screen = pygame.display.set_mode((540, 600))
+    board = Board(540, 540, screen, "medium")
+    screen.fill((255, 255, 255))
+    board.draw()
+    pygame.display.flip()
+    pygame.time.set_timer(KEY_EVENT, interval)
+
+    # the spinning loop: events are handled on the first pass after they arrive
+    frame_times = []
+    latency = []
+    state = {}
+
+    def spin_events():
+        events = pygame.event.get()
+        state["start"] = time.perf_counter()
+        state["input"] = any(event.type == KEY_EVENT for event in events)
+        return events
+
+    def spin_done(shown):
+        if shown:
+            frame_times.append(time.perf_counter() - state["start"])
+            if state["input"]:
+                latency.append(time.perf_counter() - state["start"])
+
+    spin_cpu = run(board, seconds, spin_events, spin_done)
+    print(f"{'loop':<8} {'CPU':>6} {'latency p50':>12} {'p99':>8} {'frame p50':>10} {'p99':>8}")
+    print(f"{'spin':<8} {spin_cpu:>6.1%} {percentile(latency, 50) * 1e3:>10.2f}ms "
+          f"{percentile(latency, 99) * 1e3:>6.2f}ms {percentile(frame_times, 50) * 1e3:>8.2f}ms "
+          f"{percentile(frame_times, 99) * 1e3:>6.2f}ms")
+
+    pacer = FramePacer(input_events=(KEY_EVENT,))
+    paced_cpu = run(board, seconds, pacer.events, pacer.frame_done)
+    latency, frames = pacer.input_latency, pacer.frame_times
+    print(f"{'paced':<8} {paced_cpu:>6.1%} {percentile(latency, 50) * 1e3:>10.2f}ms "
+          f"{percentile(latency, 99) * 1e3:>6.2f}ms {percentile(frames, 50) * 1e3:>8.2f}ms "
+          f"{percentile(frames, 99) * 1e3:>6.2f}ms")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
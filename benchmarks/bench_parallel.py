@@ -0,0 +1,35 @@
+"""
+Throughput of generate_many at 1, 2, 4 and 8 worker processes, in boards
+per second. Also checks that every worker count produces the same puzzles
+for the same seed.
+
+    python -m benchmarks.bench_parallel [count] [removed]
+"""
+import os
+import sys
+import time
+
+from sudoku_generator import generate_many
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 400
+    removed = int(argv[1]) if len(argv) > 1 else 40
+    print(f"{count} puzzles with {removed} removed cells, {os.cpu_count()} CPU(s) available")
+    print(f"{'workers':>8} {'seconds':>10} {'boards/s':>10} {'scaling':>8}")
+    reference = None
+    base_rate = None
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        puzzles = list(generate_many(count, removed, workers=workers, seed=2024))
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = puzzles
+        assert puzzles == reference, "output depends on the worker count"
+        rate = count / elapsed
+        base_rate = base_rate or rate
+        print(f"{workers:>8} {elapsed:>10.2f} {rate:>10.1f} {rate / base_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+"""
+Per-frame cost of drawing the board headlessly (SDL dummy video driver):
+a full repaint every frame, as the game loops used to do, versus dirty-region
+drawing when idle and when one cell changes per frame. The "no glyph cache"
+row empties screen.GLYPHS before every cell, which is what a frame cost when
+Cell.draw still built its fonts and rendered its text on every call.
+The keypress rows place a cycling digit in an empty cell, which keeps
+switching the conflict highlight of its peers on and off: once for the
+state update alone and once including the redraw.
+
+    python -m benchmarks.bench_render [frames] [size]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from screen import Board, GLYPHS
+
+
+def per_frame(frames, step):
+    start = time.process_time()
+    for i in range(frames):
+        step(i)
+    return (time.process_time() - start) / frames
+
+
+def main(argv):
+    frames = int(argv[0]) if len(argv) > 0 else 300
+    size = int(argv[1]) if len(argv) > 1 else 9
+    pygame.init()
+    screen = pygame.display.set_mode((540, 600))
+    board = Board(540, 540, screen, "medium", size=size)
+
+    def full_repaint(i):
+        screen.fill((255, 255, 255))
+        board.invalidate()
+        board.draw()
+        pygame.display.flip()
+
+    def full_repaint_uncached(i):
+        screen.fill((255, 255, 255))
+        for row in board.cells:
+            for cell in row:
+                GLYPHS.clear()
+                cell.draw()
+        board.draw_grid()
+        pygame.display.flip()
+
+    def idle(i):
+        rects = board.draw()
+        if rects:
+            pygame.display.update(rects)
+
+    def move_selection(i):
+        board.select(i % size, (i // size) % size)
+        rects = board.draw()
+        if rects:
+            pygame.display.update(rects)
+
+    empty = [divmod(i, size) for i, v in enumerate(board.state.givens) if v == 0]
+
+    def place(i):
+        r, c = empty[i % len(empty)]
+        board.select(r, c)
+        board.place_number(i % size + 1)
+
+    def keypress(i):
+        place(i)
+        board.dirty.clear()
+
+    def keypress_drawn(i):
+        place(i)
+        rects = board.draw()
+        if rects:
+            pygame.display.update(rects)
+
+    full_repaint(0)
+    print(f"{size}x{size} board, {frames} frames, CPU time per frame")
+    for label, step in (("full repaint, no glyph cache", full_repaint_uncached),
+                        ("full repaint", full_repaint),
+                        ("dirty, idle", idle),
+                        ("dirty, selection move", move_selection),
+                        ("keypress, state only", keypress),
+                        ("keypress, with redraw", keypress_drawn)):
+        print(f"{label:<30} {per_frame(frames, step) * 1e6:>10.1f} us")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
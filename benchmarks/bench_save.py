@@ -0,0 +1,58 @@
+"""
+Save/resume costs: appending a move to the journal (including the periodic
+compaction into a new snapshot), writing a full snapshot and loading a game
+whose journal is nearly due for compaction.
+
+    python -m benchmarks.bench_save [moves]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from board_state import BoardState
+from save_game import COMPACT_EVERY, GameSaver, load_game
+from sudoku_generator import SudokuGenerator
+
+
+def main(argv):
+    moves = int(argv[0]) if len(argv) > 0 else 5000
+    rng = random.Random(0)
+    print(f"{'size':<6} {'move us':>8} {'save us':>8} {'load us':>8} {'bytes':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "save.bin")
+        for size in (9, 16, 25):
+            generator = SudokuGenerator(size, size * size // 2, rng=rng)
+            generator.fill_values()
+            solution = generator.solution_board
+            generator.remove_cells()
+            state = BoardState(generator.get_board(), solution)
+            saver = GameSaver(path, state, "medium")
+            open_cells = [i for i in range(size * size) if not state.is_given(i)]
+
+            start = time.perf_counter()
+            for _ in range(moves):
+                index = rng.choice(open_cells)
+                state.edit(index, rng.randint(0, size), 0)
+                saver.record_cell(index)
+            move = (time.perf_counter() - start) / moves
+
+            start = time.perf_counter()
+            for _ in range(100):
+                saver.save()
+            save = (time.perf_counter() - start) / 100
+
+            for _ in range(COMPACT_EVERY - 1):
+                saver.record_cell(rng.choice(open_cells))
+            start = time.perf_counter()
+            for _ in range(100):
+                load_game(path)
+            load = (time.perf_counter() - start) / 100
+            print(f"{size:<6} {move * 1e6:>8.1f} {save * 1e6:>8.1f} {load * 1e6:>8.1f} "
+                  f"{os.path.getsize(path):>7}")
+            saver.discard()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,55 @@
+"""
+How puzzle generation scales with the board size: fill and removal time,
+cells actually removed and peak memory (tracemalloc) for 4x4 up to 25x25,
+for every difficulty unless one is given.
+
+    python -m benchmarks.bench_scaling [difficulty] [runs]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+import sudoku_dlx
+from sudoku_generator import DIFFICULTY_REMOVED, SudokuGenerator, removed_for
+
+SIZES = (4, 9, 16, 25)
+
+
+def main(argv):
+    difficulties = [argv[0]] if len(argv) > 0 and argv[0] != "all" else list(DIFFICULTY_REMOVED)
+    runs = int(argv[1]) if len(argv) > 1 else 5
+    print(f"{runs} seeded runs per size")
+    print(f"{'level':>6} {'size':>6} {'backend':>8} {'setup':>10} {'fill':>10} {'remove':>10} "
+          f"{'total max':>10} {'removed':>12} {'peak KiB':>10}")
+    for difficulty, size in ((d, n) for d in difficulties for n in SIZES):
+        target = removed_for(difficulty, size)
+        backend = SudokuGenerator(size, 0).backend
+        # the DLX matrix is built once per size and shared, so time it apart
+        start = time.perf_counter()
+        if backend == "dlx":
+            sudoku_dlx.get_solver(size)
+        setup = time.perf_counter() - start
+        fills, removes, holes, peaks = [], [], [], []
+        for seed in range(runs):
+            tracemalloc.start()
+            generator = SudokuGenerator(size, target, rng=random.Random(seed))
+            start = time.perf_counter()
+            generator.fill_values()
+            filled = time.perf_counter()
+            generator.remove_cells()
+            done = time.perf_counter()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            fills.append(filled - start)
+            removes.append(done - filled)
+            holes.append(sum(v == 0 for row in generator.board for v in row))
+            assert generator.count_solutions(2) == 1
+        totals = [f + r for f, r in zip(fills, removes)]
+        print(f"{difficulty:>6} {size:>4}x{size:<2} {backend:>7} {setup * 1000:>8.1f}ms "
+              f"{sum(fills) / runs * 1000:>8.1f}ms {sum(removes) / runs * 1000:>8.1f}ms "
+              f"{max(totals) * 1000:>8.1f}ms {min(holes):>5}/{target:<6} {max(peaks) / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
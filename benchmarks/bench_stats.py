@@ -0,0 +1,41 @@
+"""
+Cost of generation profiling: generate_sudoku without stats against the same
+seeds with a GenerationStats attached, followed by the aggregate report.
+
+    python -m benchmarks.bench_stats [puzzles] [size]
+"""
+import random
+import sys
+import time
+
+from generation_stats import GenerationStats
+from sudoku_generator import SudokuGenerator, removed_for
+
+
+def run(count, size, removed, stats):
+    start = time.perf_counter()
+    for seed in range(count):
+        sudoku = SudokuGenerator(size, removed, rng=random.Random(seed), stats=stats)
+        sudoku.fill_values()
+        sudoku.remove_cells()
+    return time.perf_counter() - start
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 300
+    size = int(argv[1]) if len(argv) > 1 else 9
+    removed = removed_for("hard", size)
+    print(f"{count} {size}x{size} puzzles, {removed} cells removed, best of 5")
+    plain = min(run(count, size, removed, None) for _ in range(5))
+    profiled = min(run(count, size, removed, GenerationStats()) for _ in range(5))
+    print(f"{'stats off':<10} {plain / count * 1e3:>8.3f} ms/puzzle")
+    print(f"{'stats on':<10} {profiled / count * 1e3:>8.3f} ms/puzzle "
+          f"({profiled / plain - 1:+.1%})")
+    stats = GenerationStats()
+    run(count, size, removed, stats)
+    print()
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
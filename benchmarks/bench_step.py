@@ -0,0 +1,73 @@
+"""
+Stepped puzzle generation: how long GenerationTask.step() calls with a frame
+budget really take, what stepping costs against one generate_game call, and
+how soon a cancel token stops a generation running in another thread.
+
+    python -m benchmarks.bench_step [difficulty] [budget ms]
+"""
+import random
+import sys
+import threading
+import time
+
+import sudoku_dlx
+from generation_stats import percentile
+from sudoku_generator import CancelToken, GenerationCancelled, GenerationTask, generate_game
+
+SIZES = (9, 16, 25)
+
+
+def main(argv):
+    difficulty = argv[0] if len(argv) > 0 else "medium"
+    budget = float(argv[1]) / 1e3 if len(argv) > 1 else 0.005
+    for size in SIZES:
+        # built once per process; kept out of the first step
+        sudoku_dlx.get_solver(size)
+    print(f"{difficulty} puzzles, {budget * 1e3:.1f} ms budget per step")
+    print(f"{'size':<6} {'sync s':>8} {'stepped s':>10} {'steps':>7} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for size in SIZES:
+        start = time.perf_counter()
+        generate_game(difficulty, size, rng=random.Random(1))
+        sync = time.perf_counter() - start
+
+        task = GenerationTask(difficulty, size, rng=random.Random(1))
+        steps = []
+        start = time.perf_counter()
+        while True:
+            begin = time.perf_counter()
+            done = task.step(budget)
+            steps.append(time.perf_counter() - begin)
+            if done:
+                break
+        stepped = time.perf_counter() - start
+        print(f"{size:<6} {sync:>8.2f} {stepped:>10.2f} {len(steps):>7} "
+              f"{percentile(steps, 50) * 1e3:>8.2f} {percentile(steps, 99) * 1e3:>8.2f} "
+              f"{max(steps) * 1e3:>8.2f}")
+
+    print()
+    print(f"{'size':<6} {'cancel ms':>10}")
+    for size in SIZES:
+        token = CancelToken()
+        stopped = []
+
+        def run():
+            try:
+                generate_game("hard", size, rng=random.Random(2), cancel=token)
+            except GenerationCancelled:
+                stopped.append(time.perf_counter())
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        time.sleep(0.3)
+        cancelled = time.perf_counter()
+        token.cancel()
+        worker.join()
+        if stopped:
+            print(f"{size:<6} {(stopped[0] - cancelled) * 1e3:>10.2f}")
+        else:
+            print(f"{size:<6} {'finished first':>10}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,47 @@
+"""
+Time to generate unique puzzles: fill_values plus the uniqueness-checked
+remove_cells, per difficulty. Every puzzle is verified with count_solutions.
+
+    python -m benchmarks.bench_unique [runs]
+"""
+import random
+import sys
+import time
+
+from sudoku_generator import SudokuGenerator
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main(argv):
+    runs = int(argv[0]) if argv else 200
+    print(f"9x9 unique puzzle generation, {runs} seeded runs per difficulty")
+    print(f"{'removed':>8} {'phase':>8} {'median':>10} {'p95':>10} {'max':>10}")
+    for removed in (30, 40, 50):
+        fill_times = []
+        remove_times = []
+        total_times = []
+        for seed in range(runs):
+            random.seed(seed)
+            generator = SudokuGenerator(9, removed)
+            start = time.perf_counter()
+            generator.fill_values()
+            filled = time.perf_counter()
+            generator.remove_cells()
+            done = time.perf_counter()
+            fill_times.append(filled - start)
+            remove_times.append(done - filled)
+            total_times.append(done - start)
+            assert generator.count_solutions(2) == 1
+        for phase, timings in (("fill", fill_times), ("remove", remove_times), ("total", total_times)):
+            timings.sort()
+            print(f"{removed:>8} {phase:>8} "
+                  f"{percentile(timings, 0.5) * 1000:>8.2f}ms "
+                  f"{percentile(timings, 0.95) * 1000:>8.2f}ms "
+                  f"{timings[-1] * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,56 @@
+"""
+Batch validation throughput: batch_validate.validate and check_solutions
+over a large corpus (a few generated grids tiled to the requested count)
+against a per-board Python check like Board.check_board.
+
+    python -m benchmarks.bench_validate [boards]
+"""
+import sys
+import time
+
+import numpy as np
+
+from batch_validate import check_solutions, validate
+from sudoku_generator import generate_many
+
+
+def python_valid(board):
+    n = len(board)
+    b = int(n ** 0.5)
+    units = [row for row in board]
+    units += [[board[r][c] for r in range(n)] for c in range(n)]
+    units += [[board[r][c] for r in range(br, br + b) for c in range(bc, bc + b)]
+              for br in range(0, n, b) for bc in range(0, n, b)]
+    return all(sorted(unit) == list(range(1, n + 1)) for unit in units)
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 1_000_000
+    pairs = list(generate_many(500, 40, seed=0, solutions=True))
+    puzzles = np.array([p for p, _ in pairs], dtype=np.int8)
+    solutions = np.array([s for _, s in pairs], dtype=np.int8)
+    repeat = -(-count // len(pairs))
+    puzzles = np.tile(puzzles, (repeat, 1, 1))[:count]
+    solutions = np.tile(solutions, (repeat, 1, 1))[:count]
+    print(f"{count} 9x9 boards, millions of boards per minute")
+
+    start = time.perf_counter()
+    valid = validate(solutions).valid
+    print(f"validate solutions  {count / (time.perf_counter() - start) * 60 / 1e6:8.1f}"
+          f"  (all valid: {valid.all()})")
+    start = time.perf_counter()
+    validate(puzzles, complete=False)
+    print(f"validate puzzles    {count / (time.perf_counter() - start) * 60 / 1e6:8.1f}")
+    start = time.perf_counter()
+    check_solutions(puzzles, solutions)
+    print(f"check_solutions     {count / (time.perf_counter() - start) * 60 / 1e6:8.1f}")
+
+    sample = solutions[:20000].tolist()
+    start = time.perf_counter()
+    for board in sample:
+        python_valid(board)
+    print(f"python per board    {len(sample) / (time.perf_counter() - start) * 60 / 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
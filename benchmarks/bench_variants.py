@@ -0,0 +1,32 @@
+"""
+Bulk puzzle supply with symmetry variants: puzzles per second from
+generate_many when every puzzle is searched for, against deriving K - 1
+variants from each searched one (per_seed=K).
+
+    python -m benchmarks.bench_variants [puzzles] [size]
+"""
+import sys
+import time
+
+from sudoku_generator import generate_many, removed_for
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 2000
+    size = int(argv[1]) if len(argv) > 1 else 9
+    removed = removed_for("hard", size)
+    print(f"{count} {size}x{size} puzzles, {removed} cells removed")
+    print(f"{'per seed':<9} {'puzzles/s':>10} {'speedup':>8}")
+    base = None
+    for per_seed in (1, 4, 16, 64, 256):
+        start = time.perf_counter()
+        for _ in generate_many(count, removed, seed=0, size=size, solutions=True,
+                               per_seed=per_seed):
+            pass
+        rate = count / (time.perf_counter() - start)
+        base = base or rate
+        print(f"{per_seed:<9} {rate:>10.0f} {rate / base:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,194 @@
+"""
+Headless benchmark suite for generation, validation and rendering. Every
+metric is written to a JSON file and can be compared against a stored
+baseline; the run exits with status 1 if any metric regressed by more than
+the threshold.
+
+    python -m benchmarks.suite [--runs N] [--out results.json]
+                               [--baseline benchmarks/baseline.json]
+                               [--threshold 0.25] [--save-baseline]
+
+Metrics:
+    generate.<difficulty>.p50/p90/p99   generation latency in ms, seeds 0..runs-1
+    fill.nodes/backtracks.mean/max      work done by fill_values
+    board.is_full/check_board           calls per second on a solved board
+    draw.full/move                      Board.draw frame time in us
+
+Timings depend on the machine, so refresh the baseline with --save-baseline
+when moving to different hardware.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from generation_stats import percentile
+from sudoku_generator import SudokuGenerator, DIFFICULTY_REMOVED, generate_game
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def metric(value, unit, better="lower"):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def bench_generate(runs, size):
+    results = {}
+    for difficulty, removed in DIFFICULTY_REMOVED.items():
+        times = []
+        # seeded, so every run (and the baseline) times the same puzzles
+        for seed in range(runs):
+            start = time.perf_counter()
+            generator = SudokuGenerator(size, removed, rng=random.Random(seed))
+            generator.fill_values()
+            generator.remove_cells()
+            times.append((time.perf_counter() - start) * 1e3)
+        for p in (50, 90, 99):
+            results[f"generate.{difficulty}.p{p}"] = metric(percentile(times, p), "ms")
+    return results
+
+
+def bench_fill(runs, size):
+    nodes, backtracks = [], []
+    for seed in range(runs):
+        generator = SudokuGenerator(size, 0, backend="masks", rng=random.Random(seed))
+        generator.fill_values()
+        nodes.append(generator.nodes)
+        backtracks.append(generator.backtracks)
+    return {
+        "fill.nodes.mean": metric(statistics.mean(nodes), "nodes"),
+        "fill.nodes.max": metric(max(nodes), "nodes"),
+        "fill.backtracks.mean": metric(statistics.mean(backtracks), "backtracks"),
+        "fill.backtracks.max": metric(max(backtracks), "backtracks"),
+    }
+
+
+def calls_per_second(func, seconds=0.2):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(100):
+            func()
+        calls += 100
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+
+def per_frame_us(frames, step):
+    start = time.perf_counter()
+    for i in range(frames):
+        step(i)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def bench_board(frames, size):
+    import pygame
+    from board_state import BoardState
+    from screen import Board
+
+    pygame.init()
+    try:
+        screen = pygame.display.set_mode((540, 600))
+        board = Board(540, 540, screen, "medium", size=size,
+                      state=BoardState(*generate_game("medium", size, rng=random.Random(0))))
+
+        def full(i):
+            board.invalidate()
+            pygame.display.update(board.draw())
+
+        def move(i):
+            board.select(i % size, (i // size) % size)
+            pygame.display.update(board.draw())
+
+        full(0)
+        results = {
+            "draw.full": metric(per_frame_us(frames, full), "us"),
+            "draw.move": metric(per_frame_us(frames, move), "us"),
+        }
+
+        state = board.state
+        state.restore(state.solution + bytes(len(state.sketches)))
+        results["board.is_full"] = metric(calls_per_second(board.is_full), "calls/s", "higher")
+        results["board.check_board"] = metric(calls_per_second(board.check_board),
+                                              "calls/s", "higher")
+    finally:
+        pygame.quit()
+    return results
+
+
+'''
+Returns (name, baseline value, value, change) for every metric that is worse
+than its baseline by more than threshold (0.25 means 25%)
+'''
+
+
+def regressions(results, baseline, threshold):
+    found = []
+    for name, entry in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+        change = entry["value"] / base["value"] - 1
+        if entry["better"] == "higher":
+            change = -change
+        if change > threshold:
+            found.append((name, base["value"], entry["value"], change))
+    return found
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--runs", type=int, default=50, help="puzzles per difficulty")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to --baseline instead of comparing")
+    parser.add_argument("--no-render", action="store_true", help="skip the pygame metrics")
+    args = parser.parse_args(argv)
+
+    results = {}
+    results.update(bench_generate(args.runs, args.size))
+    results.update(bench_fill(args.runs, args.size))
+    if not args.no_render:
+        results.update(bench_board(args.frames, args.size))
+
+    for name, entry in results.items():
+        print(f"{name:<28} {entry['value']:>14.1f} {entry['unit']}")
+
+    report = {"size": args.size, "runs": args.runs, "metrics": results}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("size") != args.size:
+        print(f"baseline is for {baseline.get('size')}x{baseline.get('size')}, not compared")
+        return 0
+    found = regressions(results, baseline["metrics"], args.threshold)
+    for name, before, after, change in found:
+        print(f"REGRESSION {name}: {before:.1f} -> {after:.1f} ({change:+.0%})")
+    if not found:
+        print(f"no regressions over {args.threshold:.0%} against {args.baseline}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
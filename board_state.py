@@ -0,0 +1,333 @@
+"""
+Game state for one Sudoku board kept in flat byte buffers, independent of
+pygame so that it can be copied, stored and tested without a display.
+
+Cell (row, col) lives at index row * size + col of every buffer. A value of
+0 means an empty cell (or no sketch).
+"""
+import math
+from array import array
+
+# symbols shown for values 1..25; boards above 9x9 continue with letters
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+_layouts = {}
+
+
+def symbol(value):
+    return SYMBOLS[value - 1]
+
+
+'''
+Returns (units_of, unit_cells) for boards with the given row length. Units are
+numbered rows first, then columns, then boxes: units_of[index] holds the three
+units of a cell and unit_cells[unit] the indices of the cells in a unit.
+'''
+
+
+def layout(size):
+    cached = _layouts.get(size)
+    if cached is None:
+        box_length = math.isqrt(size)
+        units_of = []
+        unit_cells = [[] for _ in range(3 * size)]
+        for index in range(size * size):
+            r, c = divmod(index, size)
+            box = (r // box_length) * box_length + c // box_length
+            units = (r, size + c, 2 * size + box)
+            units_of.append(units)
+            for unit in units:
+                unit_cells[unit].append(index)
+        cached = _layouts[size] = (units_of, unit_cells)
+    return cached
+
+
+'''
+Packs one move into 30 bits: the cell index (10 bits, enough for 25x25) and
+the old and new value and sketch (5 bits each)
+'''
+
+
+def pack_move(index, old_value, value, old_sketch, sketch):
+    return index | old_value << 10 | value << 15 | old_sketch << 20 | sketch << 25
+
+
+'''
+Returns (index, old value, value, old sketch, sketch) for a packed move
+'''
+
+
+def unpack_move(move):
+    return move & 0x3FF, move >> 10 & 31, move >> 15 & 31, move >> 20 & 31, move >> 25 & 31
+
+
+class BoardState:
+    '''
+    The values, sketches, givens and solution of a game, one byte per cell.
+
+    Parameters:
+        puzzle is the starting board as a 2D list (0 for empty cells)
+        solution is the solved board as a 2D list
+        check, if True, verifies the running counts against a full scan after
+            every change (slow; meant for tests)
+
+    givens holds the starting board, so a cell is given when its givens byte
+    is non-zero. Resetting, copying and snapshotting are single buffer copies.
+    empty and wrong are running counts of empty cells and of filled cells that
+    differ from the solution, kept up to date by set_value, reset and restore
+    so that is_full and is_solved are O(1). digit_counts holds, for every row,
+    column and box, how many times each digit appears (at unit * (size + 1) +
+    digit), which makes is_conflict O(1) too. Write values through those
+    methods rather than into the buffer directly.
+
+    Player moves made with edit() are kept for undo() and redo() as one
+    packed 4-byte delta each (see pack_move), so history costs a few bytes
+    per move and both operations are O(1) however long it gets.
+    '''
+
+    def __init__(self, puzzle, solution, check=False):
+        self.size = len(puzzle)
+        self.givens = bytes(v for row in puzzle for v in row)
+        self.solution = bytes(v for row in solution for v in row)
+        self.values = bytearray(self.givens)
+        self.sketches = bytearray(len(self.givens))
+        self.units_of, self.unit_cells = layout(self.size)
+        self.check = check
+        self.recount()
+        self.given_counts = bytes(self.digit_counts)
+        self.history = array("I")
+        self.redo_moves = array("I")
+
+    '''
+    Builds a BoardState straight from its byte buffers (as written by
+    save_game), without going through 2D lists
+    '''
+
+    @classmethod
+    def from_buffers(cls, size, givens, solution, values, sketches):
+        state = cls.__new__(cls)
+        state.size = size
+        state.givens = bytes(givens)
+        state.solution = bytes(solution)
+        state.values = bytearray(givens)
+        state.sketches = bytearray(sketches)
+        state.units_of, state.unit_cells = layout(size)
+        state.check = False
+        state.recount()
+        state.given_counts = bytes(state.digit_counts)
+        state.values[:] = values
+        state.recount()
+        state.history = array("I")
+        state.redo_moves = array("I")
+        return state
+
+    def index(self, row, col):
+        return row * self.size + col
+
+    def is_given(self, index):
+        return self.givens[index] != 0
+
+    '''
+    Sets the value of a cell and updates every running count. Returns the
+    (unit, digit) pairs whose count crossed between one and two, i.e. the
+    units where other cells holding digit started or stopped conflicting.
+    '''
+
+    def set_value(self, index, value):
+        old = self.values[index]
+        if old == value:
+            return []
+        answer = self.solution[index]
+        if old == 0:
+            self.empty -= 1
+        elif old != answer:
+            self.wrong -= 1
+        if value == 0:
+            self.empty += 1
+        elif value != answer:
+            self.wrong += 1
+        self.values[index] = value
+
+        crossed = []
+        counts = self.digit_counts
+        stride = self.size + 1
+        for unit in self.units_of[index]:
+            if old:
+                k = unit * stride + old
+                counts[k] -= 1
+                if counts[k] == 1:
+                    crossed.append((unit, old))
+            if value:
+                k = unit * stride + value
+                counts[k] += 1
+                if counts[k] == 2:
+                    crossed.append((unit, value))
+        if self.check:
+            self.verify_counts()
+        return crossed
+
+    '''
+    Returns True if the value of a cell also appears in its row, column or box
+    '''
+
+    def is_conflict(self, index):
+        value = self.values[index]
+        if not value:
+            return False
+        counts = self.digit_counts
+        stride = self.size + 1
+        for unit in self.units_of[index]:
+            if counts[unit * stride + value] > 1:
+                return True
+        return False
+
+    def set_sketch(self, index, value):
+        self.sketches[index] = value
+
+    '''
+    Makes a player move: sets the value and sketch of a cell, records the
+    move for undo() and drops anything that could have been redone.
+    Returns what set_value returned.
+    '''
+
+    def edit(self, index, value, sketch):
+        old_value, old_sketch = self.values[index], self.sketches[index]
+        if (old_value, old_sketch) == (value, sketch):
+            return []
+        self.history.append(pack_move(index, old_value, value, old_sketch, sketch))
+        if self.redo_moves:
+            del self.redo_moves[:]
+        self.sketches[index] = sketch
+        return self.set_value(index, value)
+
+    '''
+    Takes back the last move. Returns (index, crossed) for the cell that
+    changed, crossed being what set_value returned, or None if there is
+    nothing to undo.
+    '''
+
+    def undo(self):
+        if not self.history:
+            return None
+        move = self.history.pop()
+        self.redo_moves.append(move)
+        index, old_value, _, old_sketch, _ = unpack_move(move)
+        self.sketches[index] = old_sketch
+        return index, self.set_value(index, old_value)
+
+    '''
+    Makes the last undone move again, with the same result as undo()
+    '''
+
+    def redo(self):
+        if not self.redo_moves:
+            return None
+        move = self.redo_moves.pop()
+        self.history.append(move)
+        index, _, value, _, sketch = unpack_move(move)
+        self.sketches[index] = sketch
+        return index, self.set_value(index, value)
+
+    def clear_history(self):
+        del self.history[:]
+        del self.redo_moves[:]
+
+    '''
+    Puts every cell back to its given value and clears all sketches and the
+    undo history
+    '''
+
+    def reset(self):
+        self.values[:] = self.givens
+        self.sketches[:] = bytes(len(self.sketches))
+        self.digit_counts[:] = self.given_counts
+        self.empty = self.givens.count(0)
+        self.wrong = 0
+        self.clear_history()
+        if self.check:
+            self.verify_counts()
+
+    '''
+    Returns the player's progress (values then sketches) as one bytes object
+    '''
+
+    def snapshot(self):
+        return bytes(self.values + self.sketches)
+
+    '''
+    Restores progress saved by snapshot(); the undo history is cleared
+    '''
+
+    def restore(self, snapshot):
+        area = len(self.values)
+        self.values[:] = snapshot[:area]
+        self.sketches[:] = snapshot[area:]
+        self.recount()
+        self.clear_history()
+
+    def copy(self):
+        state = BoardState.__new__(BoardState)
+        state.size = self.size
+        state.givens = self.givens
+        state.solution = self.solution
+        state.values = bytearray(self.values)
+        state.sketches = bytearray(self.sketches)
+        state.check = self.check
+        state.units_of = self.units_of
+        state.unit_cells = self.unit_cells
+        state.given_counts = self.given_counts
+        state.empty = self.empty
+        state.wrong = self.wrong
+        state.digit_counts = bytearray(self.digit_counts)
+        state.history = array("I", self.history)
+        state.redo_moves = array("I", self.redo_moves)
+        return state
+
+    '''
+    Recomputes empty, wrong and digit_counts with a full scan of the values
+    '''
+
+    def recount(self):
+        self.empty = self.values.count(0)
+        self.wrong = sum(1 for value, answer in zip(self.values, self.solution)
+                         if value and value != answer)
+        stride = self.size + 1
+        counts = bytearray(3 * self.size * stride)
+        for index, value in enumerate(self.values):
+            if value:
+                for unit in self.units_of[index]:
+                    counts[unit * stride + value] += 1
+        self.digit_counts = counts
+
+    '''
+    Raises AssertionError if the running counts disagree with a full scan
+    '''
+
+    def verify_counts(self):
+        empty, wrong, counts = self.empty, self.wrong, self.digit_counts
+        self.recount()
+        assert (empty, wrong) == (self.empty, self.wrong), \
+            f"running counts {(empty, wrong)} != scanned {(self.empty, self.wrong)}"
+        assert counts == self.digit_counts, "running digit counts differ from a scan"
+
+    '''
+    Returns buffer (values by default) as a 2D list like the generator's boards
+    '''
+
+    def grid(self, buffer=None):
+        if buffer is None:
+            buffer = self.values
+        n = self.size
+        return [list(buffer[r * n:(r + 1) * n]) for r in range(n)]
+
+    def find_empty(self):
+        index = self.values.find(0)
+        if index < 0:
+            return None
+        return divmod(index, self.size)
+
+    def is_full(self):
+        return self.empty == 0
+
+    def is_solved(self):
+        return self.empty == 0 and self.wrong == 0
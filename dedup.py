@@ -0,0 +1,359 @@
+"""
+Duplicate detection for puzzle corpora. Two puzzles count as the same when
+one is a symmetry transform of the other (see transforms.py), so every
+puzzle is first mapped to a canonical form: the smallest board, read row by
+row with 0 for empty cells, over all transforms. puzzle_hash reduces that to
+8 bytes, and DedupIndex remembers hashes on disk.
+
+canonical_form finds the minimum without trying all 3 million transforms.
+In a valid puzzle the digits of a row are distinct, so after relabelling a
+row reads as its pattern of empty and filled cells with labels counting up;
+the smallest first row is therefore the row (of any orientation) with the
+most empty cells, with its columns ordered to put the empty cells first. Only
+the column orders that achieve it are kept, and each later row is picked,
+among the rows the band structure still allows, to be the smallest for some
+surviving candidate. Candidates that fall behind are dropped row by row.
+"""
+import hashlib
+import heapq
+import itertools
+import math
+import mmap
+import os
+import struct
+
+# hash bytes kept per puzzle
+HASH_SIZE = 8
+
+# new hashes kept in memory before they are merged into the sorted file
+MERGE_EVERY = 1 << 20
+
+# Bloom filter bits per expected puzzle and probes per lookup; about 1%
+# false positives, which only cost a binary search of the hash file
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_PROBES = 7
+
+# header of the saved Bloom filter: magic, hashes in the file it covers, capacity
+BLOOM_HEADER = struct.Struct("<4sQQ")
+BLOOM_MAGIC = b"SUDB"
+
+
+def _flatten(grid):
+    if isinstance(grid, (bytes, bytearray)):
+        return bytes(grid)
+    return bytes(v for row in grid for v in row)
+
+
+def _transpose(flat, size):
+    return bytes(flat[c * size + r] for r in range(size) for c in range(size))
+
+
+'''
+Returns every column order (a list of column indices) that puts the empty
+cells of row first: stacks with more empty cells first, and within a stack
+the empty columns before the filled ones. Ties are all returned, since later
+rows decide between them.
+'''
+
+
+def _column_orders(row, size, box_length):
+    stacks = []
+    for stack in range(box_length):
+        cols = range(stack * box_length, (stack + 1) * box_length)
+        empty = [c for c in cols if not row[c]]
+        filled = [c for c in cols if row[c]]
+        inner = [list(a + b) for a in itertools.permutations(empty)
+                 for b in itertools.permutations(filled)]
+        stacks.append((len(empty), inner))
+    # stacks with the same number of empty cells may come in either order
+    groups = [list(group) for _, group in
+              itertools.groupby(sorted(stacks, key=lambda s: -s[0]), key=lambda s: s[0])]
+    group_orders = [list(itertools.permutations(group)) for group in groups]
+    orders = []
+    for stack_order in itertools.product(*group_orders):
+        chosen = [inner for group in stack_order for _, inner in group]
+        for inner_order in itertools.product(*chosen):
+            orders.append([c for cols in inner_order for c in cols])
+    return orders
+
+
+def _empty_key(row, box_length):
+    counts = sorted((row[s * box_length:(s + 1) * box_length].count(0)
+                     for s in range(box_length)), reverse=True)
+    return [-count for count in counts]
+
+
+'''
+Returns the canonical form of puzzle (a 2D list or flat bytes) as bytes, one
+byte per cell: the same for every symmetry transform of the puzzle and
+different for puzzles that are not transforms of each other. Meant for
+valid puzzles of up to 9x9; the search grows quickly with the board size and
+with the number of filled cells in the emptiest rows, so full solution grids
+are much slower than puzzles.
+'''
+
+
+def canonical_form(puzzle):
+    flat = _flatten(puzzle)
+    size = math.isqrt(len(flat))
+    box_length = math.isqrt(size)
+    boards = (flat, _transpose(flat, size))
+
+    starts = [(board, r) for board in boards for r in range(size)]
+    keys = [_empty_key(board[r * size:(r + 1) * size], box_length) for board, r in starts]
+    best_key = min(keys)
+    # candidate: (board, rows used so far, column order, labels, next label)
+    candidates = []
+    for (board, r), key in zip(starts, keys):
+        if key != best_key:
+            continue
+        row = board[r * size:(r + 1) * size]
+        for cols in _column_orders(row, size, box_length):
+            labels = [0] * (size + 1)
+            label = 1
+            for c in cols:
+                if row[c]:
+                    labels[row[c]] = label
+                    label += 1
+            candidates.append((board, (r,), cols, labels, label))
+    first = candidates[0]
+    result = bytearray(first[3][first[0][first[1][0] * size + c]] for c in first[2])
+
+    for depth in range(1, size):
+        best = None
+        survivors = []
+        for board, rows, cols, labels, label in candidates:
+            if depth % box_length:
+                band = rows[-1] // box_length
+                options = range(band * box_length, (band + 1) * box_length)
+            else:
+                used = {row // box_length for row in rows}
+                options = [r for r in range(size) if r // box_length not in used]
+            for r in options:
+                if r in rows:
+                    continue
+                start = r * size
+                new_labels = None
+                next_label = label
+                out = bytearray(size)
+                # while still equal to best, stop as soon as the row gets bigger
+                tied = best is not None
+                for i, c in enumerate(cols):
+                    value = board[start + c]
+                    if value:
+                        mapped = labels[value] if new_labels is None else new_labels[value]
+                        if not mapped:
+                            if new_labels is None:
+                                new_labels = labels[:]
+                            mapped = new_labels[value] = next_label
+                            next_label += 1
+                        out[i] = mapped
+                    if tied and out[i] != best[i]:
+                        if out[i] > best[i]:
+                            break
+                        tied = False
+                else:
+                    if not tied:
+                        best = out
+                        survivors = []
+                    survivors.append((board, rows + (r,), cols,
+                                      labels if new_labels is None else new_labels, next_label))
+        result += best
+        candidates = survivors
+    return bytes(result)
+
+
+'''
+Returns the 8-byte blake2b hash of the canonical form of puzzle
+'''
+
+
+def puzzle_hash(puzzle):
+    return hashlib.blake2b(canonical_form(puzzle), digest_size=HASH_SIZE).digest()
+
+
+class DedupIndex:
+    '''
+    A set of puzzle hashes kept on disk, for checking whether a puzzle (or a
+    symmetry transform of it) was seen before.
+
+    Parameters:
+        path is the file of sorted 8-byte hashes; it is created if missing
+        capacity is the number of puzzles the Bloom filter is sized for; it
+            grows when the index outgrows it
+
+    Hashes live in the sorted file, read through mmap, plus up to
+    MERGE_EVERY new ones in memory that merge() writes into it (also done
+    by close()). A Bloom filter in front answers most lookups for unseen
+    puzzles without touching the file. It is saved next to the file (path +
+    ".bloom") after every merge and rebuilt from the file if that copy is
+    missing or stale, so memory stays at about 10 bits per puzzle plus the
+    unmerged hashes.
+    '''
+
+    def __init__(self, path, capacity=1 << 20):
+        self.path = path
+        self.pending = set()
+        self.duplicates = 0
+        self._map = None
+        self.count = 0
+        self.bloom_path = path + ".bloom"
+        self._open_file()
+        if not self._load_bloom():
+            self._build_bloom(max(capacity, 2 * self.count))
+            self._save_bloom()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+    def __contains__(self, puzzle):
+        return self.contains_hash(puzzle_hash(puzzle))
+
+    def _open_file(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if not os.path.exists(self.path):
+            open(self.path, "wb").close()
+        size = os.path.getsize(self.path)
+        self.count = size // HASH_SIZE
+        if size:
+            with open(self.path, "rb") as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _build_bloom(self, capacity):
+        self.capacity = capacity
+        self.bloom_bits = capacity * BLOOM_BITS_PER_ENTRY
+        self.bloom = bytearray((self.bloom_bits + 7) // 8)
+        for start in range(0, self.count * HASH_SIZE, HASH_SIZE):
+            self._bloom_add(self._map[start:start + HASH_SIZE])
+        for digest in self.pending:
+            self._bloom_add(digest)
+
+    def _load_bloom(self):
+        try:
+            with open(self.bloom_path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return False
+        if len(data) < BLOOM_HEADER.size:
+            return False
+        magic, count, capacity = BLOOM_HEADER.unpack_from(data)
+        bits = capacity * BLOOM_BITS_PER_ENTRY
+        if (magic, count) != (BLOOM_MAGIC, self.count) or \
+                len(data) != BLOOM_HEADER.size + (bits + 7) // 8:
+            return False
+        self.capacity = capacity
+        self.bloom_bits = bits
+        self.bloom = bytearray(data[BLOOM_HEADER.size:])
+        return True
+
+    # saved next to the hash file so reopening a big index skips the rebuild;
+    # it only covers the merged hashes, which is all a reopened index has
+    def _save_bloom(self):
+        temp = self.bloom_path + ".tmp"
+        with open(temp, "wb") as file:
+            file.write(BLOOM_HEADER.pack(BLOOM_MAGIC, self.count, self.capacity))
+            file.write(self.bloom)
+        os.replace(temp, self.bloom_path)
+
+    def _probes(self, digest):
+        # double hashing on the two halves of the (already random) digest
+        value = int.from_bytes(digest, "big")
+        h1, h2 = value >> 32, value & 0xFFFFFFFF | 1
+        return ((h1 + i * h2) % self.bloom_bits for i in range(BLOOM_PROBES))
+
+    def _bloom_add(self, digest):
+        for bit in self._probes(digest):
+            self.bloom[bit >> 3] |= 1 << (bit & 7)
+
+    def _in_file(self, digest):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found = self._map[mid * HASH_SIZE:(mid + 1) * HASH_SIZE]
+            if found < digest:
+                lo = mid + 1
+            elif found > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains_hash(self, digest):
+        bloom = self.bloom
+        for bit in self._probes(digest):
+            if not bloom[bit >> 3] & 1 << (bit & 7):
+                return False
+        return digest in self.pending or self._in_file(digest)
+
+    '''
+    Adds a hash; returns False if it was already in the index
+    '''
+
+    def add_hash(self, digest):
+        if self.contains_hash(digest):
+            return False
+        self.pending.add(digest)
+        self._bloom_add(digest)
+        if len(self.pending) >= MERGE_EVERY:
+            self.merge()
+        return True
+
+    '''
+    Adds puzzle; returns False if it (or a transform of it) was already there
+    '''
+
+    def add(self, puzzle):
+        return self.add_hash(puzzle_hash(puzzle))
+
+    '''
+    Yields the items of a stream that are new to the index, adding them as
+    it goes, and counts the others in duplicates. Items are puzzles or
+    (puzzle, solution) pairs.
+    '''
+
+    def filter(self, items):
+        for item in items:
+            if self.add(item[0] if isinstance(item, tuple) else item):
+                yield item
+            else:
+                self.duplicates += 1
+
+    '''
+    Writes the hashes held in memory into the sorted file, merging the two
+    sorted runs into a new file that replaces the old one
+    '''
+
+    def merge(self):
+        if not self.pending:
+            return
+        new = sorted(self.pending)
+        temp = self.path + ".tmp"
+        with open(temp, "wb") as out:
+            old = (self._map[i:i + HASH_SIZE] for i in range(0, self.count * HASH_SIZE, HASH_SIZE))
+            merged = heapq.merge(old, new)
+            while chunk := b"".join(itertools.islice(merged, 4096)):
+                out.write(chunk)
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        os.replace(temp, self.path)
+        self.pending = set()
+        self._open_file()
+        if self.count > self.capacity:
+            self._build_bloom(2 * self.count)
+        self._save_bloom()
+
+    def close(self):
+        self.merge()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
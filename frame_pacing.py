@@ -0,0 +1,106 @@
+"""
+Event-driven frame pacing for the pygame loops, with latency statistics.
+
+Instead of spinning on pygame.event.get(), a loop asks FramePacer.events()
+for its events: while nothing is animating that blocks in pygame.event.wait
+until something happens, so a static screen costs no CPU, and while
+animating it caps the frame rate with Clock.tick. Input wakes the loop at
+once either way.
+
+The pacer also records how long it takes from reading an input event to
+the screen update that shows its effect, and how long every drawn frame
+took to produce. SDL events carry no timestamps, so latency is measured
+from the moment the loop woke up with the event, which with a blocking
+wait is as soon as SDL queued it.
+"""
+import collections
+import time
+
+import pygame
+
+from generation_stats import percentile
+
+# events whose effect on screen counts towards the input latency
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION)
+
+# samples kept for the percentiles
+HISTORY = 10000
+
+
+class FramePacer:
+    '''
+    Hands a loop its events and records frame statistics.
+
+    Parameters:
+        fps is the frame rate cap while animating
+        input_events are the event types whose latency is recorded
+
+    Call events() at the top of every loop iteration and frame_done() at
+    the end, saying whether the screen was updated. Set animating while
+    something on screen changes by itself. input_latency and frame_times
+    hold the last HISTORY samples, in seconds.
+    '''
+
+    def __init__(self, fps=60, input_events=INPUT_EVENTS):
+        self.fps = fps
+        self.input_events = input_events
+        self.animating = False
+        self.clock = pygame.time.Clock()
+        self.input_latency = collections.deque(maxlen=HISTORY)
+        self.frame_times = collections.deque(maxlen=HISTORY)
+        self.wakeups = 0
+        self._input_at = None
+        self._frame_start = None
+        self._started = (time.perf_counter(), time.process_time())
+
+    '''
+    Returns the events to handle, waiting for the first one if nothing is
+    animating, or for the next frame if something is
+    '''
+
+    def events(self):
+        if self.animating:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+        else:
+            events = [pygame.event.wait()]
+            events.extend(pygame.event.get())
+        now = time.perf_counter()
+        self.wakeups += 1
+        self._frame_start = now
+        # a loop left without frame_done (e.g. to change screens) starts afresh
+        self._input_at = now if any(event.type in self.input_events for event in events) else None
+        return events
+
+    '''
+    Ends a loop iteration. shown is True if the screen was updated; the
+    input read by the events() call of this iteration then counts as shown.
+    Input that changed nothing on screen is not counted at all.
+    '''
+
+    def frame_done(self, shown):
+        if shown:
+            now = time.perf_counter()
+            if self._frame_start is not None:
+                self.frame_times.append(now - self._frame_start)
+            if self._input_at is not None:
+                self.input_latency.append(now - self._input_at)
+        self._input_at = None
+        self._frame_start = None
+
+    '''
+    Returns the share of one core used by the process since the pacer was
+    created, between 0 and 1
+    '''
+
+    def cpu_share(self):
+        wall = time.perf_counter() - self._started[0]
+        return (time.process_time() - self._started[1]) / wall if wall else 0.0
+
+    def report(self):
+        latency, frames = self.input_latency, self.frame_times
+        return (f"input latency p50 {percentile(latency, 50) * 1e3:.2f} ms "
+                f"p99 {percentile(latency, 99) * 1e3:.2f} ms ({len(latency)} inputs), "
+                f"frame time p50 {percentile(frames, 50) * 1e3:.2f} ms "
+                f"p99 {percentile(frames, 99) * 1e3:.2f} ms ({len(frames)} frames), "
+                f"{self.wakeups} wakeups, {self.cpu_share():.1%} CPU")
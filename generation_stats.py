@@ -0,0 +1,103 @@
+"""
+Opt-in profiling of puzzle generation. A SudokuGenerator given a
+GenerationStats (stats=...) times its phases and counts the work its
+searches do; without one it only pays a None check per phase and per search.
+One GenerationStats can be shared by many generators, or merged from
+several, to report on a whole batch.
+"""
+from array import array
+from collections import Counter
+
+# timed phases, in the order they run
+PHASES = ("fill_diagonal", "fill_remaining", "remove_cells")
+
+# counters, with what they count:
+#   boards            solved boards made by fill_values
+#   fill_restarts     fill_remaining runs that hit node_limit and started over
+#   searches          runs of the mask search (filling or counting solutions)
+#   nodes             digits placed by those searches
+#   backtracks        placements they undid
+#   candidate_checks  candidate masks they computed while picking a cell
+#   removal_attempts  cells remove_cells tried to empty
+#   forced_removals   removals accepted without a search (see is_forced)
+#   removal_retries   removals undone because the puzzle stopped being unique
+COUNTERS = ("boards", "fill_restarts", "searches", "nodes", "backtracks", "candidate_checks",
+            "removal_attempts", "forced_removals", "removal_retries")
+
+
+'''
+Returns the p-th percentile (0-100) of values by nearest rank, or 0.0 if
+there are none. Plain Python, so the frame pacer and the benchmarks share it
+without pulling in pygame.
+'''
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+class GenerationStats:
+    '''
+    Timings and counters collected by the generators it is given to.
+
+    Parameters:
+        callback, if given, is called as callback(phase, seconds, counts)
+            every time a phase finishes, counts being a Counter of what the
+            phase added to counters; use it to feed a metrics pipeline
+
+    times maps every phase to an array of the durations of its runs, in
+    seconds, and counters is a Counter over COUNTERS. The dlx backend does
+    its own searching, so with it only the timings and board and removal
+    counts are filled in.
+    '''
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.times = {phase: array("d") for phase in PHASES}
+        self.counters = Counter()
+
+    '''
+    Returns the counters as they are now, to pass to end() when the phase
+    finishes
+    '''
+
+    def begin(self):
+        return self.counters.copy()
+
+    '''
+    Records a finished run of phase that took seconds, and calls the
+    callback with what it counted since begin() returned before
+    '''
+
+    def end(self, phase, seconds, before):
+        self.times[phase].append(seconds)
+        if self.callback is not None:
+            self.callback(phase, seconds, self.counters - before)
+
+    '''
+    Adds the timings and counters of other (e.g. from a worker process)
+    '''
+
+    def merge(self, other):
+        for phase, times in other.times.items():
+            self.times[phase].extend(times)
+        self.counters.update(other.counters)
+
+    def report(self):
+        boards = self.counters["boards"] or 1
+        lines = [f"{'phase':<15} {'runs':>8} {'total s':>9} {'mean ms':>9} "
+                 f"{'p50 ms':>8} {'p99 ms':>8}"]
+        for phase, times in self.times.items():
+            total = sum(times)
+            mean = total / len(times) if times else 0.0
+            lines.append(f"{phase:<15} {len(times):>8} {total:>9.3f} {mean * 1e3:>9.3f} "
+                         f"{percentile(times, 50) * 1e3:>8.3f} "
+                         f"{percentile(times, 99) * 1e3:>8.3f}")
+        lines.append(f"{'counter':<17} {'total':>12} {'per board':>10}")
+        for name in COUNTERS:
+            value = self.counters[name]
+            lines.append(f"{name:<17} {value:>12} {value / boards:>10.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,94 @@
+"""
+Difficulty grading by the techniques a person needs to solve a puzzle.
+
+A puzzle is solved with the hint engine, always using the easiest technique
+that makes progress. Its level is set by the hardest technique it needed:
+
+    easy     naked singles only
+    medium   hidden singles as well
+    hard     pairs, pointing pairs or box-line reductions
+    expert   not solvable with those techniques
+"""
+import multiprocessing
+from collections import Counter, namedtuple
+
+import sudoku_dlx
+from board_state import BoardState
+from hints import HintEngine, TECHNIQUES
+
+LEVELS = ("easy", "medium", "hard", "expert")
+
+# level reached by needing each technique
+TECHNIQUE_LEVEL = {"naked single": 0, "hidden single": 1, "naked pair": 2,
+                   "hidden pair": 2, "pointing pair": 2, "box-line reduction": 2}
+
+# points per use; harder steps cost more
+TECHNIQUE_WEIGHT = {"naked single": 1, "hidden single": 2, "naked pair": 10,
+                    "hidden pair": 15, "pointing pair": 12, "box-line reduction": 15}
+
+# level is the main part of the score, so scores of different levels never overlap
+LEVEL_SCORE = 1000
+
+# One graded puzzle: level is one of LEVELS, hardest the hardest technique
+# used (None if no step was needed), counts a Counter of technique uses and
+# score an int that orders puzzles by difficulty within and across levels.
+Grade = namedtuple("Grade", "level score hardest counts")
+
+
+'''
+Grades puzzle (a 2D list, 0 for empty cells). solution is found with the
+DLX solver if it is not given.
+'''
+
+
+def grade(puzzle, solution=None):
+    if solution is None:
+        solution = sudoku_dlx.solve(puzzle)
+    state = BoardState(puzzle, solution)
+    engine = HintEngine(state)
+    counts = Counter()
+    hardest = None
+    while True:
+        singles = engine.place_naked_singles()
+        if singles:
+            counts["naked single"] += singles
+            hardest = hardest or "naked single"
+        hint = engine.next_hint()
+        if hint is None:
+            break
+        counts[hint.technique] += 1
+        if hardest is None or TECHNIQUES.index(hint.technique) > TECHNIQUES.index(hardest):
+            hardest = hint.technique
+        for index, digit in hint.placements:
+            state.set_value(index, digit)
+            engine.cell_changed(index)
+
+    if not state.is_solved():
+        level = len(LEVELS) - 1
+    elif hardest is None:
+        level = 0
+    else:
+        level = TECHNIQUE_LEVEL[hardest]
+    score = level * LEVEL_SCORE + sum(TECHNIQUE_WEIGHT[name] * used
+                                      for name, used in counts.items())
+    return Grade(LEVELS[level], min(score, (level + 1) * LEVEL_SCORE - 1), hardest, counts)
+
+
+def _grade_job(job):
+    return grade(*job)
+
+
+'''
+Grades many puzzles, optionally spread over worker processes like
+generate_many. puzzles is an iterable of puzzles or of (puzzle, solution)
+pairs. Yields a Grade per puzzle, in order.
+'''
+
+
+def grade_many(puzzles, workers=1, chunksize=64):
+    jobs = (item if isinstance(item, tuple) else (item,) for item in puzzles)
+    if workers <= 1:
+        yield from map(_grade_job, jobs)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(_grade_job, jobs, chunksize)
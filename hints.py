@@ -0,0 +1,334 @@
+"""
+Hint engine that finds the next step a person could make on a BoardState,
+using the usual pencil-and-paper techniques instead of a search.
+
+Every empty cell has a candidate bitset (bit d set = digit d still possible)
+which is kept up to date incrementally: after an edit only the row, column
+and box of the changed cell are recomputed. The techniques that look at
+where a digit can go work on cell bitsets instead (bit i set = cell index i),
+so checking a whole unit for a digit is a single AND.
+"""
+import math
+from collections import namedtuple
+
+from board_state import symbol
+
+# One deduction. technique is one of TECHNIQUES (or "mistake"), placements
+# and eliminations are lists of (cell index, digit), cells are the cells the
+# deduction is based on and reason explains it in words.
+Hint = namedtuple("Hint", "technique placements eliminations cells reason")
+
+# in the order they are tried, easiest first
+TECHNIQUES = ("naked single", "hidden single", "naked pair", "hidden pair",
+              "pointing pair", "box-line reduction")
+
+
+def bits(mask):
+    while mask:
+        bit = mask & -mask
+        yield bit.bit_length() - 1
+        mask ^= bit
+
+
+_tables = {}
+
+
+'''
+Returns (peers, unit_bits, overlaps) for the board size of state, built once
+per size. peers[index] lists the other cells that share a unit with a cell,
+unit_bits[unit] is the cell bitset of a unit and overlaps[unit] lists (kind,
+other unit, shared cells) for every box crossing a row or column and every
+row or column crossing a box.
+'''
+
+
+def tables(state):
+    cached = _tables.get(state.size)
+    if cached is None:
+        peers = [sorted({peer for unit in units for peer in state.unit_cells[unit]} - {index})
+                 for index, units in enumerate(state.units_of)]
+        unit_bits = [sum(1 << index for index in cells) for cells in state.unit_cells]
+        overlaps = []
+        for unit, cells in enumerate(state.unit_cells):
+            boxes = unit >= 2 * state.size
+            shared = {}
+            for index in cells:
+                for kind, other in enumerate(state.units_of[index]):
+                    if other != unit and (kind == 2) != boxes:
+                        shared[kind, other] = shared.get((kind, other), 0) | 1 << index
+            overlaps.append([(kind, other, mask) for (kind, other), mask in shared.items()])
+        cached = _tables[state.size] = (peers, unit_bits, overlaps)
+    return cached
+
+
+class HintEngine:
+    '''
+    Gives logical hints for a BoardState.
+
+    Parameters:
+        state is the BoardState to watch; call cell_changed(index) after every
+            change to one of its values and rebuild() after a reset or restore
+
+    Placements are only suggested; the player makes them. Eliminations cannot
+    be entered on the board, so next_hint() records the ones it reports and
+    later hints build on them. They are forgotten whenever a digit is taken
+    off the board, since they may have depended on it.
+    '''
+
+    def __init__(self, state):
+        self.state = state
+        self.size = state.size
+        self.box_length = math.isqrt(state.size)
+        self.full_mask = ((1 << state.size) - 1) << 1
+        self.peers, self.unit_bits, self.overlaps = tables(state)
+        self.rebuild()
+
+    '''
+    Recomputes every unit mask and candidate set from the state
+    '''
+
+    def rebuild(self):
+        state = self.state
+        area = len(state.values)
+        self.values = bytearray(state.values)
+        masks = self.unit_masks = [0] * (3 * self.size)
+        units_of = state.units_of
+        for index, value in enumerate(self.values):
+            if value:
+                r, c, b = units_of[index]
+                masks[r] |= 1 << value
+                masks[c] |= 1 << value
+                masks[b] |= 1 << value
+        self.eliminated = [0] * area
+        self._recompute()
+        # set once next_hint found nothing, until the board changes again
+        self.stuck = False
+
+    def _recompute(self):
+        masks = self.unit_masks
+        full = self.full_mask
+        self.candidates = [0 if value else full & ~(masks[r] | masks[c] | masks[b] | eliminated)
+                           for value, (r, c, b), eliminated
+                           in zip(self.values, self.state.units_of, self.eliminated)]
+        # cells that may have a single candidate left; naked_single checks them
+        self.singles = [i for i, mask in enumerate(self.candidates)
+                        if mask and not mask & (mask - 1)]
+
+    def _candidates(self, index):
+        if self.values[index]:
+            return 0
+        r, c, b = self.state.units_of[index]
+        masks = self.unit_masks
+        return self.full_mask & ~(masks[r] | masks[c] | masks[b] | self.eliminated[index])
+
+    '''
+    Brings the candidates up to date after the value of one cell changed
+    '''
+
+    def cell_changed(self, index):
+        state = self.state
+        old, value = self.values[index], state.values[index]
+        if old == value:
+            return
+        self.values[index] = value
+        self.stuck = False
+        stride = self.size + 1
+        units = state.units_of[index]
+        for unit in units:
+            if old and not state.digit_counts[unit * stride + old]:
+                self.unit_masks[unit] &= ~(1 << old)
+            if value:
+                self.unit_masks[unit] |= 1 << value
+        if old and any(self.eliminated):
+            self.eliminated = [0] * len(self.eliminated)
+            self._recompute()
+            return
+        self.eliminated[index] = 0
+        candidates = self.candidates
+        singles = self.singles
+        if old:
+            for cell in (index, *self.peers[index]):
+                mask = candidates[cell] = self._candidates(cell)
+                if mask and not mask & (mask - 1):
+                    singles.append(cell)
+        else:
+            # a new digit can only take candidates away
+            candidates[index] = 0
+            keep = ~(1 << value)
+            for peer in self.peers[index]:
+                mask = candidates[peer] = candidates[peer] & keep
+                if mask and not mask & (mask - 1):
+                    singles.append(peer)
+
+    def cell_name(self, index):
+        r, c = divmod(index, self.size)
+        return f"r{r + 1}c{c + 1}"
+
+    def unit_name(self, unit):
+        kind, number = divmod(unit, self.size)
+        return f"{('row', 'column', 'box')[kind]} {number + 1}"
+
+    '''
+    Returns the next Hint, or None if none of the techniques applies (the
+    board is solved or needs something harder). A wrong value on the board
+    is reported first as a "mistake", since deductions from it are worthless.
+    '''
+
+    def next_hint(self):
+        state = self.state
+        if state.wrong:
+            for index, (value, answer) in enumerate(zip(state.values, state.solution)):
+                if value and value != answer:
+                    return Hint("mistake", [], [], [index],
+                                f"{self.cell_name(index)} does not match the solution")
+        if self.stuck:
+            return None
+        hint = self.naked_single() or self.hidden_single()
+        if hint is None:
+            # where every digit can still go, as a cell bitset
+            self.digit_cells = [0] * (self.size + 1)
+            for index, mask in enumerate(self.candidates):
+                for digit in bits(mask):
+                    self.digit_cells[digit] |= 1 << index
+            hint = (self.naked_pair() or self.hidden_pair() or self.pointing_pair()
+                    or self.box_line_reduction())
+        if hint is None:
+            self.stuck = True
+            return None
+        for index, digit in hint.eliminations:
+            self.eliminated[index] |= 1 << digit
+            mask = self.candidates[index] = self.candidates[index] & ~(1 << digit)
+            if mask and not mask & (mask - 1):
+                self.singles.append(index)
+        return hint
+
+    '''
+    Places every naked single on the board, including the ones that appear
+    as earlier ones are placed, and returns how many there were. Used for
+    batch grading, where building a Hint for each of them would dominate.
+    '''
+
+    def place_naked_singles(self):
+        state = self.state
+        candidates = self.candidates
+        singles = self.singles
+        placed = 0
+        while singles:
+            index = singles.pop()
+            mask = candidates[index]
+            if mask and not mask & (mask - 1):
+                state.set_value(index, mask.bit_length() - 1)
+                self.cell_changed(index)
+                placed += 1
+        return placed
+
+    def naked_single(self):
+        singles = self.singles
+        while singles:
+            index = singles[-1]
+            mask = self.candidates[index]
+            if mask and not mask & (mask - 1):
+                digit = mask.bit_length() - 1
+                return Hint("naked single", [(index, digit)], [], [index],
+                            f"{self.cell_name(index)} can only be {symbol(digit)}")
+            singles.pop()
+        return None
+
+    def hidden_single(self):
+        candidates = self.candidates
+        for unit, cells in enumerate(self.state.unit_cells):
+            once = twice = 0
+            for index in cells:
+                mask = candidates[index]
+                twice |= once & mask
+                once |= mask
+            only = once & ~twice
+            if only:
+                bit = only & -only
+                digit = bit.bit_length() - 1
+                for index in cells:
+                    if candidates[index] & bit:
+                        return Hint("hidden single", [(index, digit)], [], [index],
+                                    f"{symbol(digit)} can only go in {self.cell_name(index)} "
+                                    f"within {self.unit_name(unit)}")
+        return None
+
+    def naked_pair(self):
+        pairs = {}
+        for index, mask in enumerate(self.candidates):
+            if mask.bit_count() == 2:
+                pairs.setdefault(mask, []).append(index)
+        units_of = self.state.units_of
+        for mask, cells in pairs.items():
+            a, b = bits(mask)
+            holders = self.digit_cells[a] | self.digit_cells[b]
+            for i, first in enumerate(cells):
+                for second in cells[i + 1:]:
+                    for unit in set(units_of[first]) & set(units_of[second]):
+                        others = holders & self.unit_bits[unit] & ~(1 << first | 1 << second)
+                        if not others:
+                            continue
+                        eliminations = [(index, digit) for index in bits(others)
+                                        for digit in bits(self.candidates[index] & mask)]
+                        return Hint("naked pair", [], eliminations, [first, second],
+                                    f"{self.cell_name(first)} and {self.cell_name(second)} "
+                                    f"can only be {symbol(a)} or {symbol(b)}, so nothing "
+                                    f"else in {self.unit_name(unit)} can be")
+        return None
+
+    def hidden_pair(self):
+        digit_cells = self.digit_cells
+        for unit, unit_bits in enumerate(self.unit_bits):
+            seen = {}
+            for digit in range(1, self.size + 1):
+                where = digit_cells[digit] & unit_bits
+                if where.bit_count() != 2:
+                    continue
+                other = seen.setdefault(where, digit)
+                if other == digit:
+                    continue
+                pair = (1 << other) | (1 << digit)
+                a, b = bits(where)
+                eliminations = [(index, extra) for index in (a, b)
+                                for extra in bits(self.candidates[index] & ~pair)]
+                if eliminations:
+                    return Hint("hidden pair", [], eliminations, [a, b],
+                                f"{symbol(other)} and {symbol(digit)} can only go in "
+                                f"{self.cell_name(a)} and {self.cell_name(b)} within "
+                                f"{self.unit_name(unit)}, so those cells can't be "
+                                f"anything else")
+        return None
+
+    '''
+    Shared by pointing_pair and box_line_reduction: a digit that can only go
+    where unit crosses one other unit can't go anywhere else in that unit.
+    kinds are the units checked (0 rows, 1 columns, 2 boxes).
+    '''
+
+    def _confined(self, technique, kinds):
+        digit_cells = self.digit_cells
+        n = self.size
+        for kind in kinds:
+            for unit in range(kind * n, (kind + 1) * n):
+                unit_bits = self.unit_bits[unit]
+                for digit in range(1, n + 1):
+                    where = digit_cells[digit] & unit_bits
+                    if not where & (where - 1):
+                        continue
+                    for _, line, shared in self.overlaps[unit]:
+                        if where & ~shared:
+                            continue
+                        others = digit_cells[digit] & self.unit_bits[line] & ~unit_bits
+                        if others:
+                            return Hint(technique, [], [(index, digit) for index in bits(others)],
+                                        list(bits(where)),
+                                        f"in {self.unit_name(unit)}, {symbol(digit)} can only "
+                                        f"go in {self.unit_name(line)}, so it can't go anywhere "
+                                        f"else in {self.unit_name(line)}")
+        return None
+
+    def pointing_pair(self):
+        return self._confined("pointing pair", (2,))
+
+    def box_line_reduction(self):
+        return self._confined("box-line reduction", (0, 1))
@@ -1,6 +1,13 @@
+import os
 import sys
 import pygame
-from screen import Board
+from board_state import BoardState
+from frame_pacing import FramePacer
+from screen import Board, GLYPHS, ready_puzzle, value_for_key
+from puzzle_pool import PuzzlePool
+from puzzle_library import open_library
+from save_game import DEFAULT_PATH as SAVE_PATH, has_saved_game, load_game
+from sudoku_generator import GenerationTask, GenerationTimeout
 
 pygame.init()
 
@@ -11,22 +18,109 @@ WINDOW_HEIGHT = 600
 SCREEN = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 pygame.display.set_caption("Sudoku")
 
-FONT_LARGE = pygame.font.SysFont(None, 48)
-FONT_MED = pygame.font.SysFont(None, 32)
-FONT_SMALL = pygame.font.SysFont(None, 24)
+FONT_LARGE = GLYPHS.font(None, 48)
+FONT_MED = GLYPHS.font(None, 32)
+FONT_SMALL = GLYPHS.font(None, 24)
+
+BOARD_SIZES = (9, 16, 25)
+
+# puzzles are generated in the background so picking a difficulty is instant.
+# Larger boards take seconds to minutes each, so their pools only start once
+# that size is chosen instead of loading the CPU for players who never pick it.
+PUZZLE_POOLS = {9: PuzzlePool(depth=2, size=9).start()}
+
+# prebuilt puzzles (python -m puzzle_library), used when a pool runs dry
+LIBRARY = open_library()
+
+# every loop gets its events here, so an unchanged screen sleeps instead of
+# spinning; SUDOKU_FRAME_STATS=1 prints its latency report on exit
+PACER = FramePacer()
+
+# when no puzzle is ready it is generated in slices of this many seconds per
+# frame, leaving the rest of the frame for events; after GENERATION_TIMEOUT
+# seconds the player gets the puzzle as far as it got (fewer cells removed)
+GENERATION_BUDGET = 0.012
+GENERATION_TIMEOUT = 15
+
+def pool_for(size):
+    pool = PUZZLE_POOLS.get(size)
+    if pool is None:
+        pool = PUZZLE_POOLS[size] = PuzzlePool(depth=1, size=size).start()
+    return pool
+
+def quit_game():
+    if os.environ.get("SUDOKU_FRAME_STATS"):
+        print(PACER.report(), file=sys.stderr)
+    for pool in PUZZLE_POOLS.values():
+        pool.stop(timeout=0.2)
+    pygame.quit()
+    sys.exit()
 
 def draw_text_center(text, font, color, surface, center):
-    surf = font.render(text, True, color)
+    surf = GLYPHS.render(font, text, color)
     rect = surf.get_rect(center=center)
     surface.blit(surf, rect)
 
+def draw_button(rect, label, color):
+    pygame.draw.rect(SCREEN, color, rect)
+    pygame.draw.rect(SCREEN, (0, 0, 0), rect, 2)
+    draw_text_center(label, FONT_SMALL, (0, 0, 0),
+                     SCREEN, rect.center)
+    return rect
+
+def hovered_rect(rects):
+    mouse_pos = pygame.mouse.get_pos()
+    for rect in rects:
+        if rect.collidepoint(mouse_pos):
+            return rect
+    return None
+
 def start_screen():
 
     easy_rect = pygame.Rect(60, 300, 120, 50)
     medium_rect = pygame.Rect(210, 300, 120, 50)
     hard_rect = pygame.Rect(360, 300, 120, 50)
+    size_rects = [(pygame.Rect(60 + 150 * i, 400, 120, 40), size)
+                  for i, size in enumerate(BOARD_SIZES)]
+    board_size = BOARD_SIZES[0]
+    buttons = [easy_rect, medium_rect, hard_rect] + [rect for rect, _ in size_rects]
+    continue_rect = None
+    if has_saved_game(SAVE_PATH):
+        continue_rect = pygame.Rect(180, 480, 180, 45)
+        buttons.append(continue_rect)
+
+    # the screen only changes when the hovered button or the chosen size does
+    shown = None
 
     while True:
+        for event in PACER.events():
+            if event.type == pygame.QUIT:
+                quit_game()
+            if event.type == pygame.VIDEOEXPOSE:
+                pygame.display.flip()
+
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if continue_rect and continue_rect.collidepoint(event.pos):
+                    saved = load_game(SAVE_PATH)
+                    if saved is not None:
+                        return saved.difficulty, saved.state.size, saved
+                if easy_rect.collidepoint(event.pos):
+                    return "easy", board_size, None
+                if medium_rect.collidepoint(event.pos):
+                    return "medium", board_size, None
+                if hard_rect.collidepoint(event.pos):
+                    return "hard", board_size, None
+                for rect, size in size_rects:
+                    if rect.collidepoint(event.pos):
+                        board_size = size
+                        pool_for(size)
+
+        hovered = hovered_rect(buttons)
+        if shown == (hovered, board_size):
+            PACER.frame_done(False)
+            continue
+        shown = (hovered, board_size)
+
         SCREEN.fill((255, 255, 255))
 
         draw_text_center("Welcome to Sudoku", FONT_LARGE, (0, 0, 0),
@@ -34,98 +128,149 @@ def start_screen():
         draw_text_center("Select Difficulty", FONT_MED, (0, 0, 0),
                          SCREEN, (WINDOW_WIDTH // 2, 220))
 
-        mouse_pos = pygame.mouse.get_pos()
-
-
         for rect, label in [(easy_rect, "Easy"),
                             (medium_rect, "Medium"),
                             (hard_rect, "Hard")]:
             color = (200, 200, 200)
-            if rect.collidepoint(mouse_pos):
+            if rect is hovered:
                 color = (170, 170, 170)
-            pygame.draw.rect(SCREEN, color, rect)
-            pygame.draw.rect(SCREEN, (0, 0, 0), rect, 2)
-            draw_text_center(label, FONT_SMALL, (0, 0, 0),
-                             SCREEN, rect.center)
+            draw_button(rect, label, color)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        for rect, size in size_rects:
+            color = (200, 200, 200)
+            if size == board_size:
+                color = (140, 140, 140)
+            elif rect is hovered:
+                color = (170, 170, 170)
+            draw_button(rect, f"{size}x{size}", color)
 
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if easy_rect.collidepoint(event.pos):
-                    return "easy"
-                if medium_rect.collidepoint(event.pos):
-                    return "medium"
-                if hard_rect.collidepoint(event.pos):
-                    return "hard"
+        if continue_rect:
+            draw_button(continue_rect, "Continue Last Game",
+                        (170, 170, 170) if continue_rect is hovered else (200, 200, 200))
 
         pygame.display.flip()
+        PACER.frame_done(True)
 
 
 def end_screen(won):
 
     message = "Game Won!" if won else "Game Over :("
 
-    while True:
-        SCREEN.fill((255, 255, 255))
+    SCREEN.fill((255, 255, 255))
 
-        draw_text_center(message, FONT_LARGE, (0, 0, 0),
-                         SCREEN, (WINDOW_WIDTH // 2, 200))
-        draw_text_center("Press R to Restart", FONT_MED, (0, 0, 0),
-                         SCREEN, (WINDOW_WIDTH // 2, 280))
-        draw_text_center("Press Esc to Exit", FONT_MED, (0, 0, 0),
-                         SCREEN, (WINDOW_WIDTH // 2, 330))
+    draw_text_center(message, FONT_LARGE, (0, 0, 0),
+                     SCREEN, (WINDOW_WIDTH // 2, 200))
+    draw_text_center("Press R to Restart", FONT_MED, (0, 0, 0),
+                     SCREEN, (WINDOW_WIDTH // 2, 280))
+    draw_text_center("Press Esc to Exit", FONT_MED, (0, 0, 0),
+                     SCREEN, (WINDOW_WIDTH // 2, 330))
 
-        for event in pygame.event.get():
+    pygame.display.flip()
+
+    while True:
+        for event in PACER.events():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                quit_game()
+            if event.type == pygame.VIDEOEXPOSE:
+                pygame.display.flip()
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
                     return
                 if event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+                    quit_game()
+        PACER.frame_done(False)
 
-        pygame.display.flip()
+def generating_screen(difficulty, size):
 
-def game_loop(difficulty):
+    task = GenerationTask(difficulty, size, timeout=GENERATION_TIMEOUT)
+    restart_rect = pygame.Rect(210, 550, 120, 35)
 
-    board = Board(540, BOARD_HEIGHT, SCREEN, difficulty)
+    SCREEN.fill((255, 255, 255))
+    draw_text_center("Generating puzzle...", FONT_MED, (0, 0, 0),
+                     SCREEN, (WINDOW_WIDTH // 2, 250))
+    draw_text_center(f"{difficulty.capitalize()} {size}x{size}", FONT_SMALL, (0, 0, 0),
+                     SCREEN, (WINDOW_WIDTH // 2, 300))
+    draw_button(restart_rect, "Restart", (200, 200, 200))
+    pygame.display.flip()
+
+    # the loop may not block on input while the task still has work to do
+    PACER.animating = True
+    try:
+        while True:
+            for event in PACER.events():
+                if event.type == pygame.QUIT:
+                    task.cancel()
+                    quit_game()
+                if event.type == pygame.VIDEOEXPOSE:
+                    pygame.display.flip()
+
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and \
+                        restart_rect.collidepoint(event.pos):
+                    task.cancel()
+                    return None
+                if event.type == pygame.KEYDOWN and event.key in (pygame.K_r, pygame.K_ESCAPE):
+                    task.cancel()
+                    return None
+
+            try:
+                done = task.step(GENERATION_BUDGET)
+            except GenerationTimeout:
+                return None
+            PACER.frame_done(False)
+            if done:
+                return task.result
+    finally:
+        PACER.animating = False
+
+def game_loop(difficulty, size=9, saved=None):
+
+    if saved is not None:
+        board = Board.resume(540, BOARD_HEIGHT, SCREEN, saved)
+    else:
+        ready = ready_puzzle(difficulty, size, pool_for(size), LIBRARY)
+        if ready is None:
+            # Restart (or a puzzle that could not even be filled in time)
+            # goes back to the start screen
+            ready = generating_screen(difficulty, size)
+            if ready is None:
+                return
+        board = Board(540, BOARD_HEIGHT, SCREEN, difficulty, size=size,
+                      state=BoardState(*ready))
+    board.autosave(SAVE_PATH)
 
 
     reset_rect = pygame.Rect(40, 550, 120, 35)
     restart_rect = pygame.Rect(210, 550, 120, 35)
     exit_rect = pygame.Rect(380, 550, 120, 35)
+    buttons = [(reset_rect, "Reset"),
+               (restart_rect, "Restart"),
+               (exit_rect, "Exit")]
 
-    running = True
-
-    while running:
-        SCREEN.fill((255, 255, 255))
-
-
-        board.draw()
-
-
-        mouse_pos = pygame.mouse.get_pos()
-        for rect, label in [(reset_rect, "Reset"),
-                            (restart_rect, "Restart"),
-                            (exit_rect, "Exit")]:
+    def draw_buttons(hovered):
+        rects = []
+        for rect, label in buttons:
             color = (200, 200, 200)
-            if rect.collidepoint(mouse_pos):
+            if rect is hovered:
                 color = (170, 170, 170)
-            pygame.draw.rect(SCREEN, color, rect)
-            pygame.draw.rect(SCREEN, (0, 0, 0), rect, 2)
-            draw_text_center(label, FONT_SMALL, (0, 0, 0),
-                             SCREEN, rect.center)
+            rects.append(draw_button(rect, label, color))
+        return rects
+
+    SCREEN.fill((255, 255, 255))
+    board.invalidate()
+    board.draw()
+    shown_hover = hovered_rect([rect for rect, _ in buttons])
+    draw_buttons(shown_hover)
+    pygame.display.flip()
+
+    running = True
 
-        for event in pygame.event.get():
+    while running:
+        for event in PACER.events():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                quit_game()
+            if event.type == pygame.VIDEOEXPOSE:
+                pygame.display.flip()
 
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -143,14 +288,13 @@ def game_loop(difficulty):
                     elif restart_rect.collidepoint(event.pos):
                         return
                     elif exit_rect.collidepoint(event.pos):
-                        pygame.quit()
-                        sys.exit()
+                        quit_game()
 
 
             if event.type == pygame.KEYDOWN:
 
-                if pygame.K_1 <= event.key <= pygame.K_9:
-                    value = event.key - pygame.K_0
+                value = value_for_key(event.unicode, board.size)
+                if value:
                     board.sketch(value)
 
 
@@ -158,6 +302,19 @@ def game_loop(difficulty):
                     board.clear()
 
 
+                if event.mod & pygame.KMOD_CTRL:
+                    if event.key == pygame.K_z and event.mod & pygame.KMOD_SHIFT:
+                        board.redo()
+                    elif event.key == pygame.K_z:
+                        board.undo()
+                    elif event.key == pygame.K_y:
+                        board.redo()
+                    elif event.key == pygame.K_h:
+                        hint = board.hint()
+                        pygame.display.set_caption(
+                            f"Sudoku - {hint.reason}" if hint else "Sudoku - no hint available")
+
+
                 if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
                     if board.selected_cell is not None:
                         r, c = board.selected_cell
@@ -174,16 +331,17 @@ def game_loop(difficulty):
                         r, c = board.selected_cell
                         if event.key == pygame.K_UP and r > 0:
                             r -= 1
-                        elif event.key == pygame.K_DOWN and r < 8:
+                        elif event.key == pygame.K_DOWN and r < board.size - 1:
                             r += 1
                         elif event.key == pygame.K_LEFT and c > 0:
                             c -= 1
-                        elif event.key == pygame.K_RIGHT and c < 8:
+                        elif event.key == pygame.K_RIGHT and c < board.size - 1:
                             c += 1
                         board.select(r, c)
 
 
         if board.is_full():
+            board.saver.discard()
 
             if board.check_board():
                 end_screen(won=True)
@@ -191,12 +349,21 @@ def game_loop(difficulty):
                 end_screen(won=False)
             return
 
-        pygame.display.flip()
+        rects = board.draw()
+
+        hovered = hovered_rect([rect for rect, _ in buttons])
+        if hovered is not shown_hover:
+            shown_hover = hovered
+            rects.extend(draw_buttons(hovered))
+
+        if rects:
+            pygame.display.update(rects)
+        PACER.frame_done(bool(rects))
 
 def main():
     while True:
-        difficulty = start_screen()
-        game_loop(difficulty)
+        difficulty, size, saved = start_screen()
+        game_loop(difficulty, size, saved)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+"""
+On-disk library of ready-made puzzles, read through mmap so that opening it
+costs next to nothing however many puzzles it holds, and picking one touches
+a single fixed-size record.
+
+File layout, all integers little endian:
+
+    header   magic b"SUDL", version u16, size u16, record count u32,
+             level count u16, 2 reserved bytes
+    index    per level: name (16 bytes, NUL padded), first record u32,
+             record count u32
+    records  puzzle then solution, cells in row order, two cells per byte
+             (high nibble first), 0 for an empty cell
+
+Records of a level are stored next to each other, so a random puzzle of a
+level is one randrange and one slice. Digits are 4 bits, which limits the
+library to boards up to 9x9.
+
+Build one with
+
+    python -m puzzle_library puzzles.lib --count 100000 --workers 4
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+
+MAGIC = b"SUDL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIH2x")
+INDEX_ENTRY = struct.Struct("<16sII")
+
+# a nibble holds digits up to 15, so no board larger than 9x9 fits
+MAX_SIZE = 9
+
+# byte -> its high and low nibble, for bytes.translate
+_HIGH = bytes(b >> 4 for b in range(256))
+_LOW = bytes(b & 15 for b in range(256))
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzles.lib")
+
+
+class LibraryError(Exception):
+    '''
+    Raised by PuzzleLibrary for a file that is not a readable library
+    '''
+
+
+'''
+Packs a grid (a 2D list) into bytes, two cells per byte
+'''
+
+
+def pack(grid):
+    cells = bytearray(value for row in grid for value in row)
+    if len(cells) % 2:
+        cells.append(0)
+    return bytes(high << 4 | low for high, low in zip(cells[0::2], cells[1::2]))
+
+
+'''
+Unpacks size x size cells from packed bytes back into a 2D list
+'''
+
+
+def unpack(packed, size):
+    cells = bytearray(2 * len(packed))
+    cells[0::2] = packed.translate(_HIGH)
+    cells[1::2] = packed.translate(_LOW)
+    return [list(cells[r * size:(r + 1) * size]) for r in range(size)]
+
+
+def _grid_bytes(size):
+    return (size * size + 1) // 2
+
+
+class PuzzleLibrary:
+    '''
+    A puzzle library file opened read-only through mmap.
+
+    Parameters:
+        path is the library file written by write_library
+
+    levels maps every level name to (first record, record count). Raises
+    LibraryError if the file is not a library this version can read.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            try:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise LibraryError(f"{path} is empty") from exc
+        try:
+            if len(self._map) < HEADER.size:
+                raise LibraryError(f"{path} is too short to be a puzzle library")
+            magic, version, size, count, level_count = HEADER.unpack_from(self._map)
+            if magic != MAGIC or version != VERSION:
+                raise LibraryError(f"{path} is not a version {VERSION} puzzle library")
+            self.size = size
+            self.count = count
+            self.grid_bytes = _grid_bytes(size)
+            self.record_size = 2 * self.grid_bytes
+            self.levels = {}
+            for i in range(level_count):
+                name, first, number = INDEX_ENTRY.unpack_from(
+                    self._map, HEADER.size + i * INDEX_ENTRY.size)
+                self.levels[name.rstrip(b"\0").decode()] = (first, number)
+            self.records_offset = HEADER.size + level_count * INDEX_ENTRY.size
+            if len(self._map) < self.records_offset + count * self.record_size:
+                raise LibraryError(f"{path} is truncated")
+        except (LibraryError, struct.error):
+            self._map.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, level):
+        return self.levels.get(level, (0, 0))[1] > 0
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._map.close()
+
+    '''
+    Returns record number index as a (puzzle, solution) pair of 2D lists
+    '''
+
+    def get(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start = self.records_offset + index * self.record_size
+        record = self._map[start:start + self.record_size]
+        return (unpack(record[:self.grid_bytes], self.size),
+                unpack(record[self.grid_bytes:], self.size))
+
+    '''
+    Returns a random (puzzle, solution) pair of level in O(1), or None if the
+    library has no puzzles of that level
+    '''
+
+    def pick(self, level, rng=random):
+        first, number = self.levels.get(level, (0, 0))
+        if not number:
+            return None
+        return self.get(first + rng.randrange(number))
+
+
+'''
+Opens the library at path, or returns None if there is no usable library
+there, so callers can fall back to generating puzzles
+'''
+
+
+def open_library(path=DEFAULT_PATH):
+    try:
+        return PuzzleLibrary(path)
+    except (OSError, LibraryError):
+        return None
+
+
+'''
+Writes a library of size x size puzzles to path. levels maps level names to
+iterables of (puzzle, solution) pairs; they are consumed one level at a time
+and streamed to disk, so a library never has to fit in memory. The file is
+written next to path and renamed into place once complete. Returns the
+number of records written per level.
+'''
+
+
+def write_library(path, levels, size=9):
+    if size > MAX_SIZE:
+        raise ValueError(f"puzzle libraries hold boards up to {MAX_SIZE}x{MAX_SIZE}")
+    names = list(levels)
+    for name in names:
+        if len(name.encode()) > 16:
+            raise ValueError(f"level name {name!r} is longer than 16 bytes")
+    index = []
+    count = 0
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as file:
+        # header and index are rewritten once the counts are known
+        file.write(bytes(HEADER.size + len(names) * INDEX_ENTRY.size))
+        for name in names:
+            first = count
+            for puzzle, solution in levels[name]:
+                file.write(pack(puzzle))
+                file.write(pack(solution))
+                count += 1
+            index.append((name, first, count - first))
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, size, count, len(names)))
+        for name, first, number in index:
+            file.write(INDEX_ENTRY.pack(name.encode(), first, number))
+    os.replace(temp, path)
+    return {name: number for name, _, number in index}
+
+
+def main(argv=None):
+    # imported here so reading a library never pulls in the generator
+    from sudoku_generator import DIFFICULTY_REMOVED, generate_many_for_level
+
+    parser = argparse.ArgumentParser(
+        prog="python -m puzzle_library",
+        description="Fill a puzzle library file with generated puzzles.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH, help="library file to write")
+    parser.add_argument("--count", type=int, default=1000,
+                        help="puzzles per difficulty (fewer where the board size has no "
+                             "puzzles at that level)")
+    parser.add_argument("--size", type=int, default=9, choices=(4, 9))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    seeds = random.Random(args.seed)
+    # graded like generate_game, so a library puzzle is as hard as a pool one
+    levels = {name: generate_many_for_level(args.count, name, args.workers,
+                                            seeds.getrandbits(64), args.size)
+              for name in DIFFICULTY_REMOVED}
+    start = time.perf_counter()
+    written = write_library(args.path, levels, args.size)
+    elapsed = time.perf_counter() - start
+    total = sum(written.values())
+    print(f"wrote {total} puzzles to {args.path} in {elapsed:.1f}s "
+          f"({total / elapsed:.0f}/s): "
+          + ", ".join(f"{name} {number}" for name, number in written.items()),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Warm pool of ready-made puzzles, kept topped up by a background thread so
+that starting a game never has to wait for SudokuGenerator.
+"""
+import collections
+import logging
+import random
+import threading
+
+from sudoku_generator import (SudokuGenerator, DIFFICULTY_REMOVED, CancelToken,
+                              GenerationCancelled, generate_game)
+
+log = logging.getLogger(__name__)
+
+
+class PuzzlePool:
+    '''
+    Keeps up to depth (puzzle, solution) pairs ready for every difficulty.
+
+    Parameters:
+        depth is how many puzzles to keep ready per difficulty
+        size is the row length of the generated boards
+        difficulties maps difficulty names to the number of removed cells, or
+            to None to generate them with generate_game (the default)
+
+    The worker thread refills whichever difficulty is lowest and sleeps once
+    every queue is full. hits and misses count get() calls that were and
+    were not served from the pool. If the worker crashes, the exception is
+    logged and kept in error, and the pool stops refilling.
+    '''
+
+    def __init__(self, depth=2, size=9, difficulties=None):
+        self.depth = depth
+        self.size = size
+        if difficulties is None:
+            difficulties = dict.fromkeys(DIFFICULTY_REMOVED)
+        self.difficulties = dict(difficulties)
+        self.queues = {name: collections.deque() for name in self.difficulties}
+        self.hits = 0
+        self.misses = 0
+        self.error = None
+        self._rng = random.Random()
+        self._wakeup = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._cancel = None
+
+    '''
+    Starts the background worker (does nothing if it is already running)
+    '''
+
+    def start(self):
+        with self._wakeup:
+            if self._running:
+                return self
+            self._running = True
+            self._cancel = CancelToken()
+        self._thread = threading.Thread(target=self._run, name="puzzle-pool", daemon=True)
+        self._thread.start()
+        return self
+
+    '''
+    Stops the background worker, abandoning the puzzle it is working on, and
+    waits for it to exit. The generator notices at its next pause, a few
+    milliseconds away at most even on 25x25 boards; with a timeout (in
+    seconds) it waits at most that long, and being a daemon thread the worker
+    never holds up interpreter exit.
+    '''
+
+    def stop(self, timeout=None):
+        with self._wakeup:
+            self._running = False
+            if self._cancel is not None:
+                self._cancel.cancel()
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    '''
+    Takes a ready (puzzle, solution) pair for difficulty in O(1), or returns
+    None if that queue is empty so the caller can generate inline.
+    '''
+
+    def get(self, difficulty):
+        queue = self.queues.get(difficulty)
+        try:
+            puzzle = queue.popleft()
+        except (AttributeError, IndexError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._wakeup:
+            self._wakeup.notify()
+        return puzzle
+
+    '''
+    Returns the number of puzzles ready for each difficulty
+    '''
+
+    def levels(self):
+        return {name: len(queue) for name, queue in self.queues.items()}
+
+    '''
+    Returns the lowest difficulty queue that still needs puzzles, or None
+    '''
+
+    def _next_needed(self):
+        name = min(self.queues, key=lambda n: len(self.queues[n]), default=None)
+        if name is None or len(self.queues[name]) >= self.depth:
+            return None
+        return name
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while self._running and self._next_needed() is None:
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+                name = self._next_needed()
+                cancel = self._cancel
+            try:
+                removed = self.difficulties[name]
+                if removed is None:
+                    puzzle, solution = generate_game(name, self.size, self._rng, cancel=cancel)
+                else:
+                    generator = SudokuGenerator(self.size, removed, rng=self._rng, cancel=cancel)
+                    generator.fill_values()
+                    solution = generator.solution_board
+                    puzzle = generator.remove_cells()
+            except GenerationCancelled:
+                return
+            except Exception as exc:
+                log.exception("puzzle pool worker stopped")
+                with self._wakeup:
+                    self.error = exc
+                    self._running = False
+                return
+            self.queues[name].append((puzzle, solution))
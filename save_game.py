@@ -0,0 +1,194 @@
+"""
+Saving and resuming a game in progress, without pygame.
+
+A save is two files. The snapshot at path holds the whole game:
+
+    header   magic b"SUDS", version u16, size u8, selected row and column
+             u8 each (255 if no cell is selected), serial u32, difficulty
+             (16 bytes, NUL padded)
+    buffers  givens, solution, values and sketches, one byte per cell
+
+The journal next to it (path + ".journal") starts with magic b"SUDJ" and the
+serial of the snapshot it continues, followed by one 4-byte record per
+change: a cell's new value and sketch, or the new selection. Saving a move
+therefore appends 4 bytes; after COMPACT_EVERY records the journal is folded
+into a fresh snapshot and started over. A journal whose serial does not
+match the snapshot is left over from an older game and is ignored.
+
+The undo history is not saved; a resumed game starts with an empty one.
+"""
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from board_state import BoardState
+
+MAGIC = b"SUDS"
+JOURNAL_MAGIC = b"SUDJ"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBBI16s")
+JOURNAL_HEADER = struct.Struct("<4sI")
+RECORD = struct.Struct("<I")
+
+# journal records that may pile up before they are folded into the snapshot
+COMPACT_EVERY = 256
+
+# top bits of a journal record; the rest is laid out by _cell_record
+CELL, SELECTION = 0, 1 << 30
+
+NO_SELECTION = 255
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "savegame.bin")
+
+# A loaded game: state is a BoardState, selected a (row, col) or None and
+# serial the number tying the snapshot to its journal.
+SavedGame = namedtuple("SavedGame", "state difficulty selected serial")
+
+
+def _cell_record(index, value, sketch):
+    return CELL | index | value << 10 | sketch << 15
+
+
+def _selection_record(selected, size):
+    return SELECTION | (0 if selected is None else selected[0] * size + selected[1] + 1)
+
+
+class GameSaver:
+    '''
+    Keeps one game saved at path while it is played.
+
+    Parameters:
+        path is the snapshot file; the journal is written next to it
+        state is the BoardState of the game
+        difficulty is the difficulty name stored with it
+        selected is the selected (row, col), or None
+        compact_every is how many journal records trigger a new snapshot
+
+    Creating a GameSaver writes a snapshot straight away, replacing any
+    earlier save. Call record_cell after every change to a cell and
+    record_selection when the selection moves, or save() after changes that
+    touch the whole board such as a reset.
+    '''
+
+    def __init__(self, path, state, difficulty, selected=None, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.state = state
+        self.difficulty = difficulty
+        self.selected = selected
+        self.compact_every = compact_every
+        self.serial = random.getrandbits(32)
+        self.pending = 0
+        self._journal = None
+        self.save()
+
+    '''
+    Writes a full snapshot and starts a new, empty journal for it. The
+    snapshot replaces the old one in a single rename, so a crash leaves
+    either the old save or the new one.
+    '''
+
+    def save(self):
+        state = self.state
+        self.serial = (self.serial + 1) & 0xFFFFFFFF
+        row, col = self.selected if self.selected is not None else (NO_SELECTION, NO_SELECTION)
+        temp = self.path + ".tmp"
+        with open(temp, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, state.size, row, col, self.serial,
+                                   self.difficulty.encode()))
+            file.write(state.givens)
+            file.write(state.solution)
+            file.write(state.values)
+            file.write(state.sketches)
+        os.replace(temp, self.path)
+        if self._journal is None:
+            self._journal = open(self.journal_path, "wb", buffering=0)
+        else:
+            self._journal.seek(0)
+            self._journal.truncate()
+        self._journal.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, self.serial))
+        self.pending = 0
+
+    def _append(self, record):
+        self._journal.write(RECORD.pack(record))
+        self.pending += 1
+        if self.pending >= self.compact_every:
+            self.save()
+
+    def record_cell(self, index):
+        state = self.state
+        self._append(_cell_record(index, state.values[index], state.sketches[index]))
+
+    def record_selection(self, selected):
+        self.selected = selected
+        self._append(_selection_record(selected, self.state.size))
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    '''
+    Closes the save and deletes its files, e.g. once the game is over
+    '''
+
+    def discard(self):
+        self.close()
+        for path in (self.path, self.journal_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def has_saved_game(path=DEFAULT_PATH):
+    return os.path.exists(path)
+
+
+'''
+Loads the game saved at path, replaying its journal, and returns a
+SavedGame, or None if there is no save or it cannot be read
+'''
+
+
+def load_game(path=DEFAULT_PATH):
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, size, row, col, serial, difficulty = HEADER.unpack_from(data)
+    area = size * size
+    if magic != MAGIC or version != VERSION or len(data) != HEADER.size + 4 * area:
+        return None
+    buffers = [data[HEADER.size + i * area:HEADER.size + (i + 1) * area] for i in range(4)]
+    state = BoardState.from_buffers(size, *buffers)
+    selected = None if row == NO_SELECTION else (row, col)
+
+    try:
+        with open(path + ".journal", "rb") as file:
+            journal = file.read()
+    except OSError:
+        journal = b""
+    if journal[:JOURNAL_HEADER.size] == JOURNAL_HEADER.pack(JOURNAL_MAGIC, serial):
+        records = array("I")
+        body = journal[JOURNAL_HEADER.size:]
+        # a record cut short by a crash is dropped
+        records.frombytes(body[:len(body) - len(body) % RECORD.size])
+        if sys.byteorder == "big":
+            records.byteswap()
+        for record in records:
+            if record & SELECTION:
+                cell = (record & 0x3FF) - 1
+                selected = None if cell < 0 else divmod(cell, size)
+                continue
+            index, value, sketch = record & 0x3FF, record >> 10 & 31, record >> 15 & 31
+            if index < area and not state.is_given(index) and max(value, sketch) <= size:
+                state.set_value(index, value)
+                state.set_sketch(index, sketch)
+    return SavedGame(state, difficulty.rstrip(b"\0").decode(), selected, serial)
@@ -1,20 +1,161 @@
+import math
 import pygame
-from sudoku_generator import SudokuGenerator
+from board_state import BoardState, SYMBOLS, symbol
+from hints import HintEngine
+from save_game import GameSaver
+from sudoku_generator import generate_game
+
+
+def value_for_key(char, size):
+    index = SYMBOLS.find(char.upper()) if char else -1
+    if 0 <= index < size:
+        return index + 1
+    return 0
+
+
+'''
+Returns a (puzzle, solution) pair for difficulty that needs no generating,
+from the pool or else the library (either may be None), or None if neither
+has one ready
+'''
+
+
+def ready_puzzle(difficulty, size, pool=None, library=None):
+    ready = pool.get(difficulty) if pool is not None and pool.size == size else None
+    if ready is None and library is not None and library.size == size:
+        ready = library.pick(difficulty)
+    return ready
+
+
+GIVEN_COLOR = (0, 0, 0)
+PLACED_COLOR = (20, 60, 200)
+SKETCH_COLOR = (150, 150, 150)
+CONFLICT_COLOR = (200, 0, 0)
+
+
+class GlyphCache:
+    '''
+    Shared store of fonts and rendered text surfaces. SysFont lookups and
+    font.render are by far the most expensive part of drawing a cell, so each
+    font is loaded once per (name, size, bold) and each (font, text, color)
+    surface is rendered once and blitted from then on.
+    '''
+
+    def __init__(self):
+        self.fonts = {}
+        self.surfaces = {}
+
+    '''
+    Returns the cached SysFont for name (None is pygame's default font)
+    '''
+
+    def font(self, name, size, bold=False):
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.SysFont(name, size, bold=bold)
+        return font
+
+    '''
+    Returns the cached antialiased rendering of text in font and color
+    '''
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = font.render(text, True, color)
+        return surface
+
+    def text(self, text, size, color, name=None, bold=False):
+        return self.render(self.font(name, size, bold), text, color)
+
+    '''
+    Returns the fonts used for cell values and sketches at cell_size
+    '''
+
+    def cell_fonts(self, cell_size):
+        return (self.font("Arial", cell_size * 8 // 15, bold=True),
+                self.font("Arial", cell_size * 3 // 10))
+
+    '''
+    Renders the symbols for 1..size in every cell state up front, so the
+    first frame of a new board is as cheap as the ones after it
+    '''
+
+    def preload_digits(self, cell_size, size):
+        value_font, sketch_font = self.cell_fonts(cell_size)
+        for value in range(1, size + 1):
+            self.render(value_font, symbol(value), GIVEN_COLOR)
+            self.render(value_font, symbol(value), PLACED_COLOR)
+            self.render(value_font, symbol(value), CONFLICT_COLOR)
+            self.render(sketch_font, symbol(value), SKETCH_COLOR)
+
+    def clear(self):
+        self.fonts.clear()
+        self.surfaces.clear()
+
+
+GLYPHS = GlyphCache()
 
 
 class Cell:
-    def __init__(self, value, row, col, screen, cell_size):
-        self.value = value
-        self.sketched_value = 0
+    '''
+    Thin view of one cell of a Board. The value, sketch and given flag live
+    in the board's BoardState buffers; a Cell only knows where it is.
+    '''
+
+    __slots__ = ("board", "row", "col", "index")
+
+    def __init__(self, board, row, col):
+        self.board = board
         self.row = row
         self.col = col
-        self.screen = screen
-        self.selected = False
-        self.size = cell_size
-        self.x = col * cell_size
-        self.y = row * cell_size
+        self.index = board.state.index(row, col)
+
+    @property
+    def value(self):
+        return self.board.state.values[self.index]
+
+    @value.setter
+    def value(self, value):
+        self.board.set_value(self.index, value)
+
+    @property
+    def sketched_value(self):
+        return self.board.state.sketches[self.index]
+
+    @sketched_value.setter
+    def sketched_value(self, value):
+        self.board.state.set_sketch(self.index, value)
+
+    @property
+    def is_given(self):
+        return self.board.state.is_given(self.index)
+
+    @property
+    def conflict(self):
+        return self.board.state.is_conflict(self.index)
+
+    @property
+    def selected(self):
+        return self.board.selected_cell == (self.row, self.col)
+
+    @property
+    def screen(self):
+        return self.board.screen
+
+    @property
+    def size(self):
+        return self.board.cell_size
 
-        self.is_given = (value != 0)
+    @property
+    def x(self):
+        return self.col * self.board.cell_size
+
+    @property
+    def y(self):
+        return self.row * self.board.cell_size
 
     def set_cell_value(self, value):
         self.value = value
@@ -26,96 +167,209 @@ class Cell:
         rect = pygame.Rect(self.x, self.y, self.size, self.size)
 
 
+        conflict = self.conflict
         if self.selected:
             pygame.draw.rect(self.screen, (255, 255, 200), rect)      # light yellow
             pygame.draw.rect(self.screen, (255, 0, 0), rect, 2)       # red border
+        elif conflict:
+            pygame.draw.rect(self.screen, (255, 215, 215), rect)      # light red
+            pygame.draw.rect(self.screen, (0, 0, 0), rect, 1)         # black border
         else:
             pygame.draw.rect(self.screen, (255, 255, 255), rect)      # white
             pygame.draw.rect(self.screen, (0, 0, 0), rect, 1)         # black border
 
-        value_font = pygame.font.SysFont("Arial", 32, bold=True)
-        sketch_font = pygame.font.SysFont("Arial", 18)
+        value_font, sketch_font = GLYPHS.cell_fonts(self.size)
 
 
         if self.value != 0:
             if self.is_given:
-                color = (0, 0, 0)
+                color = GIVEN_COLOR
+            elif conflict:
+                color = CONFLICT_COLOR
             else:
-                color = (20, 60, 200)
+                color = PLACED_COLOR
 
-            text = value_font.render(str(self.value), True, color)
+            text = GLYPHS.render(value_font, symbol(self.value), color)
             text_rect = text.get_rect(center=(self.x + self.size / 2, self.y + self.size / 2))
             self.screen.blit(text, text_rect)
 
 
         elif self.sketched_value != 0:
-            text = sketch_font.render(str(self.sketched_value), True, (150, 150, 150))
-            self.screen.blit(text, (self.x + 5, self.y + 5))
+            text = GLYPHS.render(sketch_font, symbol(self.sketched_value), SKETCH_COLOR)
+            self.screen.blit(text, (self.x + self.size // 12, self.y + self.size // 12))
 
 
 class Board:
-    def __init__(self, width, height, screen, difficulty):
+    '''
+    The grid on screen: draws the cells of a BoardState and turns player
+    input into moves on it.
+
+    Parameters:
+        width and height are the size of the board area in pixels
+        screen is the pygame surface to draw on
+        difficulty and size pick the puzzle, taken from pool, then library,
+            then generated on the spot
+        state, if given, is a BoardState to continue (see resume) instead of
+            a new puzzle from the pool, the library or the generator
+    '''
+
+    def __init__(self, width, height, screen, difficulty, pool=None, size=9, library=None,
+                 state=None):
         self.width = width
         self.height = height
         self.screen = screen
         self.difficulty = difficulty
+        self.size = size
+        self.box_length = int(math.sqrt(size))
 
-        if difficulty == "easy":
-            removed = 30
-        elif difficulty == "medium":
-            removed = 40
-        else:
-            removed = 50
+        if state is None:
+            ready = ready_puzzle(difficulty, size, pool, library)
+            if ready is not None:
+                puzzle, solution = ready
+            else:
+                puzzle, solution = generate_game(difficulty, size)
+            state = BoardState(puzzle, solution)
 
-        generator = SudokuGenerator(9, removed)
-        generator.fill_values()
+        self.state = state
+        self.hints = HintEngine(self.state)
 
-        self.solution = [row[:] for row in generator.solution_board]
+        self.cell_size = self.width // size
 
-        generator.remove_cells()
-        puzzle = generator.board
+        self.cells = [[Cell(self, r, c) for c in range(size)] for r in range(size)]
 
-        self.original = [row[:] for row in puzzle]
+        self.selected_cell = None
+        GLYPHS.preload_digits(self.cell_size, size)
 
+        # cells changed since the last draw; full_redraw repaints the whole board
+        self.dirty = set()
+        self.full_redraw = True
 
-        self.cell_size = self.width // 9
+        # GameSaver that records every change, once autosave() is called
+        self.saver = None
 
-        self.cells = []
-        for r in range(9):
-            row_cells = []
-            for c in range(9):
-                cell = Cell(puzzle[r][c], r, c, screen, self.cell_size)
-                row_cells.append(cell)
-            self.cells.append(row_cells)
+    '''
+    Continues a save_game.SavedGame on screen
+    '''
 
-        self.selected_cell = None
+    @classmethod
+    def resume(cls, width, height, screen, saved):
+        board = cls(width, height, screen, saved.difficulty, size=saved.state.size,
+                    state=saved.state)
+        board.selected_cell = saved.selected
+        return board
+
+    '''
+    Saves the game to path now and after every later change
+    '''
+
+    def autosave(self, path):
+        self.saver = GameSaver(path, self.state, self.difficulty, self.selected_cell)
+
+    '''
+    Forces the next draw() to repaint the whole board, e.g. after the screen was cleared
+    '''
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def mark_dirty(self, row, col):
+        self.dirty.add((row, col))
+
+    '''
+    Changes one cell's value and marks the cells whose conflict highlight
+    flips because of it; those are only looked up when a digit count
+    crosses between one and two in some row, column or box
+    '''
+
+    def set_value(self, index, value):
+        self.mark_changed(index, self.state.set_value(index, value))
+
+    def mark_changed(self, index, crossed):
+        self.hints.cell_changed(index)
+        state = self.state
+        for unit, digit in crossed:
+            for peer in state.unit_cells[unit]:
+                if state.values[peer] == digit:
+                    self.mark_dirty(*divmod(peer, self.size))
+        self.mark_dirty(*divmod(index, self.size))
+        if self.saver is not None:
+            self.saver.record_cell(index)
+
+    '''
+    Records a player move on the selected cell so it can be undone.
+    sketch=None keeps the cell's current sketch
+    '''
+
+    def edit_selected(self, value, sketch=None):
+        if self.selected_cell is None:
+            return
+        r, c = self.selected_cell
+        cell = self.cells[r][c]
+        if cell.is_given:
+            return
+        if sketch is None:
+            sketch = cell.sketched_value
+        self.mark_changed(cell.index, self.state.edit(cell.index, value, sketch))
+
+    '''
+    Redraws only what changed since the last call and returns the screen
+    rectangles that need to be pushed with pygame.display.update
+    '''
 
     def draw(self):
         cell_size = self.cell_size
-
-        for i in range(10):
-            line_width = 1
-            if i % 3 == 0:
-                line_width = 3
+        span = cell_size * self.size
+
+        if self.full_redraw:
+            self.full_redraw = False
+            self.dirty.clear()
+            for row in self.cells:
+                for cell in row:
+                    cell.draw()
+            self.draw_grid()
+            return [pygame.Rect(0, 0, span + 2, span + 2)]
+
+        rects = []
+        for r, c in self.dirty:
+            cell = self.cells[r][c]
+            cell.draw()
+            # the cell fill covers its share of the grid lines, so put them back
+            x0, y0 = c * cell_size, r * cell_size
+            x1, y1 = x0 + cell_size, y0 + cell_size
+            pygame.draw.line(self.screen, (0, 0, 0), (x0, y0), (x1, y0), self.line_width(r))
+            pygame.draw.line(self.screen, (0, 0, 0), (x0, y1), (x1, y1), self.line_width(r + 1))
+            pygame.draw.line(self.screen, (0, 0, 0), (x0, y0), (x0, y1), self.line_width(c))
+            pygame.draw.line(self.screen, (0, 0, 0), (x1, y0), (x1, y1), self.line_width(c + 1))
+            rects.append(pygame.Rect(x0 - 2, y0 - 2, cell_size + 4, cell_size + 4))
+        self.dirty.clear()
+        return rects
+
+    def draw_grid(self):
+        cell_size = self.cell_size
+        span = cell_size * self.size
+        for i in range(self.size + 1):
+            line_width = self.line_width(i)
             pygame.draw.line(self.screen, (0, 0, 0),
                              (0, i * cell_size),
-                             (self.width, i * cell_size),
+                             (span, i * cell_size),
                              line_width)
             pygame.draw.line(self.screen, (0, 0, 0),
                              (i * cell_size, 0),
-                             (i * cell_size, self.height),
+                             (i * cell_size, span),
                              line_width)
 
-        for row in self.cells:
-            for cell in row:
-                cell.draw()
+    def line_width(self, i):
+        if i % self.box_length == 0:
+            return 3
+        return 1
 
     def select(self, row, col):
         if self.selected_cell is not None:
-            r, c = self.selected_cell
-            self.cells[r][c].selected = False
-        self.cells[row][col].selected = True
+            self.mark_dirty(*self.selected_cell)
         self.selected_cell = (row, col)
+        self.mark_dirty(row, col)
+        if self.saver is not None:
+            self.saver.record_selection(self.selected_cell)
 
     def click(self, x, y):
         cell_size = self.cell_size
@@ -123,68 +377,76 @@ class Board:
             return None
         row = y // cell_size
         col = x // cell_size
+        if row >= self.size or col >= self.size:
+            return None
         return int(row), int(col)
 
     def clear(self):
-        if self.selected_cell is None:
-            return
-        r, c = self.selected_cell
-        cell = self.cells[r][c]
-        if cell.is_given:
-            return
-        cell.set_cell_value(0)
-        cell.set_sketched_value(0)
+        self.edit_selected(0, 0)
 
     def sketch(self, value):
-        if self.selected_cell is None:
-            return
-        r, c = self.selected_cell
-        cell = self.cells[r][c]
-        if cell.is_given:
-            return
-        cell.set_sketched_value(value)
+        if self.selected_cell is not None:
+            r, c = self.selected_cell
+            self.edit_selected(self.cells[r][c].value, value)
 
-    def place_number(self, value):
-        if self.selected_cell is None:
-            return
-        r, c = self.selected_cell
-        cell = self.cells[r][c]
-        if cell.is_given:
-            return
-        cell.set_cell_value(value)
+    '''
+    sketch, if given, replaces the cell's sketch as part of the same move
+    '''
+
+    def place_number(self, value, sketch=None):
+        self.edit_selected(value, sketch)
+
+    '''
+    Takes back the last sketch, place_number or clear; returns False if
+    there was nothing to undo
+    '''
+
+    def undo(self):
+        change = self.state.undo()
+        if change is None:
+            return False
+        self.mark_changed(*change)
+        return True
+
+    def redo(self):
+        change = self.state.redo()
+        if change is None:
+            return False
+        self.mark_changed(*change)
+        return True
 
     def reset_to_original(self):
-        for r in range(9):
-            for c in range(9):
-                self.cells[r][c].value = self.original[r][c]
-                self.cells[r][c].sketched_value = 0
+        self.state.reset()
+        self.hints.rebuild()
+        self.full_redraw = True
+        if self.saver is not None:
+            self.saver.save()
+
+    '''
+    Returns the next hints.Hint (or None) and selects the cell it is about;
+    a digit to place is put in that cell as a sketch for the player to enter
+    '''
+
+    def hint(self):
+        hint = self.hints.next_hint()
+        if hint is None:
+            return None
+        if hint.placements:
+            index, digit = hint.placements[0]
+            self.select(*divmod(index, self.size))
+            self.sketch(digit)
+        else:
+            self.select(*divmod(hint.cells[0], self.size))
+        return hint
 
     def is_full(self):
-        for row in self.cells:
-            for cell in row:
-                if cell.value == 0:
-                    return False
-        return True
+        return self.state.is_full()
 
     def update_board(self):
-        board = []
-        for r in range(9):
-            row = []
-            for c in range(9):
-                row.append(self.cells[r][c].value)
-            board.append(row)
-        return board
+        return self.state.grid()
 
     def find_empty(self):
-        for r in range(9):
-            for c in range(9):
-                if self.cells[r][c].value == 0:
-                    return (r, c)
-        return None
+        return self.state.find_empty()
 
     def check_board(self):
-        for r in range(9):
-            for c in range(9):
-                if self.cells[r][c].value != self.solution[r][c]:
-                    return False
-        return True
+        return self.state.is_solved()
@@ -1,5 +1,13 @@
+import os
+import sys
 import pygame
-from screen import Board
+from board_state import BoardState
+from frame_pacing import FramePacer
+from screen import Board, GLYPHS, ready_puzzle, value_for_key
+from puzzle_pool import PuzzlePool
+from puzzle_library import open_library
+from save_game import DEFAULT_PATH as SAVE_PATH, has_saved_game, load_game
+from sudoku_generator import GenerationTask, GenerationTimeout
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -16,10 +24,26 @@ try:
 except:
     bg = None
 
+sizes = [("9x9", 9, 60), ("16x16", 16, 160), ("25x25", 25, 250)]
+# only the 9x9 pool starts right away; the slow larger boards start theirs
+# once that size is picked (see pool_for)
+pools = {9: PuzzlePool(depth=2, size=9).start()}
+library = open_library()
+# blocks while the screen is static; SUDOKU_FRAME_STATS=1 reports latency on exit
+pacer = FramePacer()
+# seconds of puzzle generation per frame when no puzzle is ready, and the
+# limit after which the puzzle is taken as far as it got
+gen_budget, gen_timeout = 0.012, 15
+
+
+def pool_for(n):
+    if n not in pools:
+        pools[n] = PuzzlePool(depth=1, size=n).start()
+    return pools[n]
+
 
 def txt_mid(surf, txt, box, size=30, col=BLACK):
-    f = pygame.font.SysFont(None, size)
-    t = f.render(str(txt), True, col)
+    t = GLYPHS.text(str(txt), size, col)
     r = t.get_rect()
     r.center = box.center
     surf.blit(t, r)
@@ -27,13 +51,20 @@ def txt_mid(surf, txt, box, size=30, col=BLACK):
 
 scene = "start"
 mode = ""
+board_size = 9
 board_obj = None
+# GenerationTask making the puzzle while scene is "generating"
+task = None
+# what is currently on screen; static scenes are only painted when this changes
+shown = None
 
 running = True
 while running:
-    for ev in pygame.event.get():
+    for ev in pacer.events():
         if ev.type == pygame.QUIT:
             running = False
+        if ev.type == pygame.VIDEOEXPOSE:
+            shown = None
 
 
         if ev.type == pygame.MOUSEBUTTONDOWN:
@@ -48,8 +79,27 @@ while running:
                 elif 244 < mx < 322 and 200 < my < 251:
                     mode = "hard"
 
-                if mode:
-                    board_obj = Board(460, 460, win, mode)
+                for _, n, x in sizes:
+                    if x - 10 < mx < x + 75 and 280 < my < 335:
+                        board_size = n
+                        pool_for(n)
+
+                saved = None
+                if 140 < mx < 320 and 370 < my < 425 and has_saved_game(SAVE_PATH):
+                    saved = load_game(SAVE_PATH)
+
+                if saved:
+                    board_obj = Board.resume(460, 460, win, saved)
+                elif mode:
+                    ready = ready_puzzle(mode, board_size, pool_for(board_size), library)
+                    if ready:
+                        board_obj = Board(460, 460, win, mode, size=board_size,
+                                          state=BoardState(*ready))
+                    else:
+                        task = GenerationTask(mode, board_size, timeout=gen_timeout)
+                        scene = "generating"
+                if board_obj:
+                    board_obj.autosave(SAVE_PATH)
                     scene = "play"
 
             elif scene == "play" and board_obj:
@@ -72,6 +122,14 @@ while running:
                     elif exit_out.collidepoint(mx, my):
                         running = False
 
+            elif scene == "generating":
+
+                if 160 < mx < 260 and 500 < my < 555:
+                    task.cancel()
+                    task = None
+                    scene = "start"
+                    mode = ""
+
             elif scene == "won":
 
                 exit_btn = pygame.Rect(50, 200, 85, 55)
@@ -90,24 +148,20 @@ while running:
         if ev.type == pygame.KEYDOWN and scene == "play" and board_obj:
 
 
-            if ev.key in (pygame.K_1, pygame.K_KP1):
-                board_obj.sketch(1)
-            elif ev.key in (pygame.K_2, pygame.K_KP2):
-                board_obj.sketch(2)
-            elif ev.key in (pygame.K_3, pygame.K_KP3):
-                board_obj.sketch(3)
-            elif ev.key in (pygame.K_4, pygame.K_KP4):
-                board_obj.sketch(4)
-            elif ev.key in (pygame.K_5, pygame.K_KP5):
-                board_obj.sketch(5)
-            elif ev.key in (pygame.K_6, pygame.K_KP6):
-                board_obj.sketch(6)
-            elif ev.key in (pygame.K_7, pygame.K_KP7):
-                board_obj.sketch(7)
-            elif ev.key in (pygame.K_8, pygame.K_KP8):
-                board_obj.sketch(8)
-            elif ev.key in (pygame.K_9, pygame.K_KP9):
-                board_obj.sketch(9)
+            value = value_for_key(ev.unicode, board_obj.size)
+            if ev.mod & pygame.KMOD_CTRL and ev.key in (pygame.K_z, pygame.K_y):
+                if ev.key == pygame.K_y or ev.mod & pygame.KMOD_SHIFT:
+                    board_obj.redo()
+                else:
+                    board_obj.undo()
+
+            elif ev.mod & pygame.KMOD_CTRL and ev.key == pygame.K_h:
+                hint = board_obj.hint()
+                pygame.display.set_caption(
+                    f"Sudoku - {hint.reason}" if hint else "Sudoku - no hint available")
+
+            elif value:
+                board_obj.sketch(value)
 
 
             elif ev.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
@@ -115,10 +169,10 @@ while running:
                 if sel:
                     r, c = sel
                     val = board_obj.cells[r][c].sketched_value
-                    board_obj.cells[r][c].sketched_value = 0
-                    if val and 1 <= val <= 9:
-                        board_obj.place_number(val)
+                    if val and 1 <= val <= board_obj.size:
+                        board_obj.place_number(val, sketch=0)
                         if board_obj.is_full():
+                            board_obj.saver.discard()
                             if board_obj.check_board():
                                 scene = "won"
                             else:
@@ -134,15 +188,42 @@ while running:
                 if ev.key == pygame.K_LEFT:
                     c = max(0, c - 1)
                 elif ev.key == pygame.K_RIGHT:
-                    c = min(8, c + 1)
+                    c = min(board_obj.size - 1, c + 1)
                 elif ev.key == pygame.K_UP:
                     r = max(0, r - 1)
                 elif ev.key == pygame.K_DOWN:
-                    r = min(8, r + 1)
+                    r = min(board_obj.size - 1, r + 1)
                 board_obj.select(r, c)
 
 
 
+    if scene == "generating":
+        try:
+            if task.step(gen_budget):
+                board_obj = Board(460, 460, win, mode, size=board_size,
+                                  state=BoardState(*task.result))
+                board_obj.autosave(SAVE_PATH)
+                scene = "play"
+        except GenerationTimeout:
+            scene = "start"
+            mode = ""
+        if scene != "generating":
+            task = None
+    # keep the frames coming while there is generating to do
+    pacer.animating = scene == "generating"
+
+    view = (scene, board_obj, board_size)
+    if view == shown:
+        if scene == "play" and board_obj:
+            rects = board_obj.draw()
+            if rects:
+                pygame.display.update(rects)
+            pacer.frame_done(bool(rects))
+        else:
+            pacer.frame_done(False)
+        continue
+    shown = view
+
     if scene == "start":
         if bg:
             win.blit(bg, (0, 0))
@@ -159,19 +240,40 @@ while running:
             pygame.draw.rect(win, BLACK, o, 5)
             txt_mid(win, txt, o, 15)
 
+        for txt, n, x in sizes:
+            b = pygame.Rect(x, 290, 65, 35)
+            o = pygame.Rect(x - 10, 280, 85, 55)
+            pygame.draw.rect(win, ORANGE if n == board_size else WHITE, b)
+            pygame.draw.rect(win, BLACK, o, 5)
+            txt_mid(win, txt, o, 15)
+
+        if has_saved_game(SAVE_PATH):
+            o = pygame.Rect(140, 370, 180, 55)
+            pygame.draw.rect(win, ORANGE, pygame.Rect(150, 380, 160, 35))
+            pygame.draw.rect(win, BLACK, o, 5)
+            txt_mid(win, "CONTINUE", o, 15)
+
     elif scene == "play" and board_obj:
         win.fill(WHITE)
+        board_obj.invalidate()
         board_obj.draw()
 
-        f = pygame.font.SysFont(None, 26)
         for t, x in [("RESET", 50), ("RESTART", 160), ("EXIT", 270)]:
             rb = pygame.Rect(x + 10, 510, 80, 35)
             ro = pygame.Rect(x, 500, 100, 55)
             pygame.draw.rect(win, ORANGE, rb)
             pygame.draw.rect(win, BLACK, ro, 5)
-            rt = f.render(t, True, BLACK)
-            rt_r = rt.get_rect(center=ro.center)
-            win.blit(rt, rt_r)
+            txt_mid(win, t, ro, 26)
+
+    elif scene == "generating":
+        win.fill(WHITE)
+        txt_mid(win, "Generating puzzle...", pygame.Rect(80, 200, 300, 40), 30)
+        txt_mid(win, f"{mode.upper()} {board_size}x{board_size}", pygame.Rect(80, 250, 300, 35), 20)
+
+        ro = pygame.Rect(160, 500, 100, 55)
+        pygame.draw.rect(win, ORANGE, pygame.Rect(170, 510, 80, 35))
+        pygame.draw.rect(win, BLACK, ro, 5)
+        txt_mid(win, "RESTART", ro, 26)
 
     elif scene == "won":
         if bg:
@@ -200,5 +302,10 @@ while running:
         txt_mid(win, "RESTART", ro, 15)
 
     pygame.display.flip()
+    pacer.frame_done(True)
 
+if os.environ.get("SUDOKU_FRAME_STATS"):
+    print(pacer.report(), file=sys.stderr)
+for pool in pools.values():
+    pool.stop(timeout=0.2)
 pygame.quit()
@@ -0,0 +1,277 @@
+"""
+Exact-cover Sudoku solver using Knuth's Dancing Links (Algorithm X).
+
+Boards are the same 2D lists of ints that generate_sudoku returns, with 0 for
+an empty cell. Any size whose row length is a perfect square works.
+
+Each candidate (row, col, digit) is one matrix row covering four columns:
+the cell itself, the digit in its row, the digit in its column and the digit
+in its box. The search always branches on the column with the fewest
+remaining rows (minimum remaining values).
+"""
+import math
+
+
+class SearchLimitExceeded(Exception):
+    '''
+    Raised by DLXSolver.iter_solutions when the search uses up its node_limit
+    '''
+
+
+class DLXSolver:
+    '''
+    Builds the exact-cover matrix for one board size. The linked structure is
+    kept as a template and copied for every search, so a solver can be reused
+    for any number of boards of that size.
+
+    Parameters:
+        row_length is the number of rows/columns of the board
+    '''
+
+    def __init__(self, row_length):
+        self.row_length = row_length
+        self.box_length = int(math.sqrt(row_length))
+        n = row_length
+        area = n * n
+        columns = 4 * area
+
+        # node 0 is the root, 1..columns are the column headers
+        left = list(range(-1, columns))
+        left[0] = columns
+        right = list(range(1, columns + 1)) + [0]
+        up = list(range(columns + 1))
+        down = list(range(columns + 1))
+        column = list(range(columns + 1))
+        row_of = [-1] * (columns + 1)
+        self.row_nodes = []
+
+        for r in range(n):
+            for c in range(n):
+                box = (r // self.box_length) * self.box_length + c // self.box_length
+                for d in range(n):
+                    row_id = (r * n + c) * n + d
+                    first = len(left)
+                    targets = (1 + r * n + c,
+                               1 + area + r * n + d,
+                               1 + 2 * area + c * n + d,
+                               1 + 3 * area + box * n + d)
+                    for k, col in enumerate(targets):
+                        node = first + k
+                        left.append(first + (k - 1) % 4)
+                        right.append(first + (k + 1) % 4)
+                        up.append(up[col])
+                        down.append(col)
+                        down[up[col]] = node
+                        up[col] = node
+                        column.append(col)
+                        row_of.append(row_id)
+                    self.row_nodes.append(first)
+
+        self._left = left
+        self._right = right
+        self._up = up
+        self._down = down
+        self.column = column
+        self.row_of = row_of
+        self._sizes = [0] + [n] * columns
+
+    '''
+    Creates fresh, independent copies of the link arrays for one search
+    '''
+
+    def _links(self):
+        return (self._left[:], self._right[:], self._up[:], self._down[:], self._sizes[:])
+
+    '''
+    Iterates over solutions of board as 2D lists. The board is not modified.
+    exclude is an iterable of (row, col, num) placements that may not be used.
+    rng, if given, is a random.Random-like object used to shuffle the order
+    in which rows are tried, which turns the solver into a random filler.
+    node_limit caps the number of rows selected during the search; once it is
+    used up SearchLimitExceeded is raised.
+    pause_every, if given, makes it also yield None after covering every row of
+    the board and after every pause_every rows selected, so a caller can check
+    a deadline or spread the search over several calls; iterating again
+    resumes it.
+    '''
+
+    def iter_solutions(self, board, exclude=(), rng=None, node_limit=None, pause_every=None):
+        n = self.row_length
+        left, right, up, down, sizes = self._links()
+        column = self.column
+
+        def cover(c):
+            right[left[c]] = right[c]
+            left[right[c]] = left[c]
+            i = down[c]
+            while i != c:
+                j = right[i]
+                while j != i:
+                    up[down[j]] = up[j]
+                    down[up[j]] = down[j]
+                    sizes[column[j]] -= 1
+                    j = right[j]
+                i = down[i]
+
+        def uncover(c):
+            i = up[c]
+            while i != c:
+                j = left[i]
+                while j != i:
+                    sizes[column[j]] += 1
+                    up[down[j]] = j
+                    down[up[j]] = j
+                    j = left[j]
+                i = up[i]
+            right[left[c]] = c
+            left[right[c]] = c
+
+        for r, c, num in exclude:
+            node = self.row_nodes[(r * n + c) * n + num - 1]
+            for j in (node, right[node], right[right[node]], left[node]):
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                sizes[column[j]] -= 1
+
+        grid = [row[:] for row in board]
+        covered = set()
+        for r in range(n):
+            for c in range(n):
+                num = board[r][c]
+                if num == 0:
+                    continue
+                node = self.row_nodes[(r * n + c) * n + num - 1]
+                j = node
+                while True:
+                    if column[j] in covered:
+                        return
+                    covered.add(column[j])
+                    cover(column[j])
+                    j = right[j]
+                    if j == node:
+                        break
+            # covering the givens of a big board takes a while on its own
+            if pause_every is not None:
+                yield None
+
+        row_of = self.row_of
+        # one frame per level: the candidate rows of the chosen column and
+        # the index of the row currently selected from them
+        stack = []
+        nodes = 0
+        while True:
+            if right[0] == 0:
+                for row_id in (row_of[rows[i]] for rows, i in stack):
+                    cell, d = divmod(row_id, n)
+                    grid[cell // n][cell % n] = d + 1
+                yield [row[:] for row in grid]
+                advance = True
+            else:
+                best = right[0]
+                best_size = sizes[best]
+                c = right[best]
+                while c != 0 and best_size > 1:
+                    if sizes[c] < best_size:
+                        best = c
+                        best_size = sizes[c]
+                    c = right[c]
+                if best_size == 0:
+                    advance = True
+                else:
+                    nodes += 1
+                    if node_limit is not None and nodes > node_limit:
+                        raise SearchLimitExceeded
+                    if pause_every is not None and nodes % pause_every == 0:
+                        yield None
+                    cover(best)
+                    rows = []
+                    i = down[best]
+                    while i != best:
+                        rows.append(i)
+                        i = down[i]
+                    if rng is not None:
+                        rng.shuffle(rows)
+                    stack.append((rows, 0))
+                    j = right[rows[0]]
+                    while j != rows[0]:
+                        cover(column[j])
+                        j = right[j]
+                    continue
+
+            while advance:
+                if not stack:
+                    return
+                rows, i = stack.pop()
+                node = rows[i]
+                j = left[node]
+                while j != node:
+                    uncover(column[j])
+                    j = left[j]
+                i += 1
+                if i < len(rows):
+                    nodes += 1
+                    if node_limit is not None and nodes > node_limit:
+                        raise SearchLimitExceeded
+                    if pause_every is not None and nodes % pause_every == 0:
+                        yield None
+                    stack.append((rows, i))
+                    node = rows[i]
+                    j = right[node]
+                    while j != node:
+                        cover(column[j])
+                        j = right[j]
+                    advance = False
+                else:
+                    uncover(column[node])
+
+    '''
+    Returns one solution of board as a 2D list, or None if it has none
+    '''
+
+    def solve(self, board, rng=None):
+        for solution in self.iter_solutions(board, rng=rng):
+            return solution
+        return None
+
+    '''
+    Counts the solutions of board, stopping once limit is reached
+    (limit=None counts them all). Returns None if node_limit runs out first.
+    '''
+
+    def count_solutions(self, board, limit=2, exclude=(), node_limit=None):
+        count = 0
+        try:
+            for _ in self.iter_solutions(board, exclude, node_limit=node_limit):
+                count += 1
+                if limit is not None and count >= limit:
+                    break
+        except SearchLimitExceeded:
+            return None
+        return count
+
+
+_solvers = {}
+
+
+'''
+Returns the shared DLXSolver for boards with the given row length
+'''
+
+
+def get_solver(row_length):
+    solver = _solvers.get(row_length)
+    if solver is None:
+        solver = _solvers[row_length] = DLXSolver(row_length)
+    return solver
+
+
+def solve(board, rng=None):
+    return get_solver(len(board)).solve(board, rng)
+
+
+def count_solutions(board, limit=2, exclude=(), node_limit=None):
+    return get_solver(len(board)).count_solutions(board, limit, exclude, node_limit)
+
+
+def iter_solutions(board, exclude=(), rng=None, node_limit=None, pause_every=None):
+    return get_solver(len(board)).iter_solutions(board, exclude, rng, node_limit, pause_every)
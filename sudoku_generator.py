@@ -1,13 +1,131 @@
+import argparse
+import contextlib
+import json
 import math
+import multiprocessing
 import random
+import sys
+import time
+
+import grading
+import sudoku_dlx
+import transforms
+from board_state import symbol
+from generation_stats import GenerationStats
 
 """
-SudokuGenerator for 9x9 Sudoku boards.
+SudokuGenerator for 9x9, 16x16 and 25x25 Sudoku boards.
 
 Adapted from the GeeksforGeeks article:
 "Program for Sudoku Generator" by Aarti_Rathi and Ankur Trisal.
 """
 
+# number of cells removed for each difficulty the game offers (on 9x9; see
+# removed_for), used where puzzles are not graded by technique
+DIFFICULTY_REMOVED = {"easy": 30, "medium": 40, "hard": 50}
+
+# most cells remove_cells can take out of the larger boards in a few seconds;
+# past this the uniqueness checks keep running out of node_limit and every
+# extra cell costs seconds to minutes (benchmarks/bench_scaling.py hard)
+REMOVED_LIMIT = {16: 145, 25: 300}
+
+# board sizes whose game puzzles are graded by technique rather than hole count
+GRADED_SIZES = (4, 9)
+
+# search engines SudokuGenerator can use for filling and counting solutions
+BACKENDS = ("masks", "dlx")
+
+# searches pause when they start and after every CHECK_EVERY placements; the
+# deadline and cancel token are checked there, and a GenerationTask can stop
+# there until the next frame. A Dancing Links placement on a 25x25 board
+# costs about 0.1 ms, a hundred times a mask search one, so dlx pauses sooner.
+CHECK_EVERY = 256
+DLX_CHECK_EVERY = 32
+
+
+'''
+Returns the number of cells to remove for a difficulty on a size x size board,
+scaling the 9x9 counts in DIFFICULTY_REMOVED by the board area. Where that
+would put hard past REMOVED_LIMIT, all difficulties are scaled down together
+so hard lands on the limit and the levels stay apart.
+Unknown difficulties are treated as hard.
+'''
+
+
+def removed_for(difficulty, size=9):
+    removed = DIFFICULTY_REMOVED.get(difficulty, DIFFICULTY_REMOVED["hard"])
+    scale = size * size / 81
+    if size in REMOVED_LIMIT:
+        scale = min(scale, REMOVED_LIMIT[size] / DIFFICULTY_REMOVED["hard"])
+    return round(removed * scale)
+
+
+class GenerationCancelled(Exception):
+    '''
+    Raised when a generation is stopped through its CancelToken
+    '''
+
+
+class GenerationTimeout(GenerationCancelled):
+    '''
+    Raised when a generation passes its deadline before it has a puzzle to
+    return, i.e. while the solution is still being filled in
+    '''
+
+
+class CancelToken:
+    '''
+    Lets a caller (another thread, or a UI handler) stop generations that were
+    given this token; they raise GenerationCancelled at their next pause.
+    '''
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+'''
+Returns the time.monotonic() deadline for timeout seconds from now, or None
+'''
+
+
+def _deadline(timeout):
+    return None if timeout is None else time.monotonic() + timeout
+
+
+'''
+Resumes a generation (a generator that yields at every pause) up to its next
+pause. If cancel was cancelled or deadline has passed, the matching error is
+raised inside the generation instead, so it can clean up or, for a timeout,
+finish with what it has. Raises StopIteration with the result at the end.
+A generation must first be started with next() to reach its first pause.
+'''
+
+
+def _advance(steps, deadline, cancel):
+    if cancel is not None and cancel.cancelled:
+        steps.throw(GenerationCancelled("generation cancelled"))
+    elif deadline is not None and time.monotonic() >= deadline:
+        steps.throw(GenerationTimeout("generation passed its deadline"))
+    else:
+        next(steps)
+
+
+'''
+Runs a generation to the end and returns its result
+'''
+
+
+def _run(steps, deadline=None, cancel=None):
+    try:
+        next(steps)
+        while True:
+            _advance(steps, deadline, cancel)
+    except StopIteration as finished:
+        return finished.value
+
 
 class SudokuGenerator:
     '''
@@ -19,18 +137,50 @@ class SudokuGenerator:
         self.box_length     - the square root of row_length
 
     Parameters:
-        row_length is the number of rows/columns of the board (always 9 for this project)
+        row_length is the number of rows/columns of the board (9, 16 or 25)
         removed_cells is an integer value - the number of cells to be removed
+        backend selects the search engine: "masks" or "dlx" (Dancing Links);
+            by default masks for 9x9 and smaller, dlx for larger boards
+        rng is the source of randomness (a random.Random); defaults to the random module
+        stats is an optional generation_stats.GenerationStats that collects
+            timings and search counts; None (the default) costs nothing
+        deadline is an optional time.monotonic() value; searches still running
+            after it stop (see remove_cells for what is kept)
+        cancel is an optional CancelToken that makes searches raise
+            GenerationCancelled once it is cancelled
 
     Return:
         None
     '''
 
-    def __init__(self, row_length, removed_cells):
+    def __init__(self, row_length, removed_cells, backend=None, rng=None, stats=None,
+                 deadline=None, cancel=None):
         self.row_length = row_length
         self.removed_cells = removed_cells
+        if backend is None:
+            backend = "masks" if row_length <= 9 else "dlx"
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+        self.backend = backend
+        self.rng = random if rng is None else rng
+        self.stats = stats
+        self.deadline = deadline
+        self.cancel = cancel
+        # set by remove_cells when the deadline cut it short
+        self.timed_out = False
         self.box_length = int(math.sqrt(row_length))
         self.board = [[0 for _ in range(row_length)] for _ in range(row_length)]
+        # bit n of a mask is set when digit n is already used in that row/col/box
+        self.row_masks = [0] * row_length
+        self.col_masks = [0] * row_length
+        self.box_masks = [0] * row_length
+        self.full_mask = ((1 << row_length) - 1) << 1
+        # search statistics from the last fill_remaining call
+        self.nodes = 0
+        self.backtracks = 0
+        # searches give up after this many placements: fills restart from a new
+        # diagonal, uniqueness checks treat the removal as ambiguous
+        self.node_limit = 50 * row_length * row_length
 
     '''
     Returns a 2D python list of numbers which represents the board
@@ -44,13 +194,52 @@ class SudokuGenerator:
         for row in self.board:
             print(" ".join(str(num) for num in row))
 
+    '''
+    Returns the index of the box containing (row, col), counting boxes
+    left to right, top to bottom
+    '''
+
+    def box_index(self, row, col):
+        return (row // self.box_length) * self.box_length + col // self.box_length
+
+    '''
+    Writes num into (row, col) and marks it as used in the row, column and box masks
+    '''
+
+    def place(self, row, col, num):
+        bit = 1 << num
+        self.board[row][col] = num
+        self.row_masks[row] |= bit
+        self.col_masks[col] |= bit
+        self.box_masks[self.box_index(row, col)] |= bit
+
+    '''
+    Clears (row, col) and releases its digit from the row, column and box masks
+    '''
+
+    def unplace(self, row, col):
+        bit = ~(1 << self.board[row][col])
+        self.board[row][col] = 0
+        self.row_masks[row] &= bit
+        self.col_masks[col] &= bit
+        self.box_masks[self.box_index(row, col)] &= bit
+
+    '''
+    Returns a bitmask of the digits that can still legally go in (row, col).
+    Bit n is set when digit n is allowed.
+    '''
+
+    def candidates(self, row, col):
+        used = self.row_masks[row] | self.col_masks[col] | self.box_masks[self.box_index(row, col)]
+        return self.full_mask & ~used
+
     '''
     Determines if num is contained in the specified row of the board
     If num is already in the specified row, return False. Otherwise, return True
     '''
 
     def valid_in_row(self, row, num):
-        return num not in self.board[row]
+        return not (self.row_masks[row] >> num) & 1
 
     '''
     Determines if num is contained in the specified column of the board
@@ -58,10 +247,7 @@ class SudokuGenerator:
     '''
 
     def valid_in_col(self, col, num):
-        for row in self.board:
-            if row[col] == num:
-                return False
-        return True
+        return not (self.col_masks[col] >> num) & 1
 
     '''
     Determines if num is contained in the 3x3 box specified on the board
@@ -70,27 +256,16 @@ class SudokuGenerator:
     '''
 
     def valid_in_box(self, row_start, col_start, num):
-        for r in range(row_start, row_start + self.box_length):
-            for c in range(col_start, col_start + self.box_length):
-                if self.board[r][c] == num:
-                    return False
-        return True
+        return not (self.box_masks[self.box_index(row_start, col_start)] >> num) & 1
 
     '''
     Determines if it is valid to enter num at (row, col) in the board.
-    Checks row, column, and 3x3 box.
+    Checks row, column, and 3x3 box with a single mask lookup.
     '''
 
     def is_valid(self, row, col, num):
-        if not self.valid_in_row(row, num):
-            return False
-        if not self.valid_in_col(col, num):
-            return False
-        row_start = row - (row % self.box_length)
-        col_start = col - (col % self.box_length)
-        if not self.valid_in_box(row_start, col_start, num):
-            return False
-        return True
+        used = self.row_masks[row] | self.col_masks[col] | self.box_masks[self.box_index(row, col)]
+        return not (used >> num) & 1
 
     '''
     Fills the specified 3x3 box with values 1–9 without repetition
@@ -98,11 +273,11 @@ class SudokuGenerator:
 
     def fill_box(self, row_start, col_start):
         nums = list(range(1, self.row_length + 1))
-        random.shuffle(nums)
+        self.rng.shuffle(nums)
         idx = 0
         for r in range(self.box_length):
             for c in range(self.box_length):
-                self.board[row_start + r][col_start + c] = nums[idx]
+                self.place(row_start + r, col_start + c, nums[idx])
                 idx += 1
 
     '''
@@ -110,76 +285,700 @@ class SudokuGenerator:
     '''
 
     def fill_diagonal(self):
+        stats = self.stats
+        if stats is not None:
+            start, before = time.perf_counter(), stats.begin()
         for i in range(0, self.row_length, self.box_length):
             self.fill_box(i, i)
+        if stats is not None:
+            stats.end("fill_diagonal", time.perf_counter() - start, before)
 
     '''
-    Fills the remaining cells of the board after diagonal boxes
-    (backtracking algorithm — provided)
+    Fills every empty cell of the board (after diagonal boxes) with an iterative
+    backtracking search that always expands the most constrained empty cell.
+    row and col are kept for compatibility with the old recursive version.
+    Returns True if the board was completed. The work done is left in
+    self.nodes (digits placed) and self.backtracks (placements undone).
     '''
 
-    def fill_remaining(self, row, col):
-        if col >= self.row_length and row < self.row_length - 1:
-            row += 1
-            col = 0
-        if row >= self.row_length and col >= self.row_length:
-            return True
-        if row < self.box_length:
-            if col < self.box_length:
-                col = self.box_length
-        elif row < self.row_length - self.box_length:
-            if col == int(row / self.box_length) * self.box_length:
-                col += self.box_length
-        else:
-            if col == self.row_length - self.box_length:
-                row += 1
-                col = 0
-                if row >= self.row_length:
-                    return True
-
-        for num in range(1, self.row_length + 1):
-            if self.is_valid(row, col, num):
-                self.board[row][col] = num
-                if self.fill_remaining(row, col + 1):
-                    return True
-                self.board[row][col] = 0
-        return False
+    def fill_remaining(self, row=0, col=0):
+        return _run(self._fill_remaining_steps(), self.deadline, self.cancel)
+
+    def _fill_remaining_steps(self):
+        stats = self.stats
+        if stats is not None:
+            start, before = time.perf_counter(), stats.begin()
+        filled = (yield from self._search_steps(1, fill=True, node_limit=self.node_limit)) == 1
+        if stats is not None:
+            if not filled:
+                stats.counters["fill_restarts"] += 1
+            stats.end("fill_remaining", time.perf_counter() - start, before)
+        return filled
 
     '''
     Constructs a full Sudoku solution by filling diagonal boxes then remaining cells.
+    If the search runs past node_limit it starts over from new diagonal boxes.
     Also stores a copy as self.solution_board for checking correctness later.
+    Raises GenerationTimeout after the deadline, leaving the board unfinished.
     '''
 
     def fill_values(self):
+        _run(self._fill_values_steps(), self.deadline, self.cancel)
+
+    def _fill_values_steps(self):
         self.fill_diagonal()
-        self.fill_remaining(0, self.box_length)
+        if self.backend == "dlx":
+            stats = self.stats
+            if stats is not None:
+                start, before = time.perf_counter(), stats.begin()
+            for solution in sudoku_dlx.iter_solutions(self.board, rng=self.rng,
+                                                      pause_every=DLX_CHECK_EVERY):
+                if solution is not None:
+                    break
+                yield
+            for r in range(self.row_length):
+                for c in range(self.row_length):
+                    if self.board[r][c] == 0:
+                        self.place(r, c, solution[r][c])
+            if stats is not None:
+                stats.end("fill_remaining", time.perf_counter() - start, before)
+        else:
+            # a subclass with its own fill_remaining (the old searches kept in
+            # benchmarks/) still gets called here, just without the pauses
+            overridden = type(self).fill_remaining is not SudokuGenerator.fill_remaining
+            while not (self.fill_remaining(0, self.box_length) if overridden
+                       else (yield from self._fill_remaining_steps())):
+                self.clear_board()
+                self.fill_diagonal()
         self.solution_board = [row[:] for row in self.board]
+        if self.stats is not None:
+            self.stats.counters["boards"] += 1
+
+    '''
+    Empties the board and resets the row, column and box masks
+    '''
+
+    def clear_board(self):
+        for row in self.board:
+            row[:] = [0] * self.row_length
+        self.row_masks = [0] * self.row_length
+        self.col_masks = [0] * self.row_length
+        self.box_masks = [0] * self.row_length
+
+    '''
+    Counts the solutions of the current board, stopping as soon as limit is reached,
+    so count_solutions(2) == 1 means the puzzle is unique.
+    Empty cells are tried most-constrained first using the row/column/box masks.
+    '''
+
+    def count_solutions(self, limit=2):
+        return self._count_solutions(limit)
+
+    '''
+    Solution counter behind count_solutions. banned is an optional (row, col, num)
+    whose digit is not allowed in that cell, which lets remove_cells ask
+    "is there any solution other than the original one?" with limit 1.
+    '''
+
+    def _count_solutions(self, limit, banned=None, node_limit=None):
+        return _run(self._count_steps(limit, banned, node_limit), self.deadline, self.cancel)
+
+    def _count_steps(self, limit, banned=None, node_limit=None):
+        if self.backend != "dlx":
+            return (yield from self._search_steps(limit, banned, node_limit=node_limit))
+        count = 0
+        try:
+            for solution in sudoku_dlx.iter_solutions(self.board, [banned] if banned else (),
+                                                      node_limit=node_limit,
+                                                      pause_every=DLX_CHECK_EVERY):
+                if solution is None:
+                    yield
+                    continue
+                count += 1
+                if limit is not None and count >= limit:
+                    break
+        except sudoku_dlx.SearchLimitExceeded:
+            return None
+        return count
+
+    '''
+    Iterative most-constrained-first search shared by fill_remaining and
+    count_solutions. Stops after limit solutions and returns how many it found.
+    Instead of recursing, the digits still to try for every filled cell are kept
+    on an explicit stack, so memory is bounded by the number of empty cells.
+    With fill=True the masks are updated in place and the first solution is
+    written to the board; otherwise the board is left untouched.
+    Returns None, with the masks unchanged, if node_limit placements are used up.
+    _search_steps is the same search as a generator that pauses every
+    CHECK_EVERY placements; if it is abandoned there the masks are restored.
+    '''
+
+    def _search(self, limit, banned=None, fill=False, node_limit=None):
+        return _run(self._search_steps(limit, banned, fill, node_limit), self.deadline,
+                    self.cancel)
+
+    def _search_steps(self, limit, banned=None, fill=False, node_limit=None):
+        board = self.board
+        if fill:
+            rows, cols, boxes = self.row_masks, self.col_masks, self.box_masks
+        else:
+            rows, cols, boxes = self.row_masks[:], self.col_masks[:], self.box_masks[:]
+        full = self.full_mask
+        cells = []
+        for r in range(self.row_length):
+            for c in range(self.row_length):
+                if board[r][c] == 0:
+                    ban = 0
+                    if banned is not None and banned[0] == r and banned[1] == c:
+                        ban = 1 << banned[2]
+                    cells.append((r, c, self.box_index(r, c), ban))
+        total = len(cells)
+        # one (untried digits, placed digit) pair for each of cells[:k]
+        stack = []
+        found = nodes = backtracks = checks = 0
+        k = 0
+        # node count of the next pause (or of node_limit, if that comes first)
+        pause_at = 0
+        try:
+            while True:
+                if k == total:
+                    found += 1
+                    if found >= limit:
+                        break
+                    mask = 0
+                else:
+                    best = k
+                    mask = 0
+                    best_count = self.row_length + 1
+                    for i in range(k, total):
+                        r, c, x, ban = cells[i]
+                        free = full & ~(rows[r] | cols[c] | boxes[x] | ban)
+                        count = free.bit_count()
+                        if count < best_count:
+                            best, mask, best_count = i, free, count
+                            if count <= 1:
+                                break
+                    checks += i - k + 1
+                    cells[k], cells[best] = cells[best], cells[k]
+                while not mask and stack:
+                    k -= 1
+                    backtracks += 1
+                    mask, bit = stack.pop()
+                    r, c, x, _ = cells[k]
+                    rows[r] ^= bit
+                    cols[c] ^= bit
+                    boxes[x] ^= bit
+                if not mask:
+                    break
+                if nodes >= pause_at:
+                    if node_limit is not None and nodes >= node_limit:
+                        found = None
+                        break
+                    yield
+                    pause_at = nodes + CHECK_EVERY
+                    if node_limit is not None and pause_at > node_limit:
+                        pause_at = node_limit
+                bit = mask & -mask
+                stack.append((mask ^ bit, bit))
+                r, c, x, _ = cells[k]
+                rows[r] |= bit
+                cols[c] |= bit
+                boxes[x] |= bit
+                nodes += 1
+                k += 1
+        except BaseException:
+            # abandoned at a pause (cancelled, timed out or closed)
+            if fill:
+                self._undo(cells, stack)
+            raise
+        if self.stats is not None:
+            counters = self.stats.counters
+            counters["searches"] += 1
+            counters["nodes"] += nodes
+            counters["backtracks"] += backtracks
+            counters["candidate_checks"] += checks
+        if fill:
+            self.nodes = nodes
+            self.backtracks = backtracks
+            if found:
+                for (r, c, _, _), (_, bit) in zip(cells, stack):
+                    board[r][c] = bit.bit_length() - 1
+            elif found is None:
+                self._undo(cells, stack)
+        return found
+
+    '''
+    Takes the digits on a search stack back out of the row, column and box masks
+    '''
+
+    def _undo(self, cells, stack):
+        rows, cols, boxes = self.row_masks, self.col_masks, self.box_masks
+        for (r, c, x, _), (_, bit) in zip(cells, stack):
+            rows[r] ^= bit
+            cols[c] ^= bit
+            boxes[x] ^= bit
 
     '''
     Removes the appropriate number of cells from the board by setting values to 0.
-    Avoids removing the same cell more than once.
+    Cells are visited in random order and a removal is only kept if the puzzle
+    still has exactly one solution, so the board never becomes ambiguous.
+    Removals whose check runs past node_limit are undone as well.
+    If no more cells can be removed uniquely, stops short of removed_cells.
+    Past the deadline it also stops short, keeping the (still unique) puzzle
+    made so far and setting timed_out.
     '''
 
     def remove_cells(self):
-        removed = 0
-        while removed < self.removed_cells:
-            row = random.randint(0, self.row_length - 1)
-            col = random.randint(0, self.row_length - 1)
-            if self.board[row][col] != 0:
-                self.board[row][col] = 0
-                removed += 1
+        return _run(self._remove_cells_steps(), self.deadline, self.cancel)
+
+    def _remove_cells_steps(self):
+        stats = self.stats
+        if stats is not None:
+            start, before = time.perf_counter(), stats.begin()
+        cells = [(r, c) for r in range(self.row_length) for c in range(self.row_length)
+                 if self.board[r][c] != 0]
+        self.rng.shuffle(cells)
+        self.removal_order = []
+        self.timed_out = False
+        attempts = forced = retries = 0
+        for row, col in cells:
+            if len(self.removal_order) >= self.removed_cells:
+                break
+            num = self.board[row][col]
+            self.unplace(row, col)
+            attempts += 1
+            # the board was unique before, so any new solution must differ here
+            if self.is_forced(row, col, num):
+                forced += 1
+            else:
+                try:
+                    count = yield from self._count_steps(1, (row, col, num), self.node_limit)
+                except GenerationTimeout:
+                    self.place(row, col, num)
+                    self.timed_out = True
+                    break
+                if count != 0:
+                    retries += 1
+                    self.place(row, col, num)
+                    continue
+            self.removal_order.append((row, col))
+        if stats is not None:
+            stats.counters.update(removal_attempts=attempts, forced_removals=forced,
+                                  removal_retries=retries)
+            stats.end("remove_cells", time.perf_counter() - start, before)
         return self.board
 
+    '''
+    Removes cells so that grading.grade puts the puzzle at level (one of
+    grading.LEVELS) instead of removing a fixed number. Cells are first
+    removed as far as uniqueness allows; every prefix of that removal order is
+    itself a unique puzzle, and a binary search over the prefix length finds
+    the most cells that can be removed without going past level, grading only
+    a handful of candidates. Must be called after fill_values.
+    Returns the board, or None (with the board unchanged) if this solution
+    has no puzzle at exactly that level. If the deadline cuts the removal
+    short, the puzzle closest to level among those found is kept instead.
+    '''
+
+    def remove_cells_to_level(self, level):
+        return _run(self._remove_to_level_steps(level), self.deadline, self.cancel)
+
+    def _remove_to_level_steps(self, level):
+        target = grading.LEVELS.index(level)
+        solution = self.solution_board
+        self.removed_cells = self.row_length * self.row_length
+        yield from self._remove_cells_steps()
+        order = self.removal_order
+        ranks = {}
+
+        def puzzle(k):
+            board = [row[:] for row in solution]
+            for r, c in order[:k]:
+                board[r][c] = 0
+            return board
+
+        def rank(k):
+            if k not in ranks:
+                ranks[k] = grading.LEVELS.index(grading.grade(puzzle(k), solution).level)
+            return ranks[k]
+
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if rank(middle) <= target:
+                low = middle
+            else:
+                high = middle - 1
+        missed = rank(low) != target and not self.timed_out
+        board = puzzle(len(order)) if missed else puzzle(low)
+        self.clear_board()
+        for r in range(self.row_length):
+            for c in range(self.row_length):
+                if board[r][c]:
+                    self.place(r, c, board[r][c])
+        if missed:
+            return None
+        self.removal_order = order[:low]
+        return self.board
+
+    '''
+    Determines if num is the only digit that can go in the empty cell (row, col),
+    either because it is the cell's only candidate or because no other empty cell
+    in its row, column or box can take num. Such a cell can be removed without
+    searching for other solutions.
+    '''
+
+    def is_forced(self, row, col, num):
+        bit = 1 << num
+        if self.candidates(row, col) == bit:
+            return True
+        n = self.row_length
+        b = self.box_length
+        row_start = row - row % b
+        col_start = col - col % b
+        units = (
+            [(row, c) for c in range(n)],
+            [(r, col) for r in range(n)],
+            [(row_start + r, col_start + c) for r in range(b) for c in range(b)],
+        )
+        for unit in units:
+            if not any(self.board[r][c] == 0 and (r, c) != (row, col) and self.candidates(r, c) & bit
+                       for r, c in unit):
+                return True
+        return False
+
+    '''
+    Yields count (puzzle, solution) pairs that are symmetry transforms of the
+    current board and solution_board (see transforms.py). Call after
+    remove_cells: each variant has one solution and needs the same solving
+    techniques as the board itself, and costs no search.
+    '''
+
+    def variants(self, count):
+        return transforms.variants(self.board, self.solution_board, count, self.rng)
+
 
 '''
-generate_sudoku(size, removed)
+generate_sudoku(size, removed, stats=None, timeout=None, cancel=None)
 Given size (9) and number of cells to remove, this creates a SudokuGenerator,
-fills values, removes cells, and returns the puzzle board.
+fills values, removes cells, and returns the puzzle board. Pass the same
+GenerationStats as stats to many calls to profile them together.
+After timeout seconds the board is returned with the cells removed so far, or
+GenerationTimeout is raised if it was not even filled; cancel is a CancelToken.
 '''
 
 
-def generate_sudoku(size, removed):
-    sudoku = SudokuGenerator(size, removed)
+def generate_sudoku(size, removed, stats=None, timeout=None, cancel=None):
+    sudoku = SudokuGenerator(size, removed, stats=stats, deadline=_deadline(timeout),
+                             cancel=cancel)
     sudoku.fill_values()
     sudoku.remove_cells()
     return sudoku.get_board()
+
+
+'''
+Generates a (puzzle, solution) pair graded at level (one of grading.LEVELS),
+trying up to attempts new solutions. Returns None if none of them worked.
+timeout and cancel work as for generate_game.
+'''
+
+
+def generate_for_level(level, size=9, rng=None, attempts=50, timeout=None, cancel=None):
+    return _run(_level_steps(level, size, rng, attempts), _deadline(timeout), cancel)
+
+
+def _level_steps(level, size, rng, attempts):
+    for _ in range(attempts):
+        sudoku = SudokuGenerator(size, 0, rng=rng)
+        yield from sudoku._fill_values_steps()
+        if (yield from sudoku._remove_to_level_steps(level)) is not None:
+            return sudoku.get_board(), sudoku.solution_board
+    return None
+
+
+'''
+Generates a (puzzle, solution) pair for one of the game's difficulties.
+Sizes in GRADED_SIZES are generated to the grading level of that name;
+larger boards take too long to reduce fully and remove removed_for cells.
+After timeout seconds it returns the puzzle as far as it got, which may be
+easier than asked, or raises GenerationTimeout if no solution was finished
+yet. Cancelling cancel (a CancelToken) makes it raise GenerationCancelled.
+'''
+
+
+def generate_game(difficulty, size=9, rng=None, timeout=None, cancel=None):
+    return _run(_game_steps(difficulty, size, rng), _deadline(timeout), cancel)
+
+
+def _game_steps(difficulty, size, rng):
+    if size in GRADED_SIZES and difficulty in grading.LEVELS:
+        pair = yield from _level_steps(difficulty, size, rng, 50)
+        if pair is not None:
+            return pair
+    sudoku = SudokuGenerator(size, removed_for(difficulty, size), rng=rng)
+    yield from sudoku._fill_values_steps()
+    solution = sudoku.solution_board
+    yield from sudoku._remove_cells_steps()
+    return sudoku.get_board(), solution
+
+
+class GenerationTask:
+    '''
+    Makes a game puzzle like generate_game, a few milliseconds at a time, for
+    loops that have to keep drawing frames while it runs.
+
+    Parameters:
+        difficulty, size and rng are as for generate_game
+        timeout, if given, bounds the whole generation in seconds, counting
+            the time between steps, with the same outcome as for generate_game
+
+    Call step() every frame until it returns True, then take result, the
+    (puzzle, solution) pair. cancel() abandons the generation, e.g. when the
+    player leaves the screen waiting for it. A step can only stop at a pause
+    of the search (see CHECK_EVERY), so it may run a little past its budget.
+    '''
+
+    def __init__(self, difficulty, size=9, rng=None, timeout=None):
+        self.result = None
+        self.done = False
+        self.deadline = _deadline(timeout)
+        self.cancel_token = CancelToken()
+        self._steps = _game_steps(difficulty, size, rng)
+        self._started = False
+
+    '''
+    Advances the generation for about budget seconds. Returns True once
+    result is set. Raises GenerationTimeout if the deadline passes before a
+    solution is finished, and GenerationCancelled after cancel().
+    '''
+
+    def step(self, budget=0.005):
+        if self.done:
+            return True
+        if self.cancel_token.cancelled:
+            raise GenerationCancelled("generation cancelled")
+        stop = time.monotonic() + budget
+        try:
+            if not self._started:
+                self._started = True
+                next(self._steps)
+            while True:
+                _advance(self._steps, self.deadline, self.cancel_token)
+                if time.monotonic() >= stop:
+                    return False
+        except StopIteration as finished:
+            self.result = finished.value
+            self.done = True
+            return True
+
+    def cancel(self):
+        self.cancel_token.cancel()
+        self._steps.close()
+
+
+'''
+Builds one (puzzle, solution) pair followed by per_seed - 1 symmetry variants
+of it, recording into stats if given
+'''
+
+
+def _generate_batch(size, removed, seed, per_seed, stats=None):
+    sudoku = SudokuGenerator(size, removed, rng=random.Random(seed), stats=stats)
+    sudoku.fill_values()
+    sudoku.remove_cells()
+    return [(sudoku.get_board(), sudoku.solution_board), *sudoku.variants(per_seed - 1)]
+
+
+'''
+Runs _generate_batch for a job tuple inside the worker processes of
+generate_many, so it has to live at module level. The last item of the job
+says whether to profile; the batch is returned with its GenerationStats, or
+None.
+'''
+
+
+def _generate_job(job):
+    *args, profile = job
+    stats = GenerationStats() if profile else None
+    return _generate_batch(*args, stats=stats), stats
+
+
+'''
+generate_many(count, removed, workers=1, seed=None, size=9, solutions=False, per_seed=1,
+              stats=None)
+Generates count puzzles, spreading the SudokuGenerator runs over a pool of
+worker processes. Results stream back while the batch is still running, but
+always in submission order: a slow puzzle holds back the ones queued after it
+even if they finished first. Every puzzle gets its own seed drawn from seed,
+so the output for a given seed is the same whatever the number of workers.
+With solutions=True, yields (puzzle, solution) pairs instead of puzzles.
+With per_seed above 1, only every per_seed-th puzzle is searched for and the
+ones in between are symmetry variants of it (see SudokuGenerator.variants):
+just as valid and as hard, far cheaper, but related to each other.
+stats, a GenerationStats, collects timings and counts for the whole batch;
+worker processes profile their share and it is merged in as it arrives, so
+a stats callback only sees the puzzles generated in this process.
+'''
+
+
+def generate_many(count, removed, workers=1, seed=None, size=9, solutions=False, per_seed=1,
+                  stats=None):
+    seeds = random.Random(seed)
+    jobs = [(size, removed, seeds.getrandbits(64), min(per_seed, count - start))
+            for start in range(0, count, per_seed)]
+    if workers <= 1:
+        for job in jobs:
+            for result in _generate_batch(*job, stats=stats):
+                yield result if solutions else result[0]
+        return
+    jobs = [job + (stats is not None,) for job in jobs]
+    # small chunks keep results streaming while amortising the IPC cost
+    chunksize = max(1, min(16, len(jobs) // (workers * 4)))
+    with multiprocessing.Pool(workers) as pool:
+        for batch, batch_stats in pool.imap(_generate_job, jobs, chunksize):
+            if batch_stats is not None:
+                stats.merge(batch_stats)
+            for result in batch:
+                yield result if solutions else result[0]
+
+
+
+'''
+Runs generate_for_level for a (level, size, seed) job inside the worker
+processes of generate_many_for_level
+'''
+
+
+def _level_job(job):
+    level, size, seed = job
+    return generate_for_level(level, size, random.Random(seed))
+
+
+'''
+generate_many_for_level(count, level, workers=1, seed=None, size=9)
+Like generate_many with solutions=True, but every (puzzle, solution) pair is
+graded at level by generate_for_level rather than made by hole count.
+Solutions with no puzzle at that level are skipped and replaced. Work goes
+out in rounds, and a round that finds nothing ends the stream early, so a
+level that does not exist at this size (4x4 puzzles are all easy) yields
+fewer than count pairs instead of running forever.
+'''
+
+
+def generate_many_for_level(count, level, workers=1, seed=None, size=9):
+    seeds = random.Random(seed)
+    produced = 0
+    with multiprocessing.Pool(workers) if workers > 1 else contextlib.nullcontext() as pool:
+        while produced < count:
+            jobs = [(level, size, seeds.getrandbits(64))
+                    for _ in range(min(count - produced, max(16, workers * 8)))]
+            results = map(_level_job, jobs) if pool is None else pool.imap(_level_job, jobs)
+            found = 0
+            for pair in results:
+                if pair is not None:
+                    found += 1
+                    yield pair
+            if not found:
+                return
+            produced += found
+
+def _text_record(puzzle, solution):
+    line = "".join(symbol(v) if v else "." for row in puzzle for v in row)
+    if solution is not None:
+        line += " " + "".join(symbol(v) for row in solution for v in row)
+    return (line + "\n").encode()
+
+
+def _jsonl_record(puzzle, solution):
+    record = {"puzzle": puzzle}
+    if solution is not None:
+        record["solution"] = solution
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode()
+
+
+def _binary_record(puzzle, solution):
+    record = bytes(v for row in puzzle for v in row)
+    if solution is not None:
+        record += bytes(v for row in solution for v in row)
+    return record
+
+
+# output formats of the command line, each turning a puzzle (and its solution,
+# or None) into the bytes written for it:
+#   text    one line per puzzle, cells in row order, "." for empty cells and
+#           the solution after a space
+#   jsonl   one JSON object per line with "puzzle" (and "solution") as 2D lists
+#   binary  fixed-size records, one byte per cell, puzzle then solution
+FORMATS = {"text": _text_record, "jsonl": _jsonl_record, "binary": _binary_record}
+
+
+'''
+Command line entry point: python -m sudoku_generator --help. Streams puzzles
+from generate_many to stdout or a file. Only the generator and the solvers
+are imported, never pygame, so it runs on machines without a display.
+'''
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m sudoku_generator",
+        description="Generate Sudoku puzzles without opening a window.")
+    parser.add_argument("--count", type=int, default=1, help="number of puzzles (default 1)")
+    parser.add_argument("--size", type=int, default=9, choices=(4, 9, 16, 25))
+    parser.add_argument("--removed", type=int, default=None,
+                        help="cells to remove per puzzle (default: medium for the size)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="makes the output repeatable, whatever the number of workers")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default 1)")
+    parser.add_argument("--variants", type=int, default=1, metavar="K",
+                        help="derive K puzzles from every generated one by symmetry transforms")
+    parser.add_argument("--format", choices=FORMATS, default="text")
+    parser.add_argument("--solutions", action="store_true", help="write the solutions as well")
+    parser.add_argument("-o", "--output", default="-", help="file to write (default stdout)")
+    parser.add_argument("--stats", action="store_true",
+                        help="report where the generation time went on stderr")
+    parser.add_argument("--dedup", metavar="INDEX",
+                        help="skip puzzles already in this dedup index file (or symmetry "
+                             "transforms of them, so --variants are skipped too) and add "
+                             "the new ones to it")
+    args = parser.parse_args(argv)
+
+    removed = removed_for("medium", args.size) if args.removed is None else args.removed
+    if not 0 <= removed <= args.size * args.size:
+        parser.error(f"--removed must be between 0 and {args.size * args.size}")
+    if args.variants < 1:
+        parser.error("--variants must be at least 1")
+    record = FORMATS[args.format]
+    stats = GenerationStats() if args.stats else None
+    pairs = generate_many(args.count, removed, args.workers, args.seed, args.size,
+                          solutions=True, per_seed=args.variants, stats=stats)
+    index = None
+    if args.dedup:
+        # only needed here, so plain runs don't pay for the import
+        from dedup import DedupIndex
+        index = DedupIndex(args.dedup)
+        pairs = index.filter(pairs)
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for puzzle, solution in pairs:
+            out.write(record(puzzle, solution if args.solutions else None))
+            if out is sys.stdout.buffer:
+                out.flush()
+    except BrokenPipeError:
+        # the reader went away (e.g. piped into head); stop quietly
+        sys.stderr.close()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        if index is not None:
+            index.close()
+        # stderr is closed after a broken pipe
+        if not sys.stderr.closed:
+            if index is not None:
+                print(f"skipped {index.duplicates} duplicates", file=sys.stderr)
+            if stats is not None:
+                print(stats.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from sudoku_generator import generate_many
+
+np = pytest.importorskip("numpy")
+from batch_validate import check_solutions, validate  # noqa: E402
+
+
+def corpus(count, size=9, seed=0):
+    pairs = list(generate_many(count, size * size // 3, seed=seed, size=size, solutions=True))
+    return (np.array([p for p, _ in pairs], dtype=np.int8),
+            np.array([s for _, s in pairs], dtype=np.int8))
+
+
+def bad_cells(board, complete):
+    # reference: a plain scan of every cell against its peers
+    n = len(board)
+    b = int(n ** 0.5)
+    found = set()
+    for r in range(n):
+        for c in range(n):
+            v = board[r][c]
+            if v < 0 or v > n or (complete and v == 0):
+                found.add((r, c))
+            elif v:
+                peers = {(r, j) for j in range(n)} | {(i, c) for i in range(n)} | {
+                    (r // b * b + i, c // b * b + j) for i in range(b) for j in range(b)}
+                if any(board[i][j] == v for i, j in peers - {(r, c)}):
+                    found.add((r, c))
+    return found
+
+
+@pytest.mark.parametrize("size", [4, 9, 16])
+def test_matches_a_cell_by_cell_scan(size):
+    rng = random.Random(size)
+    puzzles, solutions = corpus(30 if size < 16 else 6, size)
+    for boards, complete in ((solutions, True), (puzzles, False), (puzzles, True)):
+        boards = boards.copy()
+        for i in range(0, len(boards), 2):
+            for _ in range(rng.randint(1, 3)):
+                boards[i, rng.randrange(size), rng.randrange(size)] = rng.randint(-1, size + 1)
+        result = validate(boards, complete)
+        for i, board in enumerate(boards.tolist()):
+            expected = bad_cells(board, complete)
+            assert result.valid[i] == (not expected)
+            assert {(r, c) for k, r, c in result.cells.tolist() if k == i} == expected
+
+
+def test_check_solutions():
+    puzzles, solutions = corpus(20, seed=3)
+    assert check_solutions(puzzles, solutions).consistent.all()
+    assert check_solutions(puzzles[0], solutions[0]).consistent.all()
+
+    puzzles, solutions = puzzles.copy(), solutions.copy()
+    r, c = np.argwhere(puzzles[2])[0]
+    puzzles[2, r, c] = puzzles[2, r, c] % 9 + 1
+    solutions[5, 0, 0] = solutions[5, 0, 1]
+    result = check_solutions(puzzles, solutions)
+    assert np.flatnonzero(~result.consistent).tolist() == [2, 5]
+    assert [2, r, c] in result.cells.tolist()
+
+
+def test_rejects_bad_shapes():
+    with pytest.raises(ValueError):
+        validate(np.zeros((2, 9, 8), dtype=int))
+    with pytest.raises(ValueError):
+        validate(np.zeros((2, 8, 8), dtype=int))
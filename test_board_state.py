@@ -0,0 +1,121 @@
+import random
+
+from board_state import BoardState
+from sudoku_generator import SudokuGenerator
+
+
+def new_state(seed=0, removed=40, check=False):
+    generator = SudokuGenerator(9, removed, rng=random.Random(seed))
+    generator.fill_values()
+    solution = generator.solution_board
+    generator.remove_cells()
+    return BoardState(generator.get_board(), solution, check=check)
+
+
+def test_buffers_match_the_grids():
+    generator = SudokuGenerator(9, 40, rng=random.Random(1))
+    generator.fill_values()
+    solution = generator.solution_board
+    puzzle = generator.remove_cells()
+    state = BoardState(puzzle, solution)
+    assert state.grid() == puzzle
+    assert state.grid(state.solution) == solution
+    assert state.is_given(0) == (puzzle[0][0] != 0)
+    assert state.find_empty() is not None
+    assert not state.is_full()
+
+
+def test_reset_snapshot_and_copy():
+    state = new_state()
+    empty = state.values.index(0)
+    saved = state.snapshot()
+    copy = state.copy()
+
+    state.set_value(empty, state.solution[empty])
+    state.set_sketch(empty, 3)
+    assert copy.values[empty] == 0
+    assert state.snapshot() != saved
+
+    state.restore(saved)
+    assert state.snapshot() == saved
+    state.set_value(empty, 5)
+    state.reset()
+    assert state.values == bytearray(state.givens)
+    assert not any(state.sketches)
+
+
+def test_solved_board():
+    state = new_state()
+    state.restore(state.solution + bytes(81))
+    assert state.is_full()
+    assert state.is_solved()
+    assert state.find_empty() is None
+
+
+def test_running_counts_follow_random_edits():
+    rng = random.Random(7)
+    state = new_state(check=True)
+    open_cells = [i for i in range(81) if not state.is_given(i)]
+    snapshot = state.snapshot()
+    for step in range(2000):
+        index = rng.choice(open_cells)
+        value = rng.choice([0, state.solution[index], rng.randint(1, 9)])
+        state.set_value(index, value)
+        if step % 500 == 0:
+            state.restore(snapshot)
+        assert state.is_full() == (0 not in state.values)
+        assert state.is_solved() == (state.values == state.solution)
+    for index in open_cells:
+        state.set_value(index, state.solution[index])
+    assert state.is_solved()
+    state.reset()
+    assert state.empty == len(open_cells) and state.wrong == 0
+
+
+def test_conflicts_match_a_peer_scan():
+    rng = random.Random(3)
+    state = new_state(check=True)
+    units_of, unit_cells = state.units_of, state.unit_cells
+    open_cells = [i for i in range(81) if not state.is_given(i)]
+    for _ in range(300):
+        index = rng.choice(open_cells)
+        before = [state.is_conflict(i) for i in range(81)]
+        crossed = state.set_value(index, rng.randint(0, 9))
+        for i in range(81):
+            value = state.values[i]
+            expected = bool(value) and any(state.values[j] == value
+                                           for unit in units_of[i]
+                                           for j in unit_cells[unit] if j != i)
+            assert state.is_conflict(i) == expected
+            # every cell whose highlight flipped is reachable from crossed
+            if i != index and before[i] != expected:
+                assert any(unit in units_of[i] and digit == value
+                           for unit, digit in crossed)
+
+
+def test_undo_and_redo_walk_the_history():
+    rng = random.Random(5)
+    state = new_state(check=True)
+    open_cells = [i for i in range(81) if not state.is_given(i)]
+    snapshots = [state.snapshot()]
+    for _ in range(200):
+        index = rng.choice(open_cells)
+        before = state.snapshot()
+        state.edit(index, rng.randint(0, 9), rng.randint(0, 9))
+        if state.snapshot() != before:
+            snapshots.append(state.snapshot())
+    assert len(state.history) == len(snapshots) - 1
+    assert state.history.itemsize * len(state.history) <= 4 * 200
+
+    for expected in reversed(snapshots[:-1]):
+        assert state.undo() is not None
+        assert state.snapshot() == expected
+    assert state.undo() is None
+    for expected in snapshots[1:]:
+        assert state.redo() is not None
+        assert state.snapshot() == expected
+    assert state.redo() is None
+
+    state.undo()
+    state.edit(open_cells[0], 1, 0)
+    assert state.redo() is None
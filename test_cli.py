@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+
+import sudoku_dlx
+from sudoku_generator import main
+
+
+def run(capsysbinary, *argv):
+    main(list(argv))
+    return capsysbinary.readouterr().out
+
+
+def test_text_output_with_solutions(capsysbinary):
+    lines = run(capsysbinary, "--count", "3", "--seed", "1", "--solutions").splitlines()
+    assert len(lines) == 3
+    for line in lines:
+        puzzle, solution = line.decode().split()
+        assert puzzle.count(".") == 40 and len(solution) == 81
+        assert all(p in (".", s) for p, s in zip(puzzle, solution))
+
+
+def test_formats_agree(capsysbinary):
+    args = ("--count", "4", "--seed", "7", "--size", "4", "--solutions")
+    records = [json.loads(line) for line in run(capsysbinary, *args, "--format", "jsonl").splitlines()]
+    binary = run(capsysbinary, *args, "--format", "binary")
+    assert len(binary) == 4 * 2 * 16
+    for i, record in enumerate(records):
+        assert sudoku_dlx.solve(record["puzzle"]) == record["solution"]
+        cells = bytes(v for grid in (record["puzzle"], record["solution"]) for row in grid for v in row)
+        assert binary[i * 32:(i + 1) * 32] == cells
+
+
+def test_output_file_and_workers_match(tmp_path, capsysbinary):
+    path = tmp_path / "puzzles.txt"
+    main(["--count", "6", "--seed", "3", "--workers", "2", "-o", str(path)])
+    assert path.read_bytes() == run(capsysbinary, "--count", "6", "--seed", "3")
+
+
+def test_cli_never_imports_pygame():
+    code = ("import runpy, sys; sys.argv = ['sudoku_generator', '--count', '1'];"
+            "runpy.run_module('sudoku_generator', run_name='__main__');"
+            "assert 'pygame' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
@@ -0,0 +1,68 @@
+import itertools
+import random
+
+import dedup
+from dedup import DedupIndex, canonical_form, puzzle_hash
+from sudoku_generator import generate_many
+from transforms import apply, random_transform
+
+
+def brute_force_minlex(puzzle):
+    # every transform of a 4x4 board, relabelled in order of first appearance
+    flat = bytes(v for row in puzzle for v in row)
+    # every order of the two bands and of the two rows within each band
+    lines = [[band * 2 + i for band, inner in zip(bands, inners) for i in inner]
+             for bands in itertools.permutations((0, 1))
+             for inners in itertools.product(itertools.permutations((0, 1)), repeat=2)]
+    best = None
+    for board in (flat, bytes(flat[c * 4 + r] for r in range(4) for c in range(4))):
+        for rows in lines:
+            for cols in lines:
+                labels = {0: 0}
+                out = bytes(labels.setdefault(board[r * 4 + c], len(labels))
+                            for r in rows for c in cols)
+                best = out if best is None else min(best, out)
+    return best
+
+
+def test_canonical_form_is_the_minimum_on_4x4():
+    for puzzle in generate_many(40, 9, seed=1, size=4):
+        assert canonical_form(puzzle) == brute_force_minlex(puzzle)
+
+
+def test_canonical_form_ignores_transforms():
+    rng = random.Random(3)
+    puzzles = list(generate_many(30, 50, seed=2))
+    forms = [canonical_form(puzzle) for puzzle in puzzles]
+    assert len(set(forms)) == len(puzzles)
+    for puzzle, form in zip(puzzles, forms):
+        for _ in range(3):
+            moved = apply(puzzle, random_transform(9, rng))
+            assert canonical_form(moved) == form
+            assert puzzle_hash(moved) == puzzle_hash(puzzle)
+
+
+def test_index_survives_merges_and_reopening(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, "MERGE_EVERY", 16)
+    path = str(tmp_path / "hashes.idx")
+    puzzles = list(generate_many(60, 45, seed=4))
+    rng = random.Random(5)
+    with DedupIndex(path, capacity=8) as index:
+        assert all(index.add(puzzle) for puzzle in puzzles[:40])
+        assert not any(index.add(apply(p, random_transform(9, rng))) for p in puzzles[:40])
+        assert len(index) == 40 and index.count >= 32
+
+    with DedupIndex(path) as index:
+        assert all(puzzle in index for puzzle in puzzles[:40])
+        assert not any(puzzle in index for puzzle in puzzles[40:])
+        pairs = [(puzzle, None) for puzzle in puzzles]
+        assert list(index.filter(pairs)) == pairs[40:]
+        assert index.duplicates == 40
+    # a missing Bloom filter is rebuilt from the hash file
+    (tmp_path / "hashes.idx.bloom").unlink()
+    with DedupIndex(path) as index:
+        assert all(puzzle in index for puzzle in puzzles)
+
+    hashes = open(path, "rb").read()
+    chunks = [hashes[i:i + 8] for i in range(0, len(hashes), 8)]
+    assert len(chunks) == 60 and chunks == sorted(set(chunks))
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+from frame_pacing import FramePacer, percentile  # noqa: E402
+
+
+@pytest.fixture
+def display():
+    pygame.init()
+    pygame.display.set_mode((10, 10))
+    pygame.event.clear()
+    yield
+    pygame.quit()
+
+
+def key(k=pygame.K_a):
+    return pygame.event.Event(pygame.KEYDOWN, key=k, unicode="a", mod=0)
+
+
+def test_input_is_timed_until_it_is_shown(display):
+    pacer = FramePacer()
+    pygame.event.post(key())
+    pygame.event.post(key(pygame.K_b))
+    events = pacer.events()
+    assert [event.key for event in events] == [pygame.K_a, pygame.K_b]
+    pacer.frame_done(True)
+
+    # input that changes nothing on screen is not counted
+    pygame.event.post(key())
+    pacer.events()
+    pacer.frame_done(False)
+
+    # neither is a frame without input towards the latency
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+    pacer.events()
+    pacer.frame_done(True)
+    assert len(pacer.input_latency) == 1 and len(pacer.frame_times) == 2
+    assert pacer.wakeups == 3
+    assert "1 inputs" in pacer.report()
+
+
+def test_animating_caps_the_frame_rate(display):
+    pacer = FramePacer(fps=50)
+    pacer.animating = True
+    pacer.events()
+    start = pygame.time.get_ticks()
+    for _ in range(5):
+        assert pacer.events() == []
+    assert pygame.time.get_ticks() - start >= 5 * 20 - 5
+
+
+def test_percentile():
+    assert percentile([], 50) == 0.0
+    assert percentile(range(100), 50) == 50
+    assert percentile(range(100), 99) == 99
@@ -0,0 +1,43 @@
+import random
+
+from generation_stats import PHASES, GenerationStats
+from sudoku_generator import SudokuGenerator, generate_many, generate_sudoku
+
+
+def test_stats_do_not_change_the_puzzle():
+    plain = SudokuGenerator(9, 50, rng=random.Random(3))
+    plain.fill_values()
+    plain.remove_cells()
+    stats = GenerationStats()
+    profiled = SudokuGenerator(9, 50, rng=random.Random(3), stats=stats)
+    profiled.fill_values()
+    profiled.remove_cells()
+    assert profiled.get_board() == plain.get_board()
+    assert all(len(stats.times[phase]) >= 1 for phase in PHASES)
+    counters = stats.counters
+    assert counters["boards"] == 1
+    assert counters["nodes"] >= counters["backtracks"]
+    assert counters["candidate_checks"] >= counters["nodes"]
+    assert counters["removal_attempts"] == \
+        len(profiled.removal_order) + counters["removal_retries"]
+    assert counters["forced_removals"] <= len(profiled.removal_order)
+
+
+def test_callback_gets_each_phase_with_its_counts():
+    calls = []
+    stats = GenerationStats(lambda phase, seconds, counts: calls.append((phase, counts)))
+    for _ in range(3):
+        generate_sudoku(9, 40, stats=stats)
+    assert [phase for phase, _ in calls[:2]] == ["fill_diagonal", "fill_remaining"]
+    assert [phase for phase, _ in calls].count("remove_cells") == 3
+    removals = sum(counts["removal_attempts"] for phase, counts in calls)
+    assert removals == stats.counters["removal_attempts"]
+    assert "remove_cells" in stats.report()
+
+
+def test_worker_stats_are_merged():
+    local, pooled = GenerationStats(), GenerationStats()
+    list(generate_many(6, 40, seed=2, stats=local))
+    list(generate_many(6, 40, workers=2, seed=2, stats=pooled))
+    assert pooled.counters == local.counters
+    assert len(pooled.times["remove_cells"]) == 6
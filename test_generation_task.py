@@ -0,0 +1,86 @@
+import random
+import time
+
+import pytest
+
+import sudoku_dlx
+from puzzle_pool import PuzzlePool
+from sudoku_generator import (CancelToken, GenerationCancelled, GenerationTask,
+                              GenerationTimeout, SudokuGenerator, generate_game,
+                              generate_sudoku)
+
+
+@pytest.mark.parametrize("backend", ["masks", "dlx"])
+def test_deadline_keeps_the_puzzle_made_so_far(backend):
+    generator = SudokuGenerator(9, 60, backend=backend, rng=random.Random(1))
+    generator.fill_values()
+    generator.deadline = time.monotonic() - 1
+    generator.remove_cells()
+    assert generator.timed_out
+    assert len(generator.removal_order) < 60
+    assert sum(v == 0 for row in generator.board for v in row) == len(generator.removal_order)
+    assert sudoku_dlx.count_solutions(generator.board, 2) == 1
+
+
+def test_deadline_before_a_solution_raises():
+    with pytest.raises(GenerationTimeout):
+        generate_sudoku(9, 40, timeout=0)
+
+
+def test_abandoned_fill_restores_the_masks():
+    generator = SudokuGenerator(9, 0, rng=random.Random(2))
+    generator.fill_diagonal()
+    masks = (generator.row_masks[:], generator.col_masks[:], generator.box_masks[:])
+    steps = generator._search_steps(1, fill=True, node_limit=generator.node_limit)
+    next(steps)
+    steps.close()
+    assert (generator.row_masks, generator.col_masks, generator.box_masks) == masks
+
+
+def test_cancelled_token_stops_generation():
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(GenerationCancelled):
+        generate_game("hard", 16, cancel=token)
+
+
+@pytest.mark.parametrize("size", [9, 16])
+def test_task_steps_to_the_same_puzzle(size):
+    task = GenerationTask("medium", size, rng=random.Random(5))
+    steps = 0
+    while not task.step(0.0005):
+        steps += 1
+    assert steps > 0
+    assert task.result == generate_game("medium", size, rng=random.Random(5))
+    task = GenerationTask("medium", size, rng=random.Random(5))
+    task.step(0.0005)
+    task.cancel()
+    with pytest.raises(GenerationCancelled):
+        task.step()
+    task = GenerationTask("medium", size)
+    task.cancel()
+    with pytest.raises(GenerationCancelled):
+        task.step()
+
+
+def test_pool_stop_abandons_a_large_puzzle():
+    pool = PuzzlePool(depth=1, size=25, difficulties={"hard": None}).start()
+    time.sleep(0.2)
+    start = time.monotonic()
+    pool.stop(timeout=5)
+    assert time.monotonic() - start < 1
+    assert pool.error is None
+
+
+def test_fill_values_calls_an_overridden_fill_remaining():
+    calls = []
+
+    class Recording(SudokuGenerator):
+        def fill_remaining(self, row=0, col=0):
+            calls.append((row, col))
+            return super().fill_remaining(row, col)
+
+    generator = Recording(9, 0, rng=random.Random(3))
+    generator.fill_values()
+    assert calls == [(0, 3)]
+    assert all(all(row) for row in generator.solution_board)
@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+import sudoku_dlx
+from grading import LEVELS, grade, grade_many
+from sudoku_generator import SudokuGenerator, generate_for_level, generate_many
+
+
+def test_full_board_is_easy():
+    generator = SudokuGenerator(9, 0, rng=random.Random(0))
+    generator.fill_values()
+    result = grade(generator.solution_board)
+    assert result.level == "easy" and result.hardest is None and result.score == 0
+
+
+def test_grade_many_matches_grade():
+    pairs = list(generate_many(20, 50, seed=3, solutions=True))
+    assert list(grade_many(pairs)) == [grade(puzzle, solution) for puzzle, solution in pairs]
+    assert list(grade_many(puzzle for puzzle, _ in pairs)) == list(grade_many(pairs))
+
+
+def test_scores_order_levels():
+    grades = list(grade_many(generate_many(50, 55, seed=4, solutions=True)))
+    for a in grades:
+        for b in grades:
+            if LEVELS.index(a.level) < LEVELS.index(b.level):
+                assert a.score < b.score
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_generate_for_level(level):
+    for seed in range(3):
+        puzzle, solution = generate_for_level(level, rng=random.Random(seed))
+        assert grade(puzzle, solution).level == level
+        assert sudoku_dlx.count_solutions(puzzle) == 1
+        assert sudoku_dlx.solve(puzzle) == solution
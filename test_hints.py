@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from board_state import BoardState
+from hints import HintEngine
+from sudoku_generator import SudokuGenerator, removed_for
+
+
+def new_state(seed, size=9, difficulty="hard"):
+    generator = SudokuGenerator(size, removed_for(difficulty, size), rng=random.Random(seed))
+    generator.fill_values()
+    solution = generator.solution_board
+    generator.remove_cells()
+    return BoardState(generator.get_board(), solution)
+
+
+def fresh_candidates(engine):
+    return HintEngine(engine.state).candidates
+
+
+@pytest.mark.parametrize("size", [9, 16])
+def test_hints_are_sound(size):
+    # 16x16 hard puzzles take seconds to generate, so use medium there
+    for seed in range(10 if size == 9 else 2):
+        state = new_state(seed, size, "hard" if size == 9 else "medium")
+        engine = HintEngine(state)
+        while True:
+            hint = engine.next_hint()
+            if hint is None:
+                break
+            assert hint.placements or hint.eliminations
+            for index, digit in hint.eliminations:
+                assert state.solution[index] != digit, hint
+            for index, digit in hint.placements:
+                assert state.solution[index] == digit, hint
+                state.set_value(index, digit)
+                engine.cell_changed(index)
+
+
+def test_easy_puzzles_are_solved_by_hints():
+    for seed in range(10):
+        state = new_state(seed, difficulty="easy")
+        engine = HintEngine(state)
+        while (hint := engine.next_hint()) is not None:
+            for index, digit in hint.placements:
+                state.set_value(index, digit)
+                engine.cell_changed(index)
+        assert state.is_solved()
+
+
+def test_incremental_candidates_match_a_rebuild():
+    rng = random.Random(2)
+    state = new_state(4)
+    engine = HintEngine(state)
+    open_cells = [i for i in range(81) if not state.is_given(i)]
+    for _ in range(300):
+        index = rng.choice(open_cells)
+        state.set_value(index, rng.choice([0, state.solution[index], rng.randint(1, 9)]))
+        engine.cell_changed(index)
+        assert engine.candidates == fresh_candidates(engine)
+
+
+def test_mistakes_come_first():
+    state = new_state(1)
+    engine = HintEngine(state)
+    index = state.values.index(0)
+    state.set_value(index, state.solution[index] % 9 + 1)
+    engine.cell_changed(index)
+    hint = engine.next_hint()
+    assert hint.technique == "mistake" and hint.cells == [index]
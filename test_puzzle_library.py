@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from grading import grade
+from puzzle_library import (LibraryError, PuzzleLibrary, main, open_library, pack, unpack,
+                            write_library)
+from sudoku_generator import generate_many
+
+
+def pairs(count, removed, size=9, seed=0):
+    return list(generate_many(count, removed, seed=seed, size=size, solutions=True))
+
+
+@pytest.mark.parametrize("size", [4, 9])
+def test_pack_round_trips(size):
+    for puzzle, solution in pairs(3, size * size // 2, size):
+        assert unpack(pack(puzzle), size) == puzzle
+        assert unpack(pack(solution), size) == solution
+
+
+def test_library_round_trips_every_level(tmp_path):
+    levels = {"easy": pairs(5, 30, seed=1), "medium": pairs(3, 40, seed=2), "hard": []}
+    path = tmp_path / "puzzles.lib"
+    assert write_library(path, levels) == {"easy": 5, "medium": 3, "hard": 0}
+
+    with PuzzleLibrary(path) as library:
+        assert len(library) == 8
+        assert library.levels == {"easy": (0, 5), "medium": (5, 3), "hard": (8, 0)}
+        assert [library.get(i) for i in range(8)] == levels["easy"] + levels["medium"]
+        rng = random.Random(0)
+        for _ in range(20):
+            assert library.pick("medium", rng) in levels["medium"]
+        assert "hard" not in library and library.pick("hard") is None
+        assert library.pick("unknown") is None
+        with pytest.raises(IndexError):
+            library.get(8)
+
+
+def test_bad_files_are_rejected(tmp_path):
+    assert open_library(tmp_path / "missing.lib") is None
+    path = tmp_path / "puzzles.lib"
+    path.write_bytes(b"not a library")
+    with pytest.raises(LibraryError):
+        PuzzleLibrary(path)
+    write_library(path, {"easy": pairs(2, 30)})
+    path.write_bytes(path.read_bytes()[:-1])
+    assert open_library(path) is None
+
+
+def test_built_levels_match_their_grade(tmp_path):
+    path = tmp_path / "puzzles.lib"
+    main([str(path), "--count", "3", "--workers", "1", "--seed", "4"])
+    with PuzzleLibrary(path) as library:
+        assert {name: number for name, (_, number) in library.levels.items()} == \
+            {"easy": 3, "medium": 3, "hard": 3}
+        for name, (first, number) in library.levels.items():
+            for index in range(first, first + number):
+                puzzle, solution = library.get(index)
+                assert grade(puzzle, solution).level == name
+    # 4x4 puzzles are all easy: the other levels stay empty instead of mislabelled
+    main([str(path), "--count", "3", "--size", "4", "--workers", "1", "--seed", "4"])
+    with PuzzleLibrary(path) as library:
+        assert "easy" in library and "medium" not in library and "hard" not in library
@@ -0,0 +1,55 @@
+import time
+
+import puzzle_pool
+from puzzle_pool import PuzzlePool
+
+DIFFICULTIES = {"easy": 4, "hard": 8}
+
+
+def wait_for(condition, timeout=10):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.01)
+
+
+def test_get_counts_hits_and_misses():
+    pool = PuzzlePool(depth=1, size=4, difficulties=DIFFICULTIES)
+    assert pool.get("easy") is None
+    pool.start()
+    try:
+        wait_for(lambda: pool.levels() == {"easy": 1, "hard": 1})
+        puzzle, solution = pool.get("hard")
+        assert sum(v == 0 for row in puzzle for v in row) == 8
+        assert all(all(row) for row in solution)
+        assert pool.get("unknown") is None
+    finally:
+        pool.stop()
+    assert (pool.hits, pool.misses) == (1, 2)
+
+
+def test_refills_up_to_depth():
+    pool = PuzzlePool(depth=3, size=4, difficulties=DIFFICULTIES).start()
+    try:
+        wait_for(lambda: pool.levels() == {"easy": 3, "hard": 3})
+        pool.get("easy")
+        pool.get("easy")
+        wait_for(lambda: pool.levels()["easy"] == 3)
+        # and no further
+        time.sleep(0.05)
+        assert pool.levels() == {"easy": 3, "hard": 3}
+    finally:
+        pool.stop()
+    assert pool.error is None
+
+
+def test_worker_crash_is_kept_in_error(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(puzzle_pool, "generate_game", broken)
+    pool = PuzzlePool(depth=1, size=4, difficulties={"easy": None}).start()
+    wait_for(lambda: pool.error is not None)
+    pool.stop(timeout=5)
+    assert isinstance(pool.error, RuntimeError)
+    assert pool.get("easy") is None
@@ -0,0 +1,72 @@
+import random
+
+from board_state import BoardState
+from save_game import GameSaver, load_game
+from sudoku_generator import SudokuGenerator
+
+
+def new_state(seed=0, size=9, removed=40):
+    generator = SudokuGenerator(size, removed, rng=random.Random(seed))
+    generator.fill_values()
+    solution = generator.solution_board
+    generator.remove_cells()
+    return BoardState(generator.get_board(), solution)
+
+
+def play(saver, state, rng, moves):
+    open_cells = [i for i in range(len(state.values)) if not state.is_given(i)]
+    for _ in range(moves):
+        index = rng.choice(open_cells)
+        state.edit(index, rng.randint(0, state.size), rng.randint(0, state.size))
+        saver.record_cell(index)
+        if rng.random() < 0.2:
+            saver.record_selection(divmod(index, state.size))
+
+
+def assert_same(saved, state, difficulty, selected):
+    assert saved.difficulty == difficulty and saved.selected == selected
+    assert saved.state.givens == state.givens and saved.state.solution == state.solution
+    assert saved.state.snapshot() == state.snapshot()
+    assert (saved.state.empty, saved.state.wrong) == (state.empty, state.wrong)
+    assert saved.state.digit_counts == state.digit_counts
+    assert saved.state.given_counts == state.given_counts
+
+
+def test_journal_and_compaction_restore_the_game(tmp_path):
+    path = str(tmp_path / "save.bin")
+    rng = random.Random(1)
+    for size, moves in ((9, 10), (9, 300), (16, 50)):
+        state = new_state(size=size, removed=size * size // 2)
+        saver = GameSaver(path, state, "medium", (1, 2), compact_every=64)
+        play(saver, state, rng, moves)
+        assert saver.pending < 64
+        assert_same(load_game(path), state, "medium", saver.selected)
+        saver.close()
+
+
+def test_stale_or_damaged_journals_are_ignored(tmp_path):
+    path = str(tmp_path / "save.bin")
+    state = new_state()
+    saver = GameSaver(path, state, "hard")
+    play(saver, state, random.Random(2), 20)
+    saved = state.snapshot()
+    journal = (tmp_path / "save.bin.journal").read_bytes()
+
+    # a record cut short is dropped
+    (tmp_path / "save.bin.journal").write_bytes(journal + b"\x01\x02")
+    assert load_game(path).state.snapshot() == saved
+
+    # a journal left over from another snapshot is not replayed
+    saver.save()
+    play(saver, state, random.Random(3), 5)
+    (tmp_path / "save.bin.journal").write_bytes(journal)
+    assert load_game(path).state.snapshot() != state.snapshot()
+
+    saver.discard()
+    assert load_game(path) is None
+
+
+def test_missing_and_foreign_files(tmp_path):
+    assert load_game(str(tmp_path / "missing.bin")) is None
+    (tmp_path / "other.bin").write_bytes(b"SUDL" + bytes(400))
+    assert load_game(str(tmp_path / "other.bin")) is None
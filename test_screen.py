@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+from board_state import BoardState  # noqa: E402
+from screen import Board  # noqa: E402
+
+SOLUTION = [[1, 2, 3, 4],
+            [3, 4, 1, 2],
+            [2, 1, 4, 3],
+            [4, 3, 2, 1]]
+PUZZLE = [[1, 0, 3, 4],
+          [3, 4, 0, 2],
+          [0, 1, 4, 3],
+          [4, 3, 2, 0]]
+CELL = 40
+FULL = pygame.Rect(0, 0, 4 * CELL + 2, 4 * CELL + 2)
+
+
+@pytest.fixture
+def board():
+    pygame.init()
+    screen = pygame.display.set_mode((4 * CELL, 4 * CELL))
+    board = Board(4 * CELL, 4 * CELL, screen, "easy", size=4,
+                  state=BoardState(PUZZLE, SOLUTION))
+    assert board.draw() == [FULL]
+    yield board
+    pygame.quit()
+
+
+def cell_rect(row, col):
+    return pygame.Rect(col * CELL - 2, row * CELL - 2, CELL + 4, CELL + 4)
+
+
+def drawn(board):
+    return sorted(map(tuple, board.draw()))
+
+
+def cells(*positions):
+    return sorted(tuple(cell_rect(*p)) for p in positions)
+
+
+def test_idle_board_draws_nothing(board):
+    assert board.draw() == []
+    assert board.draw() == []
+
+
+def test_selection_redraws_old_and_new_cell(board):
+    board.select(0, 1)
+    assert drawn(board) == cells((0, 1))
+    board.select(2, 0)
+    assert drawn(board) == cells((0, 1), (2, 0))
+    assert board.draw() == []
+
+
+def test_reset_and_invalidate_redraw_everything(board):
+    board.select(0, 1)
+    board.place_number(2)
+    board.reset_to_original()
+    assert board.draw() == [FULL]
+    assert board.cells[0][1].value == 0
+    board.invalidate()
+    assert board.draw() == [FULL]
+    assert board.draw() == []
+
+
+def test_conflicts_redraw_their_peers(board):
+    board.select(0, 1)
+    board.draw()
+    # a second 1 in row 0, box 0 and column 1 lights up the 1s already there
+    board.place_number(1)
+    assert drawn(board) == cells((0, 0), (0, 1), (2, 1))
+    assert board.cells[0][0].conflict
+    # and clearing it turns them back off
+    board.clear()
+    assert drawn(board) == cells((0, 0), (0, 1), (2, 1))
+    assert not board.cells[0][0].conflict
+    # a digit that clashes with nothing only redraws its own cell
+    board.place_number(2)
+    assert drawn(board) == cells((0, 1))
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+import sudoku_dlx
+from sudoku_generator import SudokuGenerator, removed_for
+
+
+def filled(seed, size=9):
+    generator = SudokuGenerator(size, 0, rng=random.Random(seed))
+    generator.fill_values()
+    return generator
+
+
+def blank_randomly(generator, holes, seed):
+    # no uniqueness check: leaves boards that usually have many solutions
+    rng = random.Random(seed)
+    cells = [(r, c) for r in range(generator.row_length) for c in range(generator.row_length)]
+    for r, c in rng.sample(cells, holes):
+        generator.unplace(r, c)
+    return generator
+
+
+@pytest.mark.parametrize("backend", ["masks", "dlx"])
+@pytest.mark.parametrize("removed", [30, 40, 50])
+def test_remove_cells_keeps_puzzle_unique(backend, removed):
+    for seed in range(10):
+        generator = SudokuGenerator(9, removed, backend=backend, rng=random.Random(seed))
+        generator.fill_values()
+        generator.remove_cells()
+        assert sum(v == 0 for row in generator.board for v in row) == removed
+        assert generator.count_solutions(2) == 1
+        assert sudoku_dlx.solve(generator.board) == generator.solution_board
+
+
+def test_filled_board_is_valid():
+    for seed in range(10):
+        board = filled(seed).solution_board
+        units = board + [list(col) for col in zip(*board)]
+        units += [[board[br + r][bc + c] for r in range(3) for c in range(3)]
+                  for br in (0, 3, 6) for bc in (0, 3, 6)]
+        assert all(sorted(unit) == list(range(1, 10)) for unit in units)
+
+
+def test_mask_and_dlx_counters_agree():
+    for seed in range(20):
+        generator = blank_randomly(filled(seed), 55, seed)
+        for limit in (1, 2, 25):
+            assert generator.count_solutions(limit) == sudoku_dlx.count_solutions(generator.board, limit)
+
+
+def test_banned_and_exclude_agree():
+    for seed in range(20):
+        generator = filled(seed)
+        solution = generator.solution_board
+        blank_randomly(generator, 50, seed)
+        empty = [(r, c) for r in range(9) for c in range(9) if generator.board[r][c] == 0]
+        for r, c in empty[:5]:
+            banned = (r, c, solution[r][c])
+            assert (generator._count_solutions(25, banned)
+                    == sudoku_dlx.count_solutions(generator.board, 25, [banned]))
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        SudokuGenerator(9, 0, backend="DLX")
+
+
+@pytest.mark.parametrize("size", [4, 16])
+def test_other_sizes_generate_unique_puzzles(size):
+    removed = removed_for("medium", size)
+    generator = SudokuGenerator(size, removed, rng=random.Random(size))
+    generator.fill_values()
+    generator.remove_cells()
+    assert sum(v == 0 for row in generator.board for v in row) == removed
+    assert generator.count_solutions(2) == 1
+
+
+def test_removed_for_scales_with_area():
+    assert removed_for("easy") == 30
+    assert removed_for("hard", 4) == round(50 * 16 / 81)
+    # capped where the removal stops finishing in seconds, keeping levels apart
+    assert [removed_for(d, 16) for d in ("easy", "medium", "hard")] == [87, 116, 145]
+    assert [removed_for(d, 25) for d in ("easy", "medium", "hard")] == [180, 240, 300]
+    assert removed_for("unknown") == removed_for("hard")
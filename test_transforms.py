@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import sudoku_dlx
+from grading import grade
+from sudoku_generator import SudokuGenerator, generate_many
+from transforms import apply, random_transform
+
+
+def is_valid(grid):
+    n = len(grid)
+    b = int(n ** 0.5)
+    digits = set(range(1, n + 1))
+    return (all(set(row) == digits for row in grid)
+            and all({grid[r][c] for r in range(n)} == digits for c in range(n))
+            and all({grid[r][c] for r in range(br, br + b) for c in range(bc, bc + b)} == digits
+                    for br in range(0, n, b) for bc in range(0, n, b)))
+
+
+@pytest.mark.parametrize("size", [4, 9, 16])
+def test_transforms_keep_grids_valid(size):
+    rng = random.Random(size)
+    generator = SudokuGenerator(size, 0, rng=rng)
+    generator.fill_values()
+    grid = generator.solution_board
+    seen = set()
+    for _ in range(20):
+        moved = apply(grid, random_transform(size, rng))
+        assert is_valid(moved)
+        seen.add(str(moved))
+    assert len(seen) > 15
+
+
+def test_variants_keep_uniqueness_and_grade():
+    generator = SudokuGenerator(9, 50, rng=random.Random(4))
+    generator.fill_values()
+    generator.remove_cells()
+    level = grade(generator.get_board(), generator.solution_board).level
+    for puzzle, solution in generator.variants(10):
+        assert sudoku_dlx.count_solutions(puzzle) == 1
+        assert sudoku_dlx.solve(puzzle) == solution
+        assert grade(puzzle, solution).level == level
+        assert sum(v == 0 for row in puzzle for v in row) == 50
+
+
+def test_generate_many_per_seed():
+    pairs = list(generate_many(7, 40, seed=2, solutions=True, per_seed=3))
+    assert len(pairs) == 7
+    assert len({str(puzzle) for puzzle, _ in pairs}) == 7
+    assert [p for p, _ in pairs[::3]] == list(generate_many(3, 40, seed=2))
+    for puzzle, solution in pairs:
+        assert sudoku_dlx.solve(puzzle) == solution
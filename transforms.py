@@ -0,0 +1,85 @@
+"""
+Symmetry transforms of Sudoku boards. Relabelling the digits, permuting the
+rows within a band, the columns within a stack, the bands, the stacks, and
+transposing all turn a valid board into another valid board. They turn a
+puzzle with one solution into a puzzle with one solution (the transformed
+one) that needs the same techniques, so one expensive generated puzzle can
+be turned into many different-looking ones with no search at all.
+
+A Transform is a cell permutation plus a digit relabelling, applied to a
+flat board (one byte per cell, row by row) with one indexing pass and one
+bytes.translate.
+"""
+import math
+import random
+from collections import namedtuple
+
+# cells[i] is the cell of the source board that ends up at cell i, digits a
+# bytes.translate table mapping every digit to its new label (0 stays 0).
+Transform = namedtuple("Transform", "cells digits")
+
+_IDENTITY = bytes(range(256))
+
+
+def _shuffled_lines(size, rng):
+    box_length = math.isqrt(size)
+    bands = rng.sample(range(box_length), box_length)
+    return [band * box_length + line for band in bands
+            for line in rng.sample(range(box_length), box_length)]
+
+
+'''
+Returns a random Transform for size x size boards: a random order of bands
+and of rows within each band, the same for stacks and columns, a random
+relabelling of the digits and a transposition half of the time
+'''
+
+
+def random_transform(size, rng=random):
+    rows = _shuffled_lines(size, rng)
+    cols = _shuffled_lines(size, rng)
+    starts = [row * size for row in rows]
+    if rng.random() < 0.5:
+        cells = [start + col for col in cols for start in starts]
+    else:
+        cells = [start + col for start in starts for col in cols]
+    labels = rng.sample(range(1, size + 1), size)
+    return Transform(cells, bytes([0, *labels]) + _IDENTITY[size + 1:])
+
+
+'''
+Applies transform to a flat board (bytes or bytearray) and returns bytes
+'''
+
+
+def apply_flat(flat, transform):
+    return bytes(map(flat.__getitem__, transform.cells)).translate(transform.digits)
+
+
+'''
+Applies transform to a board given as a 2D list and returns a new 2D list
+'''
+
+
+def apply(grid, transform):
+    size = len(grid)
+    flat = apply_flat(bytes(v for row in grid for v in row), transform)
+    return [list(flat[r * size:(r + 1) * size]) for r in range(size)]
+
+
+'''
+Yields count (puzzle, solution) pairs made from one puzzle and its solution
+by random transforms, each applied to both boards
+'''
+
+
+def variants(puzzle, solution, count, rng=random):
+    size = len(puzzle)
+    flat_puzzle = bytes(v for row in puzzle for v in row)
+    flat_solution = bytes(v for row in solution for v in row)
+    for _ in range(count):
+        transform = random_transform(size, rng)
+        new_puzzle = apply_flat(flat_puzzle, transform)
+        new_solution = apply_flat(flat_solution, transform)
+        yield ([list(new_puzzle[r * size:(r + 1) * size]) for r in range(size)],
+               [list(new_solution[r * size:(r + 1) * size]) for r in range(size)])